@@ -4,10 +4,17 @@ from fastapi.responses import JSONResponse
 from aidial_sdk.exceptions import HTTPException as DIALException
 from aidial_sdk.exceptions import InvalidRequestError
 from aidial_sdk.pydantic_v1 import ValidationError
+from aidial_sdk.utils.json import (
+    STDLIB_JSON_SERIALIZER,
+    JSONSerializer,
+    SerializedJSONResponse,
+)
 
 
 def pydantic_validation_exception_handler(
-    request: Request, exc: Exception
+    request: Request,
+    exc: Exception,
+    serializer: JSONSerializer = STDLIB_JSON_SERIALIZER,
 ) -> JSONResponse:
     assert isinstance(exc, ValidationError)
 
@@ -15,18 +22,27 @@ def pydantic_validation_exception_handler(
     path = ".".join(map(str, error["loc"]))
     message = f"Your request contained invalid structure on path {path}. {error['msg']}"
 
-    return InvalidRequestError(message).to_fastapi_response()
+    return InvalidRequestError(message).to_fastapi_response(serializer)
 
 
-def fastapi_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+def fastapi_exception_handler(
+    request: Request,
+    exc: Exception,
+    serializer: JSONSerializer = STDLIB_JSON_SERIALIZER,
+) -> JSONResponse:
     assert isinstance(exc, HTTPException)
-    return JSONResponse(
+    return SerializedJSONResponse(
         status_code=exc.status_code,
         content=exc.detail,
         headers=exc.headers,
+        serializer=serializer,
     )
 
 
-def dial_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+def dial_exception_handler(
+    request: Request,
+    exc: Exception,
+    serializer: JSONSerializer = STDLIB_JSON_SERIALIZER,
+) -> JSONResponse:
     assert isinstance(exc, DIALException)
-    return exc.to_fastapi_response()
+    return exc.to_fastapi_response(serializer)
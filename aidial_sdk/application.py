@@ -1,8 +1,19 @@
 import logging.config
 import re
 import warnings
+from functools import partial
 from logging import Filter, LogRecord
-from typing import Any, Callable, Coroutine, Literal, Optional, Type, TypeVar
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    Literal,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import JSONResponse, Response, StreamingResponse
@@ -12,7 +23,20 @@ from aidial_sdk._errors import (
     fastapi_exception_handler,
     pydantic_validation_exception_handler,
 )
+from aidial_sdk.chat_completion.admission import (
+    AdmissionConfig,
+    AdmissionController,
+    AdmissionMetrics,
+    AdmittedStreamingResponse,
+)
+from aidial_sdk.chat_completion.backpressure import BackpressureConfig
 from aidial_sdk.chat_completion.base import ChatCompletion
+from aidial_sdk.chat_completion.coalescing import CoalescingConfig
+from aidial_sdk.chat_completion.disconnect import (
+    CancellationMetrics,
+    CancellationStats,
+    DisconnectWatcher,
+)
 from aidial_sdk.chat_completion.request import Request as ChatCompletionRequest
 from aidial_sdk.chat_completion.response import (
     Response as ChatCompletionResponse,
@@ -27,15 +51,20 @@ from aidial_sdk.embeddings.request import Request as EmbeddingsRequest
 from aidial_sdk.exceptions import HTTPException as DIALException
 from aidial_sdk.header_propagator import HeaderPropagator
 from aidial_sdk.pydantic_v1 import ValidationError
+from aidial_sdk.storage.client import StorageClient
 from aidial_sdk.telemetry.types import TelemetryConfig
+from aidial_sdk.utils._heartbeat import HeartbeatWheel
+from aidial_sdk.utils._lifespan import add_shutdown_callback
 from aidial_sdk.utils._reflection import get_method_implementation
+from aidial_sdk.utils.json import (
+    JSONSerializer,
+    JSONSerializerName,
+    SerializedJSONResponse,
+    get_json_serializer,
+)
 from aidial_sdk.utils.log_config import LogConfig
 from aidial_sdk.utils.logging import log_debug, set_log_deployment
-from aidial_sdk.utils.streaming import (
-    add_heartbeat,
-    to_block_response,
-    to_streaming_response,
-)
+from aidial_sdk.utils.streaming import to_block_response, to_streaming_response
 
 logging.config.dictConfig(LogConfig().dict())
 
@@ -54,6 +83,11 @@ class PathFilter(Filter):
 
 
 class DIALApp(FastAPI):
+    _json_serializer: JSONSerializer
+    _admission_controllers: Dict[str, AdmissionController]
+    _cancellation_stats: Dict[str, CancellationStats]
+    _heartbeat_wheel: HeartbeatWheel
+    _storage: Optional[StorageClient]
 
     def __init__(
         self,
@@ -61,6 +95,7 @@ class DIALApp(FastAPI):
         propagate_auth_headers: bool = False,
         telemetry_config: Optional[TelemetryConfig] = None,
         add_healthcheck: bool = False,
+        json_serializer: Union[JSONSerializerName, JSONSerializer] = "stdlib",
         **kwargs,
     ):
         if "propagation_auth_headers" in kwargs:
@@ -74,16 +109,35 @@ class DIALApp(FastAPI):
 
         super().__init__(**kwargs)
 
+        self._json_serializer = get_json_serializer(json_serializer)
+        self._admission_controllers = {}
+        self._cancellation_stats = {}
+        # The heartbeats of all the streams are sent by a single timer
+        self._heartbeat_wheel = HeartbeatWheel()
+
         if telemetry_config is not None:
             self.configure_telemetry(telemetry_config)
 
-        if propagate_auth_headers:
-            if not dial_url:
-                raise ValueError(
-                    "dial_url is required if propagation auth headers is enabled"
-                )
+        if propagate_auth_headers and not dial_url:
+            raise ValueError(
+                "dial_url is required if propagation auth headers is enabled"
+            )
 
-            HeaderPropagator(self, dial_url).enable()
+        self._storage = None
+        if dial_url:
+            propagator = HeaderPropagator(self, dial_url)
+            # Fails fast if the storage dependencies aren't installed
+            self._storage = StorageClient(
+                dial_url, get_api_key=propagator.get_api_key
+            )
+
+            if propagate_auth_headers:
+                propagator.enable()
+            else:
+                # The storage client uses the API key of the current request
+                propagator.capture_api_key()
+
+            add_shutdown_callback(self, self._storage.aclose)
 
         if add_healthcheck:
             path = "/health"
@@ -91,12 +145,24 @@ class DIALApp(FastAPI):
             logging.getLogger("uvicorn.access").addFilter(PathFilter(path))
 
         self.add_exception_handler(
-            ValidationError, pydantic_validation_exception_handler
+            ValidationError,
+            partial(
+                pydantic_validation_exception_handler,
+                serializer=self._json_serializer,
+            ),
         )
 
-        self.add_exception_handler(HTTPException, fastapi_exception_handler)
+        self.add_exception_handler(
+            HTTPException,
+            partial(
+                fastapi_exception_handler, serializer=self._json_serializer
+            ),
+        )
 
-        self.add_exception_handler(DIALException, dial_exception_handler)
+        self.add_exception_handler(
+            DIALException,
+            partial(dial_exception_handler, serializer=self._json_serializer),
+        )
 
     def configure_telemetry(self, config: TelemetryConfig):
         try:
@@ -126,14 +192,35 @@ class DIALApp(FastAPI):
         impl: ChatCompletion,
         *,
         heartbeat_interval: Optional[float] = None,
+        coalescing: Optional[CoalescingConfig] = None,
+        backpressure: Optional[BackpressureConfig] = None,
+        timeout: Optional[float] = None,
+        admission: Optional[AdmissionConfig] = None,
+        fast_validation: bool = False,
+        max_body_size: Optional[int] = None,
     ) -> "DIALApp":
 
+        admission_controller = None
+        if admission is not None:
+            admission_controller = AdmissionController(admission)
+            self._admission_controllers[deployment_name] = admission_controller
+
+        cancellation_stats = CancellationStats()
+        self._cancellation_stats[deployment_name] = cancellation_stats
+
         self.add_api_route(
             f"/openai/deployments/{deployment_name}/chat/completions",
             self._chat_completion(
                 deployment_name,
                 impl,
                 heartbeat_interval=heartbeat_interval,
+                coalescing=coalescing,
+                backpressure=backpressure,
+                timeout=timeout,
+                admission=admission_controller,
+                cancellation_stats=cancellation_stats,
+                fast_validation=fast_validation,
+                max_body_size=max_body_size,
             ),
             methods=["POST"],
         )
@@ -179,6 +266,38 @@ class DIALApp(FastAPI):
 
         return self
 
+    def get_admission_metrics(
+        self, deployment_name: str
+    ) -> Optional[AdmissionMetrics]:
+        """
+        Returns None if the admission control
+        isn't configured for the deployment
+        """
+
+        controller = self._admission_controllers.get(deployment_name)
+        return None if controller is None else controller.metrics
+
+    def get_cancellation_metrics(
+        self, deployment_name: str
+    ) -> Optional[CancellationMetrics]:
+        """
+        Returns the statistics of the chat completion requests
+        cancelled due to client disconnects
+        """
+
+        stats = self._cancellation_stats.get(deployment_name)
+        return None if stats is None else stats.metrics
+
+    @property
+    def storage(self) -> StorageClient:
+        """
+        The client of the DIAL file storage shared by all the deployments
+        """
+
+        if self._storage is None:
+            raise ValueError("dial_url is required to use the DIAL storage")
+        return self._storage
+
     def _endpoint_factory(
         self,
         deployment_id: str,
@@ -192,13 +311,15 @@ class DIALApp(FastAPI):
             request = await request_type.from_request(
                 original_request, deployment_id
             )
-            log_debug(f"request[{endpoint}]: {request}")
+            log_debug("request[%s]: %s", endpoint, request)
 
             response = await endpoint_impl(request)
             response_json = response.dict()
-            log_debug(f"response[{endpoint}]: {response_json}")
+            log_debug("response[%s]: %s", endpoint, response_json)
 
-            return JSONResponse(content=response_json)
+            return SerializedJSONResponse(
+                content=response_json, serializer=self._json_serializer
+            )
 
         return _handler
 
@@ -221,36 +342,77 @@ class DIALApp(FastAPI):
         impl: ChatCompletion,
         *,
         heartbeat_interval: Optional[float],
+        coalescing: Optional[CoalescingConfig],
+        backpressure: Optional[BackpressureConfig],
+        timeout: Optional[float],
+        admission: Optional[AdmissionController],
+        cancellation_stats: CancellationStats,
+        fast_validation: bool,
+        max_body_size: Optional[int],
     ):
         async def _handler(original_request: Request):
             set_log_deployment(deployment_id)
 
+            if admission is None:
+                return await _handle(original_request, None)
+
+            release = await admission.acquire()
+            try:
+                return await _handle(original_request, release)
+            except BaseException:
+                release()
+                raise
+
+        async def _handle(
+            original_request: Request, release: Optional[Callable[[], None]]
+        ):
             request = await ChatCompletionRequest.from_request(
-                original_request, deployment_id
+                original_request,
+                deployment_id,
+                fast_validation=fast_validation,
+                max_body_size=max_body_size,
             )
+            if timeout is not None:
+                request._limit_deadline(timeout)
 
-            response = ChatCompletionResponse(request)
+            response = ChatCompletionResponse(
+                request,
+                coalescing=coalescing,
+                backpressure=backpressure,
+                heartbeat_interval=heartbeat_interval,
+                heartbeat_wheel=self._heartbeat_wheel,
+            )
 
-            stream = response._generate_stream(impl.chat_completion)
+            # The producer is cancelled as soon as the client disconnects
+            stream = response._generate_stream(
+                impl.chat_completion,
+                disconnect_watcher=DisconnectWatcher(
+                    original_request.receive, cancellation_stats
+                ),
+            )
 
             if request.stream:
-                if heartbeat_interval:
-                    stream = add_heartbeat(
-                        stream,
-                        heartbeat_interval=heartbeat_interval,
-                        heartbeat_callback=lambda: log_debug("heartbeat"),
-                        heartbeat_object=": heartbeat\n\n",
+                content = await to_streaming_response(
+                    stream, serializer=self._json_serializer
+                )
+                if release is None:
+                    return StreamingResponse(
+                        content, media_type="text/event-stream"
                     )
 
-                return StreamingResponse(
-                    await to_streaming_response(stream),
-                    media_type="text/event-stream",
+                # The admission slot is held until the response is streamed
+                return AdmittedStreamingResponse(
+                    content, release=release, media_type="text/event-stream"
                 )
             else:
                 response_json = await to_block_response(stream)
+                if release is not None:
+                    release()
 
-                log_debug(f"response: {response_json}")
-                return JSONResponse(content=response_json)
+                log_debug("response: %s", response_json)
+                return SerializedJSONResponse(
+                    content=response_json, serializer=self._json_serializer
+                )
 
         return _handler
 
@@ -262,7 +424,9 @@ class DIALApp(FastAPI):
             )
             response = await impl.embeddings(request)
             response_json = response.dict()
-            return JSONResponse(content=response_json)
+            return SerializedJSONResponse(
+                content=response_json, serializer=self._json_serializer
+            )
 
         return _handler
 
@@ -1,5 +1,15 @@
+from aidial_sdk.chat_completion.admission import (
+    AdmissionConfig,
+    AdmissionMetrics,
+)
+from aidial_sdk.chat_completion.backpressure import (
+    BackpressureConfig,
+    QueueMetrics,
+)
 from aidial_sdk.chat_completion.base import ChatCompletion
 from aidial_sdk.chat_completion.choice import Choice
+from aidial_sdk.chat_completion.coalescing import CoalescingConfig
+from aidial_sdk.chat_completion.disconnect import CancellationMetrics
 from aidial_sdk.chat_completion.enums import FinishReason, Status
 from aidial_sdk.chat_completion.request import (
     Addon,
@@ -0,0 +1,229 @@
+"""
+A fast path for parsing the message history of a chat completion request.
+
+The messages are built via `construct` without running pydantic validation,
+but only if every value is of the exact type the validation would accept
+as is. Anything else (a missing or an unexpected field, a value which
+pydantic would coerce or reject) makes the fast path give up,
+so that the full validation produces the very same models and errors.
+"""
+
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Type
+
+from aidial_sdk.chat_completion.enums import Status
+from aidial_sdk.chat_completion.request import (
+    Attachment,
+    CustomContent,
+    FunctionCall,
+    ImageURL,
+    Message,
+    MessageContentImagePart,
+    MessageContentTextPart,
+    Role,
+    Stage,
+    ToolCall,
+)
+from aidial_sdk.pydantic_v1 import BaseModel
+
+
+class _Mismatch(Exception):
+    pass
+
+
+_MISMATCH = _Mismatch()
+
+_Parser = Callable[[Any], Any]
+
+
+def _str(value: Any) -> str:
+    if type(value) is not str:
+        raise _MISMATCH
+    return value
+
+
+def _optional_str(value: Any) -> Optional[str]:
+    return None if value is None else _str(value)
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    if value is not None and type(value) is not int:
+        raise _MISMATCH
+    return value
+
+
+def _any(value: Any) -> Any:
+    return value
+
+
+def _literal(*choices: str) -> _Parser:
+    allowed: FrozenSet[str] = frozenset(choices)
+
+    def _parse(value: Any) -> str:
+        if type(value) is not str or value not in allowed:
+            raise _MISMATCH
+        return value
+
+    return _parse
+
+
+def _optional(parse: _Parser) -> _Parser:
+    def _parse(value: Any) -> Any:
+        return None if value is None else parse(value)
+
+    return _parse
+
+
+def _enum(enum: Type) -> _Parser:
+    members = {member.value: member for member in enum}
+
+    def _parse(value: Any) -> Any:
+        if type(value) is not str or value not in members:
+            raise _MISMATCH
+        return members[value]
+
+    return _parse
+
+
+def _list(parse: _Parser) -> _Parser:
+    def _parse(value: Any) -> List[Any]:
+        if type(value) is not list:
+            raise _MISMATCH
+        return [parse(item) for item in value]
+
+    return _parse
+
+
+def _model(
+    model: Type[BaseModel],
+    fields: Dict[str, _Parser],
+    required: FrozenSet[str] = frozenset(),
+) -> _Parser:
+    def _parse(value: Any) -> BaseModel:
+        if type(value) is not dict or not required.issubset(value):
+            raise _MISMATCH
+
+        values = {}
+        for key, item in value.items():
+            parse = fields.get(key)
+            if parse is None:
+                raise _MISMATCH
+            values[key] = parse(item)
+
+        return model.construct(**values)
+
+    return _parse
+
+
+_attachment = _model(
+    Attachment,
+    {
+        "type": _optional_str,
+        "title": _optional_str,
+        "data": _optional_str,
+        "url": _optional_str,
+        "reference_type": _optional_str,
+        "reference_url": _optional_str,
+    },
+)
+
+_stage = _model(
+    Stage,
+    {
+        "name": _str,
+        "status": _enum(Status),
+        "content": _optional_str,
+        "attachments": _optional(_list(_attachment)),
+    },
+    frozenset(["name", "status"]),
+)
+
+_custom_content = _model(
+    CustomContent,
+    {
+        "stages": _optional(_list(_stage)),
+        "attachments": _optional(_list(_attachment)),
+        "state": _any,
+        "form_value": _any,
+        "form_schema": _any,
+    },
+)
+
+_function_call = _model(
+    FunctionCall,
+    {"name": _str, "arguments": _str},
+    frozenset(["name", "arguments"]),
+)
+
+_tool_call = _model(
+    ToolCall,
+    {
+        "index": _optional_int,
+        "id": _str,
+        "type": _literal("function"),
+        "function": _function_call,
+    },
+    frozenset(["id", "type", "function"]),
+)
+
+_text_part = _model(
+    MessageContentTextPart,
+    {"type": _literal("text"), "text": _str},
+    frozenset(["type", "text"]),
+)
+
+_image_part = _model(
+    MessageContentImagePart,
+    {
+        "type": _literal("image_url"),
+        "image_url": _model(
+            ImageURL,
+            {
+                "url": _str,
+                "detail": _optional(_literal("auto", "low", "high")),
+            },
+            frozenset(["url"]),
+        ),
+    },
+    frozenset(["type", "image_url"]),
+)
+
+
+def _content_part(value: Any) -> BaseModel:
+    # The parts are told apart by their type like the union validation does
+    if type(value) is dict and value.get("type") == "text":
+        return _text_part(value)
+    return _image_part(value)
+
+
+def _content(value: Any) -> Any:
+    if value is None or type(value) is str:
+        return value
+    return _list(_content_part)(value)
+
+
+_message = _model(
+    Message,
+    {
+        "role": _enum(Role),
+        "content": _content,
+        "custom_content": _optional(_custom_content),
+        "name": _optional_str,
+        "tool_calls": _optional(_list(_tool_call)),
+        "tool_call_id": _optional_str,
+        "function_call": _optional(_function_call),
+    },
+    frozenset(["role"]),
+)
+
+_messages = _list(_message)
+
+
+def parse_messages(value: Any) -> Optional[List[Message]]:
+    """
+    Returns None if the messages require the full validation
+    """
+
+    try:
+        return _messages(value)
+    except _Mismatch:
+        return None
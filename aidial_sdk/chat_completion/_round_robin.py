@@ -0,0 +1,100 @@
+import asyncio
+from typing import List, Optional, Union
+
+from aidial_sdk.chat_completion.backpressure import (
+    BackpressureConfig,
+    ChunkQueue,
+    _QueueItem,
+)
+from aidial_sdk.chat_completion.coalescing import ChunkCoalescer
+
+
+class _ChoiceQueue(ChunkQueue):
+    """
+    The queue buffering the chunks of a single choice
+    until they are forwarded to the response queue.
+    """
+
+    _ready: asyncio.Event
+
+    def __init__(
+        self, config: Optional[BackpressureConfig], ready: asyncio.Event
+    ) -> None:
+        super().__init__(config)
+        self._ready = ready
+
+    def put_nowait(self, item: Union[_QueueItem, ChunkCoalescer]) -> None:
+        super().put_nowait(item)
+        self._ready.set()
+
+
+class RoundRobinForwarder:
+    """
+    Forwards the chunks of several choices to the response queue
+    taking one chunk per choice in turn.
+
+    The chunks are forwarded once the consumer has taken the chunks
+    forwarded before, so a choice producing the chunks in bursts
+    doesn't hold back the chunks the other choices produce meanwhile.
+
+    The backpressure limits apply to each choice separately.
+    """
+
+    _target: ChunkQueue
+    _config: Optional[BackpressureConfig]
+    _queues: List[ChunkQueue]
+    _ready: asyncio.Event
+    _closed: bool
+
+    def __init__(
+        self, target: ChunkQueue, config: Optional[BackpressureConfig]
+    ) -> None:
+        self._target = target
+        self._config = config
+        self._queues = []
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    def create_queue(self) -> ChunkQueue:
+        queue = _ChoiceQueue(self._config, self._ready)
+        self._queues.append(queue)
+        return queue
+
+    def close(self) -> None:
+        """
+        Makes `run` return once all the chunks are forwarded.
+        """
+
+        self._closed = True
+        self._ready.set()
+
+    async def run(self) -> None:
+        while True:
+            await self._target.wait_empty()
+            if self._forward():
+                continue
+            if self._closed:
+                return
+
+            await self._ready.wait()
+            self._ready.clear()
+
+    async def join(self) -> None:
+        for queue in self._queues:
+            await queue.join()
+
+    def _forward(self) -> bool:
+        forwarded = False
+        pending = [queue for queue in self._queues if not queue.empty()]
+
+        while pending and not self._target.full():
+            for queue in pending:
+                if self._target.full():
+                    break
+                self._target.put_nowait(queue.get_nowait())
+                queue.task_done()
+                forwarded = True
+
+            pending = [queue for queue in pending if not queue.empty()]
+
+        return forwarded
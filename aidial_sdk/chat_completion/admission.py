@@ -0,0 +1,187 @@
+import asyncio
+from collections import deque
+from typing import Any, Callable, Deque, Optional
+
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from aidial_sdk.exceptions import TooManyRequestsError
+from aidial_sdk.pydantic_v1 import BaseModel, Field
+from aidial_sdk.utils.logging import log_error
+
+
+class AdmissionConfig(BaseModel):
+    """
+    Limits the number of chat completion requests of a deployment
+    processed concurrently. The excess requests wait for a free slot
+    in a FIFO queue and are rejected with 429 once the queue is full
+    or the queue timeout expires.
+    """
+
+    """The maximum number of requests processed concurrently"""
+    max_concurrency: int = Field(..., gt=0)
+
+    """The maximum number of requests waiting for a free slot"""
+    max_queue: int = Field(0, ge=0)
+
+    """The maximum time in seconds a request could wait for a free slot.
+    The requests wait indefinitely by default."""
+    queue_timeout: Optional[float] = Field(None, gt=0)
+
+    """The value of Retry-After header of rejected requests in seconds"""
+    retry_after: int = Field(1, ge=0)
+
+
+class AdmissionMetrics(BaseModel):
+    """The statistics of the admission control of a single deployment"""
+
+    """The number of requests currently being processed"""
+    in_flight: int
+
+    """The number of requests currently waiting for a free slot"""
+    queued: int
+
+    """The total number of rejected requests"""
+    rejected: int
+
+
+def _expire(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(False)
+
+
+def _is_admitted(waiter: asyncio.Future) -> bool:
+    return waiter.done() and not waiter.cancelled() and waiter.result()
+
+
+class AdmissionController:
+    """
+    A semaphore with a bounded FIFO queue of waiters.
+
+    A released slot is handed over directly to the first waiter,
+    so the newly arrived requests can't overtake the queued ones.
+    """
+
+    config: AdmissionConfig
+
+    _in_flight: int
+    _rejected: int
+    _waiters: Deque[asyncio.Future]
+
+    def __init__(self, config: AdmissionConfig) -> None:
+        self.config = config
+
+        self._in_flight = 0
+        self._rejected = 0
+        self._waiters = deque()
+
+    @property
+    def metrics(self) -> AdmissionMetrics:
+        return AdmissionMetrics(
+            in_flight=self._in_flight,
+            queued=len(self._waiters),
+            rejected=self._rejected,
+        )
+
+    async def acquire(self) -> Callable[[], None]:
+        """
+        Waits for a free slot and returns the function releasing it,
+        which could be safely called more than once.
+        Raises TooManyRequestsError if the request is rejected.
+        """
+
+        if self._in_flight < self.config.max_concurrency and not self._waiters:
+            self._in_flight += 1
+            return self._create_release()
+
+        if len(self._waiters) >= self.config.max_queue:
+            self._reject("The request queue is full")
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+
+        timeout = self.config.queue_timeout
+        timer = (
+            None
+            if timeout is None
+            else loop.call_later(timeout, _expire, waiter)
+        )
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # The slot has been handed over right before the cancellation
+            if _is_admitted(waiter):
+                self._release()
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            # The admitted waiters are already removed by `release`
+            if not _is_admitted(waiter):
+                self._remove_waiter(waiter)
+
+        if not _is_admitted(waiter):
+            self._reject("The request has timed out in the queue")
+
+        return self._create_release()
+
+    def _create_release(self) -> Callable[[], None]:
+        released = False
+
+        def _release_once() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self._release()
+
+        return _release_once
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot is handed over without being freed
+                waiter.set_result(True)
+                return
+
+        self._in_flight -= 1
+
+    def _remove_waiter(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _reject(self, reason: str) -> None:
+        self._rejected += 1
+        log_error(f"{reason}, rejecting the request")
+        raise TooManyRequestsError(
+            "Too many requests, please try again later",
+            headers={"Retry-After": str(self.config.retry_after)},
+        )
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    Releases the admission slot once the response is sent.
+
+    The slot is released even if sending fails or is cancelled,
+    e.g. when the client disconnects, in which case Starlette
+    neither closes the body iterator nor runs the background tasks.
+    """
+
+    _release: Callable[[], None]
+
+    def __init__(
+        self, content: Any, *, release: Callable[[], None], **kwargs
+    ) -> None:
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
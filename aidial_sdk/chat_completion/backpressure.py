@@ -0,0 +1,211 @@
+import asyncio
+from typing import Deque, Iterable, Optional, Union, cast
+
+from aidial_sdk.chat_completion.chunks import (
+    AttachmentChunk,
+    AttachmentStageChunk,
+    BaseChunk,
+    ContentChunk,
+    ContentStageChunk,
+    EndChunk,
+    ExceptionChunk,
+    FunctionCallChunk,
+    FunctionToolCallChunk,
+)
+from aidial_sdk.chat_completion.coalescing import ChunkCoalescer, utf8_len
+from aidial_sdk.pydantic_v1 import BaseModel, Field
+from aidial_sdk.utils._channel import Channel
+from aidial_sdk.utils.logging import log_warning
+
+_QueueItem = Union[BaseChunk, ExceptionChunk, EndChunk]
+
+# The limit on a delta merged by the fallback coalescing in UTF-8 bytes
+_FALLBACK_MAX_BYTES = 4096
+
+
+class BackpressureConfig(BaseModel):
+    """
+    Limits the amount of chunks buffered between the producer and
+    the client. Once a limit is reached, the async producer methods
+    (e.g. `Choice.aappend_content`) wait until the client catches up,
+    while the sync ones merge content/arguments deltas into
+    the last buffered chunk where possible.
+
+    The sync methods adding the chunks which can't be merged
+    (e.g. `Choice.add_attachment`) exceed the limits instead.
+    Use `Choice.aadd_attachment` or `Choice.astream_attachment`
+    to keep the buffer bounded.
+    """
+
+    """The maximum number of buffered chunks"""
+    max_chunks: Optional[int] = Field(None, gt=0)
+
+    """The maximum size of buffered chunks in bytes,
+    estimated by the UTF-8 size of the content, arguments and attachments"""
+    max_bytes: Optional[int] = Field(None, gt=0)
+
+
+class QueueMetrics(BaseModel):
+    """The statistics of the chunk queue of a single response"""
+
+    """The number of currently buffered chunks"""
+    depth: int
+
+    """The estimated size of currently buffered chunks in bytes"""
+    size: int
+
+    """The maximum number of buffered chunks observed"""
+    max_depth: int
+
+    """The maximum size of buffered chunks observed"""
+    max_size: int
+
+    """The number of sync deltas merged into buffered chunks due to backpressure"""
+    coalesced_chunks: int
+
+    """The number of sync chunks buffered beyond the limits,
+    because they couldn't be merged into the buffered chunks"""
+    overflowed_chunks: int
+
+    """The total time in seconds the async producers waited for the client"""
+    blocked_time: float
+
+
+def _chunk_size(item: Union[_QueueItem, ChunkCoalescer]) -> int:
+    if isinstance(item, (ContentChunk, ContentStageChunk)):
+        return utf8_len(item.content)
+    elif isinstance(item, (FunctionToolCallChunk, FunctionCallChunk)):
+        return utf8_len(item.arguments or "")
+    elif isinstance(item, (AttachmentChunk, AttachmentStageChunk)):
+        return utf8_len(item.data or "") + utf8_len(item.url or "")
+    elif isinstance(item, ChunkCoalescer):
+        return item.size
+    return 0
+
+
+class ChunkQueue(Channel[Union[_QueueItem, ChunkCoalescer]]):
+    """
+    The channel between the producer of a response and its consumer.
+
+    When the queue is full, the coalescible chunks put via `put_nowait`
+    are merged into the last chunk in the queue.
+    The merged deltas are held in a coalescer,
+    which is turned back into a chunk when taken by the consumer.
+    The other chunks put via `put_nowait` overfill the queue,
+    which is counted and reported by a warning once per queue.
+    """
+
+    _max_depth: int
+    _max_size: int
+    _coalesced_chunks: int
+    _overflowed_chunks: int
+    _blocked_time: float
+    _has_coalescers: bool
+
+    def __init__(self, config: Optional[BackpressureConfig] = None) -> None:
+        if config is None:
+            super().__init__()
+        else:
+            super().__init__(
+                max_items=config.max_chunks,
+                max_size=config.max_bytes,
+                sizeof=_chunk_size,
+            )
+
+        self._max_depth = 0
+        self._max_size = 0
+        self._coalesced_chunks = 0
+        self._overflowed_chunks = 0
+        self._blocked_time = 0.0
+        self._has_coalescers = False
+
+    @property
+    def metrics(self) -> QueueMetrics:
+        return QueueMetrics(
+            depth=len(self),
+            size=self.size,
+            max_depth=self._max_depth,
+            max_size=self._max_size,
+            coalesced_chunks=self._coalesced_chunks,
+            overflowed_chunks=self._overflowed_chunks,
+            blocked_time=self._blocked_time,
+        )
+
+    def put_nowait(self, item: Union[_QueueItem, ChunkCoalescer]) -> None:
+        if isinstance(item, BaseChunk) and self.full():
+            if self._coalesce_into_last(item):
+                return
+            self._on_overflow(item)
+
+        super().put_nowait(item)
+
+        if len(self) > self._max_depth:
+            self._max_depth = len(self)
+        if self.size > self._max_size:
+            self._max_size = self.size
+
+    async def put(self, item: Union[_QueueItem, ChunkCoalescer]) -> None:
+        if not self.full():
+            self.put_nowait(item)
+            return
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            await super().put(item)
+        finally:
+            self._blocked_time += loop.time() - start
+
+    def get_nowait(self) -> _QueueItem:
+        item = super().get_nowait()
+        if isinstance(item, ChunkCoalescer):
+            return item.flush()
+        return item
+
+    def drain(self) -> Iterable[_QueueItem]:
+        items = super().drain()
+        if self._has_coalescers:
+            self._has_coalescers = False
+            return [_flush(item) for item in items]
+        return cast(Deque[_QueueItem], items)
+
+    def _on_overflow(self, chunk: BaseChunk) -> None:
+        if self._overflowed_chunks == 0:
+            log_warning(
+                f"The chunk queue is full, but {type(chunk).__name__} "
+                "was added by a sync method and exceeds the limit. "
+                "Use the async methods, e.g. Choice.aadd_attachment "
+                "or Choice.astream_attachment, to wait for the client."
+            )
+        self._overflowed_chunks += 1
+
+    def _coalesce_into_last(self, chunk: BaseChunk) -> bool:
+        if self.empty() or not ChunkCoalescer.is_coalescible(chunk):
+            return False
+
+        items: Deque = self._items
+        last = items[-1]
+
+        if isinstance(last, ChunkCoalescer):
+            coalescer = last
+        elif isinstance(last, BaseChunk) and ChunkCoalescer.is_coalescible(
+            last
+        ):
+            coalescer = ChunkCoalescer(
+                last, deadline=0, max_bytes=_FALLBACK_MAX_BYTES
+            )
+        else:
+            return False
+
+        if not coalescer.add(chunk):
+            return False
+
+        items[-1] = coalescer
+        self._has_coalescers = True
+        self._size += _chunk_size(chunk)
+        self._coalesced_chunks += 1
+        return True
+
+
+def _flush(item: Union[_QueueItem, ChunkCoalescer]) -> _QueueItem:
+    return item.flush() if isinstance(item, ChunkCoalescer) else item
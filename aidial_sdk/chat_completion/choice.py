@@ -2,7 +2,7 @@ import json
 from types import TracebackType
 from typing import Any, Optional, Type, overload
 
-from aidial_sdk.chat_completion._types import ChunkQueue
+from aidial_sdk.chat_completion.backpressure import ChunkQueue
 from aidial_sdk.chat_completion.choice_base import ChoiceBase
 from aidial_sdk.chat_completion.chunks import (
     AttachmentChunk,
@@ -19,10 +19,16 @@ from aidial_sdk.chat_completion.function_tool_call import FunctionToolCall
 from aidial_sdk.chat_completion.request import Attachment
 from aidial_sdk.chat_completion.stage import Stage
 from aidial_sdk.pydantic_v1 import ValidationError
-from aidial_sdk.utils._attachment import create_attachment
+from aidial_sdk.utils._attachment import (
+    DEFAULT_PIECE_SIZE,
+    AttachmentContent,
+    create_attachment,
+    iter_base64_pieces,
+    validate_attachment,
+)
 from aidial_sdk.utils._content_stream import ContentStream
 from aidial_sdk.utils.errors import runtime_error
-from aidial_sdk.utils.logging import log_debug
+from aidial_sdk.utils.logging import is_debug_enabled, log_debug
 
 
 class Choice(ChoiceBase):
@@ -65,9 +71,19 @@ class Choice(ChoiceBase):
         return False
 
     def send_chunk(self, chunk: BaseChunk) -> None:
-        log_debug("chunk: " + json.dumps(chunk.to_dict()))
+        if is_debug_enabled():
+            log_debug("chunk: " + json.dumps(chunk.to_dict()))
         self._queue.put_nowait(chunk)
 
+    async def asend_chunk(self, chunk: BaseChunk) -> None:
+        """
+        Waits until the client catches up if the chunk queue is full.
+        """
+
+        if is_debug_enabled():
+            log_debug("chunk: " + json.dumps(chunk.to_dict()))
+        await self._queue.put(chunk)
+
     @property
     def index(self) -> int:
         return self._index
@@ -85,6 +101,14 @@ class Choice(ChoiceBase):
         return self._has_function_call
 
     def append_content(self, content: str) -> None:
+        self.send_chunk(self._create_content_chunk(content))
+        self._last_finish_reason = FinishReason.STOP
+
+    async def aappend_content(self, content: str) -> None:
+        await self.asend_chunk(self._create_content_chunk(content))
+        self._last_finish_reason = FinishReason.STOP
+
+    def _create_content_chunk(self, content: str) -> ContentChunk:
         if not self._opened:
             raise runtime_error(
                 "Trying to append content to an unopened choice"
@@ -92,8 +116,7 @@ class Choice(ChoiceBase):
         if self._closed:
             raise runtime_error("Trying to append content to a closed choice")
 
-        self.send_chunk(ContentChunk(content, self._index))
-        self._last_finish_reason = FinishReason.STOP
+        return ContentChunk(content, self._index)
 
     @property
     def content_stream(self) -> ContentStream:
@@ -132,6 +155,90 @@ class Choice(ChoiceBase):
     ) -> None: ...
 
     def add_attachment(self, *args, **kwargs) -> None:
+        """
+        Never waits for the client, so the attachment is buffered even
+        if the chunk queue is full. Prefer `aadd_attachment` or
+        `astream_attachment` when the backpressure is configured.
+        """
+
+        self.send_chunk(self._create_attachment_chunk(*args, **kwargs))
+
+    @overload
+    async def aadd_attachment(self, attachment: Attachment) -> None: ...
+
+    @overload
+    async def aadd_attachment(
+        self,
+        type: Optional[str] = None,
+        title: Optional[str] = None,
+        data: Optional[str] = None,
+        url: Optional[str] = None,
+        reference_url: Optional[str] = None,
+        reference_type: Optional[str] = None,
+    ) -> None: ...
+
+    async def aadd_attachment(self, *args, **kwargs) -> None:
+        """
+        Waits until the client catches up if the chunk queue is full.
+        """
+
+        await self.asend_chunk(self._create_attachment_chunk(*args, **kwargs))
+
+    async def astream_attachment(
+        self,
+        content: AttachmentContent,
+        *,
+        type: Optional[str] = None,
+        title: Optional[str] = None,
+        reference_url: Optional[str] = None,
+        reference_type: Optional[str] = None,
+        piece_size: int = DEFAULT_PIECE_SIZE,
+    ) -> None:
+        """
+        Adds an attachment whose content is read from bytes, a binary file
+        or a (async) iterable of bytes.
+
+        The content is sent as base64 data split into the chunks
+        encoding `piece_size` bytes each, which the client merges
+        into a single attachment. So the whole content is never
+        encoded at once.
+        """
+
+        self._check_attachment_allowed()
+        pieces = iter_base64_pieces(content, piece_size)
+
+        attachment_index = self._last_attachment_index
+        self._last_attachment_index += 1
+
+        # The attachment fields are sent in the first chunk
+        first_chunk: Optional[AttachmentChunk] = AttachmentChunk(
+            choice_index=self._index,
+            attachment_index=attachment_index,
+            type=type,
+            title=title,
+            reference_url=reference_url,
+            reference_type=reference_type,
+        )
+
+        async for piece in pieces:
+            if first_chunk is not None:
+                first_chunk.data = piece
+                chunk, first_chunk = first_chunk, None
+            else:
+                chunk = AttachmentChunk(
+                    choice_index=self._index,
+                    attachment_index=attachment_index,
+                    data=piece,
+                )
+            await self.asend_chunk(chunk)
+
+        # The empty content is sent as the empty data,
+        # so that the attachment still has either data or url
+        if first_chunk is not None:
+            first_chunk.data = ""
+            await self.asend_chunk(first_chunk)
+
+    def _check_attachment_allowed(self) -> None:
         if not self._opened:
             raise runtime_error(
                 "Trying to add attachment to an unopened choice"
@@ -139,18 +246,27 @@ class Choice(ChoiceBase):
         if self._closed:
             raise runtime_error("Trying to add attachment to a closed choice")
 
-        attachment_chunk = None
+    def _create_attachment_chunk(self, *args, **kwargs) -> AttachmentChunk:
+        self._check_attachment_allowed()
+
         try:
-            attachment_chunk = AttachmentChunk(
-                choice_index=self._index,
-                attachment_index=self._last_attachment_index,
-                **create_attachment(*args, **kwargs).dict(),
-            )
+            attachment = validate_attachment(create_attachment(*args, **kwargs))
         except ValidationError as e:
             raise runtime_error(e.errors()[0]["msg"])
 
-        self.send_chunk(attachment_chunk)
+        attachment_chunk = AttachmentChunk(
+            choice_index=self._index,
+            attachment_index=self._last_attachment_index,
+            type=attachment.type,
+            title=attachment.title,
+            data=attachment.data,
+            url=attachment.url,
+            reference_url=attachment.reference_url,
+            reference_type=attachment.reference_type,
+        )
+
         self._last_attachment_index += 1
+        return attachment_chunk
 
     def set_state(self, state: Any) -> None:
         if self._state_submitted:
@@ -27,3 +27,6 @@ class ChoiceBase(ABC):
     @abstractmethod
     def send_chunk(self, chunk: BaseChunk) -> None:
         pass
+
+    async def asend_chunk(self, chunk: BaseChunk) -> None:
+        self.send_chunk(chunk)
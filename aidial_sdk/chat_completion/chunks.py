@@ -3,11 +3,12 @@ from typing import Any, Dict, List, Optional, TypedDict
 
 from aidial_sdk.chat_completion.enums import FinishReason, Status
 from aidial_sdk.exceptions import HTTPException as DIALException
-from aidial_sdk.pydantic_v1 import BaseModel, root_validator
 from aidial_sdk.utils.json import remove_nones
 
 
 class BaseChunk(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def to_dict(self) -> Dict[str, Any]:
         pass
@@ -21,6 +22,8 @@ class DefaultChunk(TypedDict, total=False):
 
 
 class BaseChunkWithDefaults:
+    __slots__ = ("chunk", "defaults")
+
     chunk: BaseChunk
     defaults: DefaultChunk
 
@@ -36,6 +39,8 @@ class BaseChunkWithDefaults:
 
 
 class StartChoiceChunk(BaseChunk):
+    __slots__ = ("choice_index",)
+
     choice_index: int
 
     def __init__(self, choice_index: int):
@@ -55,6 +60,8 @@ class StartChoiceChunk(BaseChunk):
 
 
 class EndChoiceChunk(BaseChunk):
+    __slots__ = ("finish_reason", "choice_index")
+
     finish_reason: FinishReason
     choice_index: int
 
@@ -76,6 +83,8 @@ class EndChoiceChunk(BaseChunk):
 
 
 class ContentChunk(BaseChunk):
+    __slots__ = ("content", "choice_index")
+
     content: str
     choice_index: int
 
@@ -97,6 +106,8 @@ class ContentChunk(BaseChunk):
 
 
 class FunctionToolCallChunk(BaseChunk):
+    __slots__ = ("choice_index", "call_index", "id", "name", "arguments")
+
     choice_index: int
     call_index: int
     id: Optional[str]
@@ -129,7 +140,13 @@ class FunctionToolCallChunk(BaseChunk):
                                 {
                                     "index": self.call_index,
                                     "id": self.id,
-                                    "type": "function",
+                                    # Sent once per call, so that the merged
+                                    # type stays "function"
+                                    "type": (
+                                        "function"
+                                        if self.id is not None
+                                        else None
+                                    ),
                                     "function": remove_nones(
                                         {
                                             "name": self.name,
@@ -147,6 +164,8 @@ class FunctionToolCallChunk(BaseChunk):
 
 
 class FunctionCallChunk(BaseChunk):
+    __slots__ = ("choice_index", "name", "arguments")
+
     choice_index: int
     name: Optional[str]
     arguments: Optional[str]
@@ -182,6 +201,8 @@ class FunctionCallChunk(BaseChunk):
 
 
 class StartStageChunk(BaseChunk):
+    __slots__ = ("choice_index", "stage_index", "name")
+
     choice_index: int
     stage_index: int
     name: Optional[str]
@@ -217,6 +238,8 @@ class StartStageChunk(BaseChunk):
 
 
 class FinishStageChunk(BaseChunk):
+    __slots__ = ("choice_index", "stage_index", "status")
+
     choice_index: int
     stage_index: int
     status: Status
@@ -249,6 +272,8 @@ class FinishStageChunk(BaseChunk):
 
 
 class ContentStageChunk(BaseChunk):
+    __slots__ = ("choice_index", "stage_index", "content")
+
     choice_index: int
     stage_index: int
     content: str
@@ -282,6 +307,8 @@ class ContentStageChunk(BaseChunk):
 
 
 class FormSchemaChunk(BaseChunk):
+    __slots__ = ("choice_index", "form_schema")
+
     choice_index: int
     form_schema: str
 
@@ -307,6 +334,8 @@ class FormSchemaChunk(BaseChunk):
 
 
 class NameStageChunk(BaseChunk):
+    __slots__ = ("choice_index", "stage_index", "name")
+
     choice_index: int
     stage_index: int
     name: str
@@ -339,7 +368,23 @@ class NameStageChunk(BaseChunk):
         }
 
 
-class Attachment(BaseModel):
+class Attachment:
+    """
+    The attachment fields are expected to be validated beforehand,
+    so that the chunk construction stays cheap.
+    """
+
+    __slots__ = (
+        "choice_index",
+        "attachment_index",
+        "type",
+        "title",
+        "data",
+        "url",
+        "reference_url",
+        "reference_type",
+    )
+
     choice_index: int
     attachment_index: int
 
@@ -350,16 +395,26 @@ class Attachment(BaseModel):
     reference_url: Optional[str]
     reference_type: Optional[str]
 
-    @root_validator
-    def check_data_or_url(cls, values):
-        data, url = values.get("data"), values.get("url")
-
-        if data is None and url is None:
-            raise ValueError("Trying to add attachment without data and url")
-        if data is not None and url is not None:
-            raise ValueError("Trying to add attachment with data and url")
-
-        return values
+    def __init__(
+        self,
+        *,
+        choice_index: int,
+        attachment_index: int,
+        type: Optional[str] = None,
+        title: Optional[str] = None,
+        data: Optional[str] = None,
+        url: Optional[str] = None,
+        reference_url: Optional[str] = None,
+        reference_type: Optional[str] = None,
+    ):
+        self.choice_index = choice_index
+        self.attachment_index = attachment_index
+        self.type = type
+        self.title = title
+        self.data = data
+        self.url = url
+        self.reference_url = reference_url
+        self.reference_type = reference_type
 
     def attachment_dict(self, index: int):
         attachment: Dict[str, Any] = {"index": index}
@@ -368,9 +423,10 @@ class Attachment(BaseModel):
             attachment["type"] = self.type
         if self.title:
             attachment["title"] = self.title
-        if self.data:
+        # The empty data is still the content of the attachment
+        if self.data is not None:
             attachment["data"] = self.data
-        if self.url:
+        if self.url is not None:
             attachment["url"] = self.url
         if self.reference_url:
             attachment["reference_url"] = self.reference_url
@@ -381,6 +437,8 @@ class Attachment(BaseModel):
 
 
 class AttachmentChunk(Attachment, BaseChunk):
+    __slots__ = ()
+
     def to_dict(self):
         return {
             "choices": [
@@ -401,8 +459,14 @@ class AttachmentChunk(Attachment, BaseChunk):
 
 
 class AttachmentStageChunk(Attachment, BaseChunk):
+    __slots__ = ("stage_index",)
+
     stage_index: int
 
+    def __init__(self, *, stage_index: int, **kwargs):
+        super().__init__(**kwargs)
+        self.stage_index = stage_index
+
     def to_dict(self):
         return {
             "choices": [
@@ -431,6 +495,8 @@ class AttachmentStageChunk(Attachment, BaseChunk):
 
 
 class StateChunk(BaseChunk):
+    __slots__ = ("choice_index", "state")
+
     choice_index: int
     state: Any
 
@@ -452,6 +518,8 @@ class StateChunk(BaseChunk):
 
 
 class UsageChunk(BaseChunk):
+    __slots__ = ("prompt_tokens", "completion_tokens")
+
     prompt_tokens: int
     completion_tokens: int
 
@@ -470,6 +538,8 @@ class UsageChunk(BaseChunk):
 
 
 class UsagePerModelChunk(BaseChunk):
+    __slots__ = ("index", "model", "prompt_tokens", "completion_tokens")
+
     index: int
     model: str
     prompt_tokens: int
@@ -505,6 +575,8 @@ class UsagePerModelChunk(BaseChunk):
 
 
 class DiscardedMessagesChunk(BaseChunk):
+    __slots__ = ("discarded_messages",)
+
     discarded_messages: List[int]
 
     def __init__(self, discarded_messages: List[int]):
@@ -519,6 +591,8 @@ class DiscardedMessagesChunk(BaseChunk):
 
 
 class ArbitraryChunk(BaseChunk):
+    __slots__ = ("chunk",)
+
     chunk: Dict[str, Any]
 
     def __init__(self, chunk: Dict[str, Any]):
@@ -529,6 +603,8 @@ class ArbitraryChunk(BaseChunk):
 
 
 class ExceptionChunk:
+    __slots__ = ("exc",)
+
     exc: DIALException
 
     def __init__(self, exc: DIALException):
@@ -536,4 +612,8 @@ class ExceptionChunk:
 
 
 class EndChunk:
-    pass
+    __slots__ = ()
+
+
+class HeartbeatChunk:
+    __slots__ = ()
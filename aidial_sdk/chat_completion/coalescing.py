@@ -0,0 +1,145 @@
+from typing import List, Optional, Tuple, Union, cast
+
+from aidial_sdk.chat_completion.chunks import (
+    BaseChunk,
+    ContentChunk,
+    ContentStageChunk,
+    FunctionCallChunk,
+    FunctionToolCallChunk,
+)
+from aidial_sdk.pydantic_v1 import BaseModel, Field
+
+_CoalescibleChunk = Union[
+    ContentChunk, ContentStageChunk, FunctionToolCallChunk, FunctionCallChunk
+]
+
+
+class CoalescingConfig(BaseModel):
+    """
+    Consecutive content/arguments deltas of the same choice, stage or
+    tool call are merged into a single chunk before being streamed.
+    """
+
+    """The maximum time in seconds a delta could be held back
+    while waiting for the follow-up deltas"""
+    max_delay: float = Field(0.005, ge=0)
+
+    """The maximum size of a merged delta in UTF-8 bytes"""
+    max_bytes: int = Field(4096, gt=0)
+
+
+def _coalescing_key(chunk: BaseChunk) -> Optional[Tuple]:
+    if isinstance(chunk, ContentChunk):
+        return (ContentChunk, chunk.choice_index)
+    elif isinstance(chunk, ContentStageChunk):
+        return (ContentStageChunk, chunk.choice_index, chunk.stage_index)
+    elif isinstance(chunk, FunctionToolCallChunk):
+        if chunk.arguments is not None:
+            return (FunctionToolCallChunk, chunk.choice_index, chunk.call_index)
+    elif isinstance(chunk, FunctionCallChunk):
+        if chunk.arguments is not None:
+            return (FunctionCallChunk, chunk.choice_index)
+    return None
+
+
+def utf8_len(s: str) -> int:
+    """The size of the string encoded to UTF-8"""
+    return len(s) if s.isascii() else len(s.encode("utf-8"))
+
+
+def _get_delta(chunk: _CoalescibleChunk) -> str:
+    if isinstance(chunk, (ContentChunk, ContentStageChunk)):
+        return chunk.content
+    return chunk.arguments or ""
+
+
+def _is_continuation(chunk: _CoalescibleChunk) -> bool:
+    # Only the very first chunk of a call carries its id and name
+    if isinstance(chunk, FunctionToolCallChunk):
+        return chunk.id is None and chunk.name is None
+    elif isinstance(chunk, FunctionCallChunk):
+        return chunk.name is None
+    return True
+
+
+class ChunkCoalescer:
+    """
+    Accumulates the deltas of the chunks which follow the head chunk
+    and could be merged into it.
+    """
+
+    deadline: float
+    count: int
+
+    _head: _CoalescibleChunk
+    _key: Tuple
+    _deltas: List[str]
+    _size: int
+    _max_bytes: int
+
+    def __init__(
+        self, head: BaseChunk, *, deadline: float, max_bytes: int
+    ) -> None:
+        key = _coalescing_key(head)
+        assert key is not None, "The chunk can't be coalesced"
+
+        self._head = cast(_CoalescibleChunk, head)
+        self._key = key
+        self._deltas = [_get_delta(self._head)]
+        self._size = utf8_len(self._deltas[0])
+        self._max_bytes = max_bytes
+
+        self.deadline = deadline
+        self.count = 1
+
+    @staticmethod
+    def is_coalescible(chunk: BaseChunk) -> bool:
+        return _coalescing_key(chunk) is not None
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        return self._size >= self._max_bytes
+
+    def add(self, chunk: BaseChunk) -> bool:
+        """
+        Returns False when the chunk can't be merged into the accumulated one.
+        """
+
+        if _coalescing_key(chunk) != self._key:
+            return False
+
+        chunk = cast(_CoalescibleChunk, chunk)
+        if not _is_continuation(chunk):
+            return False
+
+        delta = _get_delta(chunk)
+        size = utf8_len(delta)
+        if self._size + size > self._max_bytes:
+            return False
+
+        self._deltas.append(delta)
+        self._size += size
+        self.count += 1
+        return True
+
+    def flush(self) -> BaseChunk:
+        head = self._head
+        if len(self._deltas) == 1:
+            return head
+
+        delta = "".join(self._deltas)
+
+        if isinstance(head, ContentChunk):
+            return ContentChunk(delta, head.choice_index)
+        elif isinstance(head, ContentStageChunk):
+            return ContentStageChunk(head.choice_index, head.stage_index, delta)
+        elif isinstance(head, FunctionToolCallChunk):
+            return FunctionToolCallChunk(
+                head.choice_index, head.call_index, head.id, head.name, delta
+            )
+        else:
+            return FunctionCallChunk(head.choice_index, head.name, delta)
@@ -0,0 +1,62 @@
+from typing import Optional
+
+from starlette.types import Receive
+
+from aidial_sdk.pydantic_v1 import BaseModel
+
+
+class CancellationMetrics(BaseModel):
+    """The statistics of the requests cancelled due to client disconnects"""
+
+    """The number of cancelled requests"""
+    cancelled_requests: int
+
+    """The total time in seconds the cancelled requests had been processed
+    before the client disconnected"""
+    cancelled_work_time: float
+
+
+class CancellationStats:
+    _cancelled_requests: int
+    _cancelled_work_time: float
+
+    def __init__(self) -> None:
+        self._cancelled_requests = 0
+        self._cancelled_work_time = 0.0
+
+    @property
+    def metrics(self) -> CancellationMetrics:
+        return CancellationMetrics(
+            cancelled_requests=self._cancelled_requests,
+            cancelled_work_time=self._cancelled_work_time,
+        )
+
+    def add(self, work_time: float) -> None:
+        self._cancelled_requests += 1
+        self._cancelled_work_time += work_time
+
+
+class DisconnectWatcher:
+    """
+    Detects the client disconnect by reading the ASGI messages
+    of a request whose body has been read already.
+    """
+
+    _receive: Receive
+    _stats: Optional[CancellationStats]
+
+    def __init__(
+        self, receive: Receive, stats: Optional[CancellationStats] = None
+    ) -> None:
+        self._receive = receive
+        self._stats = stats
+
+    async def wait(self) -> None:
+        while True:
+            message = await self._receive()
+            if message["type"] == "http.disconnect":
+                return
+
+    def on_cancelled(self, work_time: float) -> None:
+        if self._stats is not None:
+            self._stats.add(work_time)
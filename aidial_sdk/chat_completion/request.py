@@ -1,5 +1,17 @@
+import base64
+import binascii
 from enum import Enum
-from typing import Any, Dict, List, Literal, Mapping, Optional, Union
+from io import BytesIO
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Union,
+)
 
 from typing_extensions import assert_never
 
@@ -12,12 +24,17 @@ from aidial_sdk.pydantic_v1 import (
     ConstrainedList,
     Field,
     PositiveInt,
+    PrivateAttr,
     StrictBool,
     StrictInt,
     StrictStr,
 )
+from aidial_sdk.utils.errors import runtime_error
 from aidial_sdk.utils.pydantic import ExtraForbidModel
 
+if TYPE_CHECKING:
+    from aidial_sdk.storage import StorageClient
+
 
 class Attachment(ExtraForbidModel):
     type: Optional[StrictStr] = "text/markdown"
@@ -27,6 +44,63 @@ class Attachment(ExtraForbidModel):
     reference_type: Optional[StrictStr] = None
     reference_url: Optional[StrictStr] = None
 
+    _content: Optional[bytes] = PrivateAttr(None)
+
+    def bytes(self) -> memoryview:
+        """
+        Returns the binary content of the attachment.
+        The data is decoded from base64 on the first access and cached.
+        The attachments stored at URL must be loaded first via `load`.
+        """
+
+        if self._content is None:
+            if self.data is not None:
+                try:
+                    self._content = base64.b64decode(self.data)
+                except binascii.Error:
+                    raise InvalidRequestError(
+                        "The attachment data isn't valid base64"
+                    )
+            elif self.url is not None:
+                raise runtime_error(
+                    "The attachment stored at URL must be loaded before reading"
+                )
+            else:
+                raise InvalidRequestError(
+                    "Unable to retrieve content of the attachment: neither data nor url is present."
+                )
+
+        return memoryview(self._content)
+
+    def open(self) -> BytesIO:
+        """
+        Returns the binary content of the attachment as a file-like object
+        sharing the cached buffer.
+        """
+
+        self.bytes()
+        return BytesIO(self._content)
+
+    async def load(
+        self,
+        storage: Optional["StorageClient"] = None,
+        api_key: Optional[str] = None,
+    ) -> memoryview:
+        """
+        Loads the binary content of the attachment and caches it.
+        The attachments stored at URL are downloaded via the storage client,
+        e.g. `DIALApp.storage`, which sends the API key only to DIAL.
+        """
+
+        if self._content is None and self.data is None and self.url is not None:
+            if storage is None:
+                raise runtime_error(
+                    "The storage client is required to load the attachment stored at URL"
+                )
+            self._content = await storage.download(self.url, api_key=api_key)
+
+        return self.bytes()
+
 
 class Stage(ExtraForbidModel):
     name: StrictStr
@@ -241,4 +315,18 @@ class ChatCompletionRequest(AzureChatCompletionRequest):
 
 
 class Request(ChatCompletionRequest, FromRequestDeploymentMixin):
-    pass
+    @classmethod
+    def _from_body(cls, body: dict, *, fast_validation: bool, **fields):
+        if fast_validation and isinstance(body, dict):
+            from aidial_sdk.chat_completion._fast_parsing import parse_messages
+
+            # The rest of the request is validated as usual
+            messages = parse_messages(body.get("messages"))
+            if messages is not None:
+                request = cls(**{**body, "messages": []}, **fields)
+                request.messages = messages
+                return request
+
+        return super()._from_body(
+            body, fast_validation=fast_validation, **fields
+        )
@@ -1,11 +1,25 @@
 import asyncio
 from time import time
-from typing import Any, Callable, Coroutine, List
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    List,
+    Optional,
+    Union,
+)
 from uuid import uuid4
 
 from typing_extensions import assert_never
 
-from aidial_sdk.chat_completion._types import ChunkQueue
+from aidial_sdk.chat_completion._round_robin import RoundRobinForwarder
+from aidial_sdk.chat_completion.backpressure import (
+    BackpressureConfig,
+    ChunkQueue,
+    QueueMetrics,
+)
 from aidial_sdk.chat_completion.choice import Choice
 from aidial_sdk.chat_completion.chunks import (
     ArbitraryChunk,
@@ -16,43 +30,91 @@ from aidial_sdk.chat_completion.chunks import (
     EndChoiceChunk,
     EndChunk,
     ExceptionChunk,
+    HeartbeatChunk,
     UsageChunk,
     UsagePerModelChunk,
 )
+from aidial_sdk.chat_completion.coalescing import (
+    ChunkCoalescer,
+    CoalescingConfig,
+)
+from aidial_sdk.chat_completion.disconnect import DisconnectWatcher
 from aidial_sdk.chat_completion.request import Request
+from aidial_sdk.exceptions import DeadlineExceededError
 from aidial_sdk.exceptions import HTTPException as DIALException
 from aidial_sdk.exceptions import RequestValidationError, RuntimeServerError
 from aidial_sdk.utils._cancel_scope import CancelScope
+from aidial_sdk.utils._heartbeat import (
+    HeartbeatTimer,
+    HeartbeatWheel,
+    WheelTimer,
+)
 from aidial_sdk.utils.errors import RUNTIME_ERROR_MESSAGE, runtime_error
-from aidial_sdk.utils.logging import log_error, log_exception
+from aidial_sdk.utils.logging import (
+    log_debug,
+    log_error,
+    log_exception,
+    log_info,
+)
 from aidial_sdk.utils.merge_chunks import merge
-from aidial_sdk.utils.streaming import ResponseStream
+from aidial_sdk.utils.streaming import HEARTBEAT_FRAME, ResponseStreamWithBytes
+
+# The non-standard status code of the requests closed by the client
+_CLIENT_CLOSED_REQUEST = 499
 
 _Producer = Callable[[Request, "Response"], Coroutine[Any, Any, Any]]
 
+_QueueItem = Union[BaseChunk, ExceptionChunk, EndChunk, HeartbeatChunk]
+
 
 class Response:
     request: Request
 
     _queue: ChunkQueue
+    _backpressure: Optional[BackpressureConfig]
+    _forwarder: Optional[RoundRobinForwarder]
     _last_choice_index: int
     _last_usage_per_model_index: int
     _generation_started: bool
     _discarded_messages_generated: bool
     _usage_generated: bool
+    _coalescing: Optional[CoalescingConfig]
+    _heartbeat: Optional[Union[HeartbeatTimer, WheelTimer]]
 
     _default_chunk: DefaultChunk
 
-    def __init__(self, request: Request):
-        self._queue = asyncio.Queue()
+    def __init__(
+        self,
+        request: Request,
+        *,
+        coalescing: Optional[CoalescingConfig] = None,
+        backpressure: Optional[BackpressureConfig] = None,
+        heartbeat_interval: Optional[float] = None,
+        heartbeat_wheel: Optional[HeartbeatWheel] = None,
+    ):
+        self._queue = ChunkQueue(backpressure)
+        self._backpressure = backpressure
+        self._forwarder = None
         self._last_choice_index = 0
         self._last_usage_per_model_index = 0
         self._generation_started = False
         self._discarded_messages_generated = False
         self._usage_generated = False
+        self._coalescing = coalescing
 
         self.request = request
 
+        # Heartbeats keep idle SSE connections alive,
+        # so they are pointless for block responses.
+        if not heartbeat_interval or not self.stream:
+            self._heartbeat = None
+        elif heartbeat_wheel is not None:
+            self._heartbeat = heartbeat_wheel.create_timer(
+                heartbeat_interval, self._on_idle
+            )
+        else:
+            self._heartbeat = HeartbeatTimer(heartbeat_interval, self._on_idle)
+
         self._default_chunk = DefaultChunk(
             id=str(uuid4()),
             created=int(time()),
@@ -71,6 +133,10 @@ class Response:
     def stream(self) -> int:
         return self.request.stream
 
+    @property
+    def queue_metrics(self) -> QueueMetrics:
+        return self._queue.metrics
+
     async def _run_producer(self, producer: _Producer):
         try:
             await producer(self.request, self)
@@ -85,14 +151,84 @@ class Response:
         else:
             self._queue.put_nowait(EndChunk())
 
-    async def _generate_stream(self, producer: _Producer) -> ResponseStream:
-        async with CancelScope() as cs:
-            cs.create_task(self._run_producer(producer))
+    def _on_deadline(self) -> None:
+        log_error("The request deadline has been exceeded")
+        self._queue.put_nowait(
+            ExceptionChunk(
+                DeadlineExceededError("The request deadline has been exceeded")
+            )
+        )
+
+    async def _cancel_on_disconnect(
+        self,
+        watcher: DisconnectWatcher,
+        cs: CancelScope,
+        producer_task: asyncio.Task,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
 
-            async for chunk in self._generate_chunk_stream():
-                yield chunk
+        await watcher.wait()
 
-    async def _generate_chunk_stream(self) -> ResponseStream:
+        # There is nothing to cancel
+        if producer_task.done() or cs.timed_out:
+            return
+
+        log_info("The client has disconnected, cancelling the request")
+        cs.cancel()
+        watcher.on_cancelled(loop.time() - started)
+        self._queue.put_nowait(
+            ExceptionChunk(
+                DIALException(
+                    message="The client has disconnected",
+                    status_code=_CLIENT_CLOSED_REQUEST,
+                    type="client_disconnected",
+                )
+            )
+        )
+
+    def _on_idle(self) -> None:
+        # The consumer is busy with the pending chunks otherwise
+        if self._queue.empty():
+            self._queue.put_nowait(HeartbeatChunk())
+
+    async def _generate_stream(
+        self,
+        producer: _Producer,
+        *,
+        disconnect_watcher: Optional[DisconnectWatcher] = None,
+    ) -> ResponseStreamWithBytes:
+        remaining_time = self.request.remaining_time()
+        watcher_task: Optional[asyncio.Task] = None
+
+        async with CancelScope(
+            timeout=remaining_time, on_timeout=self._on_deadline
+        ) as cs:
+            # No point in starting the producer past the deadline
+            if remaining_time == 0:
+                self._on_deadline()
+            else:
+                producer_task = cs.create_task(self._run_producer(producer))
+                if disconnect_watcher is not None:
+                    watcher_task = asyncio.create_task(
+                        self._cancel_on_disconnect(
+                            disconnect_watcher, cs, producer_task
+                        )
+                    )
+
+            if self._heartbeat is not None:
+                self._heartbeat.start()
+
+            try:
+                async for chunk in self._generate_chunk_stream():
+                    yield chunk
+            finally:
+                if watcher_task is not None:
+                    watcher_task.cancel()
+                if self._heartbeat is not None:
+                    self._heartbeat.stop()
+
+    async def _generate_chunk_stream(self) -> ResponseStreamWithBytes:
         def _create_chunk(chunk: BaseChunk):
             return BaseChunkWithDefaults(
                 chunk=chunk, defaults=self._default_chunk
@@ -101,10 +237,7 @@ class Response:
         # A list of chunks whose emitting is delayed up until the very last moment
         delayed_chunks: List[BaseChunk] = []
 
-        while True:
-            chunk = await self._queue.get()
-            self._queue.task_done()
-
+        async for chunk in self._receive_chunks():
             if isinstance(chunk, BaseChunk):
 
                 is_last_end_choice_chunk = (
@@ -128,7 +261,9 @@ class Response:
 
             elif isinstance(chunk, (ExceptionChunk, EndChunk)):
                 if delayed_chunks:
-                    final_chunk = merge(*[d.to_dict() for d in delayed_chunks])
+                    final_chunk = merge(
+                        *[d.to_dict() for d in delayed_chunks], owned=True
+                    )
                     yield _create_chunk(ArbitraryChunk(chunk=final_chunk))
 
                 if isinstance(chunk, ExceptionChunk):
@@ -142,16 +277,96 @@ class Response:
 
                 return
 
+            elif isinstance(chunk, HeartbeatChunk):
+                log_debug("heartbeat")
+                yield HEARTBEAT_FRAME
+
             else:
                 assert_never(chunk)
 
+    def _receive_chunks(self) -> AsyncIterator[_QueueItem]:
+        # Coalescing reduces the number of SSE frames,
+        # so it's pointless for block responses.
+        if self._coalescing is not None and self.stream:
+            return self._receive_coalesced_chunks(self._coalescing)
+        return self._receive_all_chunks()
+
+    async def _receive_all_chunks(self) -> AsyncIterator[_QueueItem]:
+        heartbeat = self._heartbeat
+
+        while True:
+            await self._queue.wait()
+            if heartbeat is not None:
+                heartbeat.touch()
+
+            # All the chunks generated since the last wake-up
+            # are handed over at once.
+            for chunk in self._queue.drain():
+                self._queue.task_done()
+                yield chunk
+
+    async def _receive_coalesced_chunks(
+        self, config: CoalescingConfig
+    ) -> AsyncIterator[_QueueItem]:
+        loop = asyncio.get_running_loop()
+        heartbeat = self._heartbeat
+        coalescer: Optional[ChunkCoalescer] = None
+
+        def _flush(coalescer: ChunkCoalescer) -> BaseChunk:
+            # The merged chunks are marked as done only once they are emitted,
+            # so that aflush() waits for the held back deltas as well.
+            for _ in range(coalescer.count):
+                self._queue.task_done()
+            return coalescer.flush()
+
+        while True:
+            if coalescer is not None and coalescer.full:
+                yield _flush(coalescer)
+                coalescer = None
+
+            if coalescer is None:
+                chunk = await self._queue.get()
+                if heartbeat is not None:
+                    heartbeat.touch()
+            else:
+                timeout = coalescer.deadline - loop.time()
+                if self._queue.empty() and (
+                    timeout <= 0 or not await self._queue.wait(timeout)
+                ):
+                    yield _flush(coalescer)
+                    coalescer = None
+                    continue
+
+                chunk = self._queue.get_nowait()
+
+                if isinstance(chunk, BaseChunk) and coalescer.add(chunk):
+                    continue
+
+                yield _flush(coalescer)
+                coalescer = None
+
+            if isinstance(chunk, BaseChunk) and ChunkCoalescer.is_coalescible(
+                chunk
+            ):
+                coalescer = ChunkCoalescer(
+                    chunk,
+                    deadline=loop.time() + config.max_delay,
+                    max_bytes=config.max_bytes,
+                )
+            else:
+                self._queue.task_done()
+                yield chunk
+
     def create_choice(self) -> Choice:
+        return self._create_choice(self._queue)
+
+    def _create_choice(self, queue: ChunkQueue) -> Choice:
         self._generation_started = True
 
         if self._last_choice_index >= self.n:
             raise runtime_error("Trying to generate more chunks than requested")
 
-        choice = Choice(self._queue, self._last_choice_index)
+        choice = Choice(queue, self._last_choice_index)
         self._last_choice_index += 1
 
         return choice
@@ -168,6 +383,76 @@ class Response:
 
         return self.create_choice()
 
+    async def agenerate_choices(
+        self,
+        fn: Callable[[Choice], Awaitable[None]],
+        *,
+        concurrency: Optional[int] = None,
+    ) -> None:
+        """
+        Generates all the remaining choices concurrently.
+
+        `fn` is called once per choice with the choice already open
+        and the choice is closed once `fn` returns.
+        At most `concurrency` choices are generated at the same time
+        (all of them by default).
+        The chunks of different choices are interleaved, so none of
+        the choices can hold the stream while another one waits
+        for its upstream. The chunks the choices produce while the client
+        is busy are sent one chunk per choice in turn,
+        so a choice producing chunks in bursts doesn't delay the others.
+        The backpressure limits apply to each choice separately.
+
+        If any of the choices fails, the others are cancelled
+        and the first error raised is re-raised.
+        """
+
+        if concurrency is not None and concurrency < 1:
+            raise runtime_error("Concurrency must be a positive number")
+
+        if self._last_choice_index == self.n:
+            return
+
+        forwarder = RoundRobinForwarder(self._queue, self._backpressure)
+        choices = [
+            self._create_choice(forwarder.create_queue())
+            for _ in range(self._last_choice_index, self.n)
+        ]
+
+        semaphore = asyncio.Semaphore(concurrency or len(choices))
+        errors: List[BaseException] = []
+
+        async def _generate(choice: Choice) -> None:
+            async with semaphore:
+                with choice:
+                    await fn(choice)
+
+        def _on_done(task: asyncio.Task) -> None:
+            if not task.cancelled():
+                error = task.exception()
+                if error is not None:
+                    errors.append(error)
+
+        self._forwarder = forwarder
+        forwarding = asyncio.create_task(forwarder.run())
+        try:
+            async with CancelScope() as cs:
+                for choice in choices:
+                    cs.create_task(_generate(choice)).add_done_callback(
+                        _on_done
+                    )
+
+            # The chunks produced by now are forwarded before returning
+            forwarder.close()
+            await forwarding
+        finally:
+            forwarding.cancel()
+            self._forwarder = None
+
+        # The other choices may fail while being cancelled
+        if errors:
+            raise errors[0]
+
     def add_usage_per_model(
         self, model: str, prompt_tokens: int = 0, completion_tokens: int = 0
     ):
@@ -215,6 +500,8 @@ class Response:
         self._queue.put_nowait(UsageChunk(prompt_tokens, completion_tokens))
 
     async def aflush(self):
+        if self._forwarder is not None:
+            await self._forwarder.join()
         await self._queue.join()
 
     def set_created(self, created: int):
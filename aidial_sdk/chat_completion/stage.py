@@ -1,7 +1,7 @@
 from types import TracebackType
 from typing import Optional, Type, overload
 
-from aidial_sdk.chat_completion._types import ChunkQueue
+from aidial_sdk.chat_completion.backpressure import ChunkQueue
 from aidial_sdk.chat_completion.chunks import (
     AttachmentStageChunk,
     ContentStageChunk,
@@ -12,7 +12,7 @@ from aidial_sdk.chat_completion.chunks import (
 from aidial_sdk.chat_completion.enums import Status
 from aidial_sdk.chat_completion.request import Attachment
 from aidial_sdk.pydantic_v1 import ValidationError
-from aidial_sdk.utils._attachment import create_attachment
+from aidial_sdk.utils._attachment import create_attachment, validate_attachment
 from aidial_sdk.utils._content_stream import ContentStream
 from aidial_sdk.utils.errors import runtime_error
 
@@ -60,14 +60,22 @@ class Stage:
         return False
 
     def append_content(self, content: str):
+        self._queue.put_nowait(self._create_content_chunk(content))
+
+    async def aappend_content(self, content: str):
+        """
+        Waits until the client catches up if the chunk queue is full.
+        """
+
+        await self._queue.put(self._create_content_chunk(content))
+
+    def _create_content_chunk(self, content: str) -> ContentStageChunk:
         if not self._opened:
             raise runtime_error("Trying to append content to an unopened stage")
         if self._closed:
             raise runtime_error("Trying to append content to a closed stage")
 
-        self._queue.put_nowait(
-            ContentStageChunk(self._choice_index, self._stage_index, content)
-        )
+        return ContentStageChunk(self._choice_index, self._stage_index, content)
 
     @property
     def content_stream(self) -> ContentStream:
@@ -98,24 +106,56 @@ class Stage:
     ) -> None: ...
 
     def add_attachment(self, *args, **kwargs) -> None:
+        """
+        Never waits for the client, so the attachment is buffered even
+        if the chunk queue is full. Prefer `aadd_attachment`
+        when the backpressure is configured.
+        """
+
+        self._queue.put_nowait(self._create_attachment_chunk(*args, **kwargs))
+
+    @overload
+    async def aadd_attachment(self, attachment: Attachment) -> None: ...
+
+    @overload
+    async def aadd_attachment(
+        self,
+        type: Optional[str] = None,
+        title: Optional[str] = None,
+        data: Optional[str] = None,
+        url: Optional[str] = None,
+        reference_url: Optional[str] = None,
+        reference_type: Optional[str] = None,
+    ) -> None: ...
+
+    async def aadd_attachment(self, *args, **kwargs) -> None:
+        await self._queue.put(self._create_attachment_chunk(*args, **kwargs))
+
+    def _create_attachment_chunk(self, *args, **kwargs) -> AttachmentStageChunk:
         if not self._opened:
             raise runtime_error("Trying to add attachment to an unopened stage")
         if self._closed:
             raise runtime_error("Trying to add attachment to a closed stage")
 
-        attachment_stage_chunk = None
         try:
-            attachment_stage_chunk = AttachmentStageChunk(
-                choice_index=self._choice_index,
-                stage_index=self._stage_index,
-                attachment_index=self._last_attachment_index,
-                **create_attachment(*args, **kwargs).dict(),
-            )
+            attachment = validate_attachment(create_attachment(*args, **kwargs))
         except ValidationError as e:
             raise runtime_error(e.errors()[0]["msg"])
 
-        self._queue.put_nowait(attachment_stage_chunk)
+        attachment_stage_chunk = AttachmentStageChunk(
+            choice_index=self._choice_index,
+            stage_index=self._stage_index,
+            attachment_index=self._last_attachment_index,
+            type=attachment.type,
+            title=attachment.title,
+            data=attachment.data,
+            url=attachment.url,
+            reference_url=attachment.reference_url,
+            reference_type=attachment.reference_type,
+        )
+
         self._last_attachment_index += 1
+        return attachment_stage_chunk
 
     def open(self):
         if self._opened:
@@ -1,16 +1,26 @@
+import json
+import math
 from abc import ABC, abstractmethod
-from json import JSONDecodeError
+from time import time
 from typing import Any, Mapping, Optional, Type, TypeVar
 
 import fastapi
 from pydantic import Field
 
 from aidial_sdk.exceptions import HTTPException as DIALException
-from aidial_sdk.pydantic_v1 import SecretStr, StrictStr, root_validator
+from aidial_sdk.exceptions import RequestTooLargeError
+from aidial_sdk.pydantic_v1 import (
+    PrivateAttr,
+    SecretStr,
+    StrictStr,
+    root_validator,
+)
 from aidial_sdk.utils.pydantic import ExtraForbidModel
 
 T = TypeVar("T", bound="FromRequestMixin")
 
+DEADLINE_HEADER = "X-DIAL-Deadline"
+
 
 class FromRequestMixin(ABC, ExtraForbidModel):
     @classmethod
@@ -46,6 +56,8 @@ class FromRequestDeploymentMixin(FromRequestMixin):
 
     original_request: fastapi.Request = Field(..., exclude=True)
 
+    _deadline: Optional[float] = PrivateAttr(None)
+
     class Config:
         arbitrary_types_allowed = True
 
@@ -75,8 +87,43 @@ class FromRequestDeploymentMixin(FromRequestMixin):
     def jwt(self) -> Optional[str]:
         return self.jwt_secret.get_secret_value() if self.jwt_secret else None
 
+    @property
+    def deadline(self) -> Optional[float]:
+        """
+        The Unix timestamp in seconds by which the request must be completed
+        """
+
+        return self._deadline
+
+    def remaining_time(self) -> Optional[float]:
+        """
+        The number of seconds left until the deadline
+        or None if the request has no deadline
+        """
+
+        if self._deadline is None:
+            return None
+        return max(self._deadline - time(), 0.0)
+
+    def _limit_deadline(self, timeout: float) -> None:
+        deadline = time() + timeout
+        if self._deadline is None or deadline < self._deadline:
+            self._deadline = deadline
+
     @classmethod
-    async def from_request(cls, request: fastapi.Request, deployment_id: str):
+    async def from_request(
+        cls,
+        request: fastapi.Request,
+        deployment_id: str,
+        *,
+        fast_validation: bool = False,
+        max_body_size: Optional[int] = None,
+    ):
+        if max_body_size is not None:
+            # The body is cached on the request, so get_request_body
+            # doesn't read it again
+            await _get_request_json_body(request, max_body_size)
+
         headers = request.headers.mutablecopy()
 
         api_key = headers.get("Api-Key")
@@ -91,8 +138,11 @@ class FromRequestDeploymentMixin(FromRequestMixin):
         jwt = headers.get("Authorization")
         del headers["Authorization"]
 
-        return cls(
-            **(await cls.get_request_body(request)),
+        deadline = _parse_deadline(headers.get(DEADLINE_HEADER))
+
+        ret = cls._from_body(
+            await cls.get_request_body(request),
+            fast_validation=fast_validation,
             api_key_secret=SecretStr(api_key),
             jwt_secret=SecretStr(jwt) if jwt else None,
             deployment_id=deployment_id,
@@ -100,18 +150,96 @@ class FromRequestDeploymentMixin(FromRequestMixin):
             headers=headers,
             original_request=request,
         )
+        ret._deadline = deadline
+        return ret
+
+    @classmethod
+    def _from_body(cls, body: dict, *, fast_validation: bool, **fields):
+        """
+        The requests could skip the validation of the parts of the body
+        known to be valid if `fast_validation` is enabled
+        """
+
+        return cls(**body, **fields)
 
     @staticmethod
     async def get_request_body(request: fastapi.Request) -> dict:
         return await _get_request_json_body(request)
 
 
-async def _get_request_json_body(request: fastapi.Request) -> dict:
+def _parse_deadline(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+
     try:
-        return await request.json()
-    except JSONDecodeError as e:
+        deadline = float(value)
+    except ValueError:
+        deadline = math.nan
+
+    if not math.isfinite(deadline):
         raise DIALException(
             status_code=400,
             type="invalid_request_error",
-            message=f"The request body isn't valid JSON: {e.msg}",
+            message=f"{DEADLINE_HEADER} header must be a Unix timestamp in seconds",
         )
+
+    return deadline
+
+
+async def _get_request_json_body(
+    request: fastapi.Request, max_body_size: Optional[int] = None
+) -> dict:
+    if max_body_size is not None:
+        await _check_request_size(request, max_body_size)
+
+    try:
+        return await request.json()
+    except UnicodeDecodeError as e:
+        raise _invalid_json_error(e.reason)
+    except json.JSONDecodeError as e:
+        raise _invalid_json_error(e.msg)
+
+
+async def _check_request_size(
+    request: fastapi.Request, max_body_size: int
+) -> None:
+    """
+    Rejects the body exceeding `max_body_size` before it's read as a whole.
+    The size is taken from the Content-Length header if it's present,
+    otherwise the body is counted while being read.
+    """
+
+    if hasattr(request, "_body"):
+        _check_body_size(len(await request.body()), max_body_size)
+        return
+
+    content_length = request.headers.get("Content-Length")
+    if content_length and content_length.isdigit():
+        _check_body_size(int(content_length), max_body_size)
+        return
+
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        chunks.append(chunk)
+        size += len(chunk)
+        _check_body_size(size, max_body_size)
+
+    # The stream is consumed, so the body is cached
+    # where request.body() looks for it
+    setattr(request, "_body", b"".join(chunks))
+
+
+def _check_body_size(size: int, max_body_size: int) -> None:
+    if size > max_body_size:
+        raise RequestTooLargeError(
+            f"The request body exceeds the maximum size of {max_body_size} bytes"
+        )
+
+
+def _invalid_json_error(reason: str) -> DIALException:
+    return DIALException(
+        status_code=400,
+        type="invalid_request_error",
+        message=f"The request body isn't valid JSON: {reason}",
+    )
@@ -6,7 +6,12 @@ from typing import Dict, Optional
 from fastapi import HTTPException as FastAPIException
 from fastapi.responses import JSONResponse
 
-from aidial_sdk.utils.json import remove_nones
+from aidial_sdk.utils.json import (
+    STDLIB_JSON_SERIALIZER,
+    JSONSerializer,
+    SerializedJSONResponse,
+    remove_nones,
+)
 
 
 class HTTPException(Exception):
@@ -60,11 +65,14 @@ class HTTPException(Exception):
             )
         }
 
-    def to_fastapi_response(self) -> JSONResponse:
-        return JSONResponse(
+    def to_fastapi_response(
+        self, serializer: JSONSerializer = STDLIB_JSON_SERIALIZER
+    ) -> JSONResponse:
+        return SerializedJSONResponse(
             status_code=self.status_code,
             content=self.json_error(),
             headers=self.headers,
+            serializer=serializer,
         )
 
     def to_fastapi_exception(self) -> FastAPIException:
@@ -194,6 +202,50 @@ class InternalServerError(HTTPException):
         )
 
 
+class DeadlineExceededError(HTTPException):
+    """
+    Thrown when the request isn't completed before its deadline
+    """
+
+    def __init__(self, message: str, **kwargs) -> None:
+        return super().__init__(
+            status_code=HTTPStatus.GATEWAY_TIMEOUT,
+            type="timeout_error",
+            code="deadline_exceeded",
+            message=message,
+            **kwargs,
+        )
+
+
+class TooManyRequestsError(HTTPException):
+    """
+    Thrown when the deployment is overloaded
+    """
+
+    def __init__(self, message: str, **kwargs) -> None:
+        return super().__init__(
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            type="rate_limit_error",
+            message=message,
+            **kwargs,
+        )
+
+
+class RequestTooLargeError(HTTPException):
+    """
+    Thrown when the request body exceeds the maximum allowed size
+    """
+
+    def __init__(self, message: str, **kwargs) -> None:
+        return super().__init__(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            type="invalid_request_error",
+            code="request_too_large",
+            message=message,
+            **kwargs,
+        )
+
+
 def _deprecated(ctor):
     @functools.wraps(ctor)
     def wrapped(*args, **kwargs):
@@ -31,6 +31,7 @@ class HeaderPropagator:
     _dial_url: str
     _api_key: ContextVar[Optional[str]]
     _enabled: bool
+    _capturing: bool
 
     def __init__(self, app: FastAPI, dial_url: str):
         self._app = app
@@ -41,12 +42,32 @@ class HeaderPropagator:
         )
 
         self._enabled = False
+        self._capturing = False
+
+    def get_api_key(self) -> Optional[str]:
+        """
+        The API key of the request being handled
+        """
+
+        return self._api_key.get()
+
+    def capture_api_key(self):
+        """
+        Makes the API key of the request being handled available
+        via `get_api_key` without propagating it to the outgoing requests
+        """
+
+        if self._capturing:
+            return
+
+        self._instrument_fast_api(self._app)
+        self._capturing = True
 
     def enable(self):
         if self._enabled:
             return
 
-        self._instrument_fast_api(self._app)
+        self.capture_api_key()
         self._instrument_aiohttp()
         self._instrument_httpx()
         self._instrument_requests()
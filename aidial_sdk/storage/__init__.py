@@ -0,0 +1,5 @@
+from aidial_sdk.storage.client import (
+    BucketMetadata,
+    FileMetadata,
+    StorageClient,
+)
@@ -0,0 +1,328 @@
+import asyncio
+import hashlib
+import posixpath
+import uuid
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from aidial_sdk.pydantic_v1 import BaseModel, Field
+from aidial_sdk.utils._attachment import AttachmentContent, iter_bytes
+from aidial_sdk.utils._cache import AsyncTTLCache
+from aidial_sdk.utils.errors import runtime_error
+
+if TYPE_CHECKING:
+    import httpx
+
+ApiKeyGetter = Callable[[], Optional[str]]
+
+CHUNK_SIZE = 64 * 1024
+
+
+class FileMetadata(BaseModel):
+    """The metadata of a file in DIAL storage"""
+
+    """The name of the file"""
+    name: str
+
+    """The bucket the file is stored in"""
+    bucket: str
+
+    """The URL of the file relative to the DIAL API, e.g. `files/<bucket>/<path>`"""
+    url: str
+
+    """The size of the file in bytes"""
+    content_length: Optional[int] = Field(None, alias="contentLength")
+
+    """The MIME type of the file"""
+    content_type: Optional[str] = Field(None, alias="contentType")
+
+    class Config:
+        extra = "allow"
+        allow_population_by_field_name = True
+
+
+class BucketMetadata(BaseModel):
+    """The buckets available to an API key"""
+
+    """The bucket of the API key owner"""
+    bucket: str
+
+    """The bucket of the application data, present for the application keys"""
+    appdata: Optional[str] = None
+
+    class Config:
+        extra = "allow"
+
+
+class StorageClient:
+    """
+    An async client of the DIAL file storage.
+    Requires the `storage` extras: aidial-sdk[storage].
+
+    The HTTP connections are pooled across the requests.
+    The bucket metadata is cached per API key, which is stored
+    as its SHA-256 hash, for `bucket_ttl` seconds.
+    Once the cache holds `max_cached_keys` API keys,
+    the least recently used one is evicted.
+    The concurrent requests of the metadata for the same key
+    are coalesced into a single request to DIAL.
+
+    The API key could be passed to every method explicitly.
+    Otherwise, it's taken from `get_api_key`. The client created
+    by DIALApp with `dial_url` gets the API key of the current request,
+    which DIALApp captures whether or not the propagation
+    of auth headers is enabled.
+    """
+
+    dial_url: str
+
+    _get_api_key: Optional[ApiKeyGetter]
+    _client: Optional["httpx.AsyncClient"]
+    _loop: Optional[asyncio.AbstractEventLoop]
+    _buckets: AsyncTTLCache[str, BucketMetadata]
+
+    def __init__(
+        self,
+        dial_url: str,
+        *,
+        bucket_ttl: float = 300.0,
+        max_cached_keys: int = 1024,
+        get_api_key: Optional[ApiKeyGetter] = None,
+    ) -> None:
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            raise ValueError(
+                "Missing storage dependencies. "
+                "Install the package with the extras: aidial-sdk[storage]"
+            )
+
+        self.dial_url = dial_url.rstrip("/")
+
+        self._get_api_key = get_api_key
+        self._client = None
+        self._loop = None
+        self._buckets = AsyncTTLCache(bucket_ttl, max_cached_keys)
+
+    async def get_bucket_metadata(
+        self, api_key: Optional[str] = None
+    ) -> BucketMetadata:
+        headers = self._get_headers(api_key)
+
+        async def _load() -> BucketMetadata:
+            response = await self._get_client().get(
+                "/v1/bucket", headers=headers
+            )
+            response.raise_for_status()
+            return BucketMetadata.parse_obj(response.json())
+
+        # The API keys aren't kept in memory
+        key = hashlib.sha256(headers["api-key"].encode()).hexdigest()
+        return await self._buckets.get_or_load(key, _load)
+
+    async def get_appdata_bucket(self, api_key: Optional[str] = None) -> str:
+        metadata = await self.get_bucket_metadata(api_key)
+        if metadata.appdata is None:
+            raise runtime_error("The API key doesn't have an appdata bucket")
+        return metadata.appdata
+
+    async def upload(
+        self,
+        path: str,
+        content: AttachmentContent,
+        *,
+        content_type: str = "application/octet-stream",
+        bucket: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> FileMetadata:
+        """
+        Uploads the content read from bytes, a binary file or
+        a (async) iterable of bytes to the given path in the bucket,
+        which defaults to the appdata bucket.
+        The content is streamed as a multipart form.
+        """
+
+        headers = self._get_headers(api_key)
+        if bucket is None:
+            bucket = await self.get_appdata_bucket(headers["api-key"])
+
+        boundary = uuid.uuid4().hex
+        headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+
+        response = await self._get_client().put(
+            f"/v1/files/{bucket}/{quote(path)}",
+            content=_multipart_form(
+                boundary, posixpath.basename(path), content_type, content
+            ),
+            headers=headers,
+        )
+        response.raise_for_status()
+
+        return FileMetadata.parse_obj(response.json())
+
+    async def download(
+        self,
+        url: str,
+        *,
+        offset: int = 0,
+        length: Optional[int] = None,
+        api_key: Optional[str] = None,
+    ) -> bytes:
+        """
+        Downloads the file or its range of bytes.
+        See `stream` for the supported URLs.
+        """
+
+        chunks = [
+            chunk
+            async for chunk in self.stream(
+                url, offset=offset, length=length, api_key=api_key
+            )
+        ]
+        return b"".join(chunks)
+
+    async def stream(
+        self,
+        url: str,
+        *,
+        offset: int = 0,
+        length: Optional[int] = None,
+        api_key: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Streams the file or its range of bytes.
+
+        The URL is either relative to the DIAL API, e.g. `files/<bucket>/<path>`,
+        or absolute. The API key is only sent to the DIAL origin,
+        the other absolute URLs are treated as external resources.
+        """
+
+        if offset < 0 or (length is not None and length < 0):
+            raise runtime_error("The range offset and length must be positive")
+        if length == 0:
+            return
+
+        if is_relative_url(url):
+            url = f"/v1/{url}"
+            headers = self._get_headers(api_key)
+        elif self._is_dial_url(url):
+            headers = self._get_headers(api_key)
+        else:
+            headers = {}
+
+        ranged = offset > 0 or length is not None
+        if ranged:
+            end = "" if length is None else str(offset + length - 1)
+            headers["Range"] = f"bytes={offset}-{end}"
+
+        async with self._get_client().stream(
+            "GET", url, headers=headers
+        ) as response:
+            response.raise_for_status()
+
+            chunks = response.aiter_bytes(CHUNK_SIZE)
+            # The server may ignore the range and send the whole file
+            if ranged and response.status_code != 206:
+                chunks = _slice(chunks, offset, length)
+
+            async for chunk in chunks:
+                yield chunk
+
+    async def aclose(self) -> None:
+        if self._client is None:
+            return
+
+        if self._loop is not asyncio.get_running_loop():
+            self._close_stale_client()
+            return
+
+        client, self._client, self._loop = self._client, None, None
+        await client.aclose()
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        # The connections of another event loop can't be reused
+        if self._client is not None and self._loop is not loop:
+            self._close_stale_client()
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(base_url=self.dial_url)
+            self._loop = loop
+
+        return self._client
+
+    def _close_stale_client(self) -> None:
+        client, loop = self._client, self._loop
+        self._client = self._loop = None
+
+        # The client could only be closed on its own loop.
+        # The connections of a closed loop are already unusable.
+        if client is not None and loop is not None and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+    def _is_dial_url(self, url: str) -> bool:
+        return _get_origin(url) == _get_origin(self.dial_url)
+
+    def _get_headers(self, api_key: Optional[str]) -> Dict[str, str]:
+        if api_key is None and self._get_api_key is not None:
+            api_key = self._get_api_key()
+        if api_key is None:
+            raise runtime_error(
+                "The API key is required to access DIAL storage"
+            )
+        return {"api-key": api_key}
+
+
+def is_relative_url(url: str) -> bool:
+    """
+    Relative URLs point to the DIAL file storage,
+    absolute ones point to external resources
+    """
+
+    parts = urlsplit(url)
+    return not parts.scheme and not parts.netloc and not url.startswith("/")
+
+
+def _get_origin(url: str) -> Tuple[str, str, Optional[int]]:
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    port = parts.port or {"http": 80, "https": 443}.get(scheme)
+    return scheme, (parts.hostname or "").lower(), port
+
+
+async def _multipart_form(
+    boundary: str,
+    filename: str,
+    content_type: str,
+    content: AttachmentContent,
+) -> AsyncIterator[bytes]:
+    filename = filename.replace('"', "%22")
+    yield (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode()
+
+    async for data in iter_bytes(content, CHUNK_SIZE):
+        yield bytes(data)
+
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+
+async def _slice(
+    chunks: AsyncIterator[bytes], offset: int, length: Optional[int]
+) -> AsyncIterator[bytes]:
+    position = 0
+    end = None if length is None else offset + length
+
+    async for chunk in chunks:
+        start = max(offset - position, 0)
+        stop = len(chunk) if end is None else min(end - position, len(chunk))
+        position += len(chunk)
+
+        if start < stop:
+            yield chunk[start:stop]
+        if end is not None and position >= end:
+            break
@@ -1,6 +1,18 @@
-from typing import Optional, cast, overload
+import asyncio
+import base64
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    BinaryIO,
+    Iterable,
+    Optional,
+    Union,
+    cast,
+    overload,
+)
 
 from aidial_sdk.chat_completion.request import Attachment
+from aidial_sdk.utils.errors import runtime_error
 
 
 @overload
@@ -43,3 +55,73 @@ def _attachment_from_fields(
         reference_url=reference_url,
         reference_type=reference_type,
     )
+
+
+def validate_attachment(attachment: Attachment) -> Attachment:
+    if attachment.data is None and attachment.url is None:
+        raise runtime_error("Trying to add attachment without data and url")
+    if attachment.data is not None and attachment.url is not None:
+        raise runtime_error("Trying to add attachment with data and url")
+    return attachment
+
+
+AttachmentContent = Union[
+    bytes, BinaryIO, Iterable[bytes], AsyncIterable[bytes]
+]
+
+# 64 KiB of base64
+DEFAULT_PIECE_SIZE = 48 * 1024
+
+
+def iter_base64_pieces(
+    content: AttachmentContent, piece_size: int
+) -> AsyncIterator[str]:
+    """
+    Encodes the content to base64 piece by piece.
+    Every piece but the last one encodes exactly `piece_size` bytes,
+    which is a multiple of 3, so the concatenated pieces
+    are the base64 of the whole content.
+    """
+
+    if piece_size <= 0 or piece_size % 3 != 0:
+        raise runtime_error("The piece size must be a positive multiple of 3")
+
+    return _iter_base64_pieces(content, piece_size)
+
+
+async def _iter_base64_pieces(
+    content: AttachmentContent, piece_size: int
+) -> AsyncIterator[str]:
+    pending = b""
+    async for data in iter_bytes(content, piece_size):
+        if pending:
+            data = pending + data
+
+        end = len(data) - len(data) % piece_size
+        view = memoryview(data)
+        for offset in range(0, end, piece_size):
+            yield base64.b64encode(view[offset : offset + piece_size]).decode()
+        pending = bytes(view[end:])
+
+    if pending:
+        yield base64.b64encode(pending).decode()
+
+
+async def iter_bytes(
+    content: AttachmentContent, read_size: int
+) -> AsyncIterator[bytes]:
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        yield content
+    elif hasattr(content, "read"):
+        file = cast(BinaryIO, content)
+        while data := file.read(read_size):
+            yield data
+            # Lets the response consumer run between the blocking reads
+            await asyncio.sleep(0)
+    elif hasattr(content, "__aiter__"):
+        async for data in cast(AsyncIterable[bytes], content):
+            yield data
+    else:
+        for data in cast(Iterable[bytes], content):
+            yield data
+            await asyncio.sleep(0)
@@ -0,0 +1,211 @@
+from typing import Any, Dict, Optional
+
+from aidial_sdk.chat_completion.chunks import (
+    AttachmentChunk,
+    AttachmentStageChunk,
+    BaseChunk,
+    BaseChunkWithDefaults,
+    ContentChunk,
+    ContentStageChunk,
+    FunctionCallChunk,
+    FunctionToolCallChunk,
+)
+from aidial_sdk.utils.merge_chunks import (
+    IndexedLists,
+    StrBuffers,
+    cleanup_indices,
+    merge_recursive,
+)
+
+
+def _is_str(container: dict, key: str) -> bool:
+    return isinstance(container.get(key), str)
+
+
+def _get_dict(container: Optional[dict], key: str) -> Optional[dict]:
+    value = None if container is None else container.get(key)
+    return value if isinstance(value, dict) else None
+
+
+def _get_list(container: Optional[dict], key: str) -> Optional[list]:
+    value = None if container is None else container.get(key)
+    return value if isinstance(value, list) else None
+
+
+def _get_indexed(xs: Optional[list], index: int) -> Optional[dict]:
+    elem = xs[index] if xs is not None and index < len(xs) else None
+    return elem if isinstance(elem, dict) else None
+
+
+def _append_indexed(xs: list, elem: dict) -> bool:
+    index = elem["index"]
+    if index < len(xs):
+        return False
+    if xs and not (isinstance(xs[-1], dict) and "index" in xs[-1]):
+        return False
+
+    xs.extend({"index": idx} for idx in range(len(xs), index))
+    xs.append(elem)
+    return True
+
+
+class BlockResponseAccumulator:
+    """
+    Builds a chat completion response from the chunks without converting
+    each chunk to a dictionary and merging it into the response.
+
+    The frequent chunks (content, arguments and attachments) are applied
+    directly to the response under construction: the string deltas are
+    buffered and joined once, the attachments are put into their slots.
+    The rest of the chunks fall back to the generic merging procedure,
+    so the result is identical to merging of the chunk dictionaries.
+    """
+
+    _response: Optional[Dict[str, Any]]
+    _buffers: StrBuffers
+    _indexed_lists: IndexedLists
+
+    def __init__(self) -> None:
+        self._response = None
+        self._buffers = StrBuffers()
+        self._indexed_lists = IndexedLists()
+
+    def add(self, chunk: BaseChunkWithDefaults) -> None:
+        if self._response is None:
+            self._response = chunk.to_dict(with_defaults=True)
+        elif not self._add_directly(self._response, chunk.chunk):
+            # The generic merging shares the string buffers,
+            # so the buffered fields don't need to be flushed beforehand.
+            # The chunk dictionary is freshly built, so it's merged without
+            # copying. The user-provided values (e.g. state) don't end up
+            # in the result as is, since it's rebuilt by cleanup_indices.
+            self._response = merge_recursive(
+                self._response,
+                chunk.to_dict(with_defaults=False),
+                [],
+                self._buffers,
+                self._indexed_lists,
+                owned=True,
+            )
+
+    def finalize(self) -> Dict[str, Any]:
+        self._buffers.flush()
+
+        response = self._response or {}
+        for choice in response["choices"]:
+            choice["message"] = cleanup_indices(choice["delta"])
+            del choice["delta"]
+
+        return response
+
+    def _add_directly(self, response: dict, chunk: BaseChunk) -> bool:
+        """
+        Returns False if the chunk should be merged in the generic way.
+        """
+
+        if isinstance(chunk, ContentChunk):
+            delta = _get_delta(response, chunk.choice_index)
+            if delta is not None and _is_str(delta, "content"):
+                self._buffers.append(delta, "content", chunk.content)
+                return True
+
+        elif isinstance(chunk, ContentStageChunk):
+            delta = _get_delta(response, chunk.choice_index)
+            stage = _get_stage(delta, chunk.stage_index)
+            if stage is not None and _is_str(stage, "content"):
+                self._buffers.append(stage, "content", chunk.content)
+                return True
+
+        elif isinstance(chunk, FunctionToolCallChunk):
+            if chunk.id is not None or chunk.name is not None:
+                return False
+
+            delta = _get_delta(
+                response, chunk.choice_index, with_finish_reason=False
+            )
+            if delta is None or "content" not in delta:
+                return False
+
+            call = _get_indexed(
+                _get_list(delta, "tool_calls"), chunk.call_index
+            )
+            function = _get_dict(call, "function")
+            if (
+                call is None
+                or function is None
+                or (
+                    chunk.arguments is not None
+                    and not _is_str(function, "arguments")
+                )
+            ):
+                return False
+
+            if chunk.arguments is not None:
+                self._buffers.append(function, "arguments", chunk.arguments)
+            return True
+
+        elif isinstance(chunk, FunctionCallChunk):
+            if chunk.name is not None:
+                return False
+
+            delta = _get_delta(
+                response, chunk.choice_index, with_finish_reason=False
+            )
+            if delta is None or "content" not in delta:
+                return False
+
+            function_call = _get_dict(delta, "function_call")
+            if function_call is None:
+                return False
+
+            if chunk.arguments is not None:
+                if not _is_str(function_call, "arguments"):
+                    return False
+                self._buffers.append(
+                    function_call, "arguments", chunk.arguments
+                )
+            return True
+
+        elif isinstance(chunk, AttachmentStageChunk):
+            delta = _get_delta(response, chunk.choice_index)
+            stage = _get_stage(delta, chunk.stage_index)
+            attachments = _get_list(stage, "attachments")
+            if attachments is not None:
+                return _append_indexed(
+                    attachments, chunk.attachment_dict(chunk.attachment_index)
+                )
+
+        elif isinstance(chunk, AttachmentChunk):
+            delta = _get_delta(response, chunk.choice_index)
+            custom_content = _get_dict(delta, "custom_content")
+            attachments = _get_list(custom_content, "attachments")
+            if attachments is not None:
+                return _append_indexed(
+                    attachments, chunk.attachment_dict(chunk.attachment_index)
+                )
+
+        return False
+
+
+def _get_delta(
+    response: dict, choice_index: int, *, with_finish_reason: bool = True
+) -> Optional[dict]:
+    """
+    Returns the delta of an existing choice if merging a chunk of the choice
+    wouldn't introduce any new fields on the choice and response levels.
+    """
+
+    if "usage" not in response:
+        return None
+
+    choice = _get_indexed(_get_list(response, "choices"), choice_index)
+    if choice is None or (with_finish_reason and "finish_reason" not in choice):
+        return None
+
+    return _get_dict(choice, "delta")
+
+
+def _get_stage(delta: Optional[dict], stage_index: int) -> Optional[dict]:
+    custom_content = _get_dict(delta, "custom_content")
+    stage = _get_indexed(_get_list(custom_content, "stages"), stage_index)
+    return stage if stage is not None and "status" in stage else None
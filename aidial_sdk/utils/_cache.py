@@ -0,0 +1,80 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class AsyncTTLCache(Generic[K, V]):
+    """
+    An in-process cache of the values loaded asynchronously.
+
+    The values expire in `ttl` seconds. Once the cache holds
+    `max_entries` values, the least recently used one is evicted.
+    The concurrent misses of the same key are coalesced,
+    so that the value is loaded only once.
+    The loading errors aren't cached.
+    """
+
+    ttl: float
+    max_entries: int
+
+    _entries: "OrderedDict[K, Tuple[V, float]]"
+    _loading: Dict[K, "asyncio.Future[V]"]
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()
+        self._loading = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(self, key: K, load: Callable[[], Awaitable[V]]) -> V:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        future = self._loading.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key, load))
+            # The error is retrieved even if all the waiters are cancelled
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._loading[key] = future
+
+        # The loading isn't cancelled along with one of the waiters
+        return await asyncio.shield(future)
+
+    async def _load(self, key: K, load: Callable[[], Awaitable[V]]) -> V:
+        try:
+            value = await load()
+            self.set(key, value)
+            return value
+        finally:
+            del self._loading[key]
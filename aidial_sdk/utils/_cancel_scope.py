@@ -1,25 +1,45 @@
 import asyncio
 from asyncio import exceptions
-from typing import Optional, Set
+from typing import Callable, Optional, Set
 
 
 class CancelScope:
     """
     Async context manager that enforces cancellation of all tasks created within its scope when either:
     1. the parent task has been cancelled or has thrown an exception or
-    2. any of the tasks created within the scope has thrown an exception.
+    2. any of the tasks created within the scope has thrown an exception or
+    3. the timeout has expired while some of the tasks are still running.
+       `on_timeout` is called right after the tasks are cancelled.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        on_timeout: Optional[Callable[[], None]] = None,
+    ):
         self._tasks: Set[asyncio.Task] = set()
         self._on_completed_fut: Optional[asyncio.Future] = None
         self._cancelling: bool = False
+        self._timeout = timeout
+        self._on_timeout = on_timeout
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.timed_out: bool = False
 
     async def __aenter__(self):
+        if self._timeout is not None:
+            self._timer = asyncio.get_running_loop().call_later(
+                max(self._timeout, 0), self._expire
+            )
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
+        try:
+            await self._wait_tasks(exc_type, exc)
+        finally:
+            if self._timer is not None:
+                self._timer.cancel()
 
+    async def _wait_tasks(self, exc_type, exc):
         cancelled_error = (
             exc if isinstance(exc, exceptions.CancelledError) else None
         )
@@ -50,6 +70,13 @@ class CancelScope:
         self._tasks.add(task)
         return task
 
+    def cancel(self):
+        """
+        Cancels all the tasks created within the scope
+        """
+
+        self._cancel_tasks()
+
     def _cancel_tasks(self):
         if not self._cancelling:
             self._cancelling = True
@@ -57,6 +84,16 @@ class CancelScope:
                 if not t.done():
                     t.cancel()
 
+    def _expire(self):
+        # There is nothing to time out once all the tasks are done
+        if self._cancelling or all(task.done() for task in self._tasks):
+            return
+
+        self.timed_out = True
+        self._cancel_tasks()
+        if self._on_timeout is not None:
+            self._on_timeout()
+
     def _on_task_done(self, task):
         self._tasks.discard(task)
 
@@ -67,6 +104,7 @@ class CancelScope:
         ):
             self._on_completed_fut.set_result(True)
 
-        # If any of the tasks was cancelled, cancel all the tasks
-        if task.exception() is not None:
+        # If any of the tasks has thrown an exception, cancel all the tasks.
+        # A cancelled task doesn't affect the others.
+        if not task.cancelled() and task.exception() is not None:
             self._cancel_tasks()
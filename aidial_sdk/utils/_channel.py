@@ -0,0 +1,192 @@
+import asyncio
+from collections import deque
+from typing import Callable, Deque, Generic, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def _release(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _release_all(waiters: List[asyncio.Future]) -> None:
+    for waiter in waiters:
+        _release(waiter)
+    waiters.clear()
+
+
+class Channel(Generic[T]):
+    """
+    Channel with many producers and a single consumer.
+
+    Unlike asyncio.Queue it doesn't create a future per item:
+    the consumer sleeps on a single waiter, which is released by
+    the first item put into an empty channel.
+    The consumer could take all the pending items at once via `drain`.
+
+    The channel is bounded by the number of items and/or by their total
+    size as estimated by `sizeof`. The limits are only enforced by `put`,
+    which waits until the consumer catches up,
+    while `put_nowait` never blocks and may overfill the channel.
+
+    `task_done` and `join` follow the semantics of asyncio.Queue.
+    Unlike `join`, `wait_empty` returns as soon as the consumer
+    takes the pending items, without waiting for them to be done.
+    """
+
+    max_items: Optional[int]
+    max_size: Optional[int]
+
+    _items: Deque[T]
+    _size: int
+    _sizeof: Optional[Callable[[T], int]]
+    _waiter: Optional[asyncio.Future]
+    _put_waiters: List[asyncio.Future]
+    _empty_waiters: List[asyncio.Future]
+    _unfinished: int
+    _join_waiters: List[asyncio.Future]
+
+    def __init__(
+        self,
+        *,
+        max_items: Optional[int] = None,
+        max_size: Optional[int] = None,
+        sizeof: Optional[Callable[[T], int]] = None,
+    ) -> None:
+        assert max_size is None or sizeof is not None, "sizeof is required"
+
+        self.max_items = max_items
+        self.max_size = max_size
+
+        self._items = deque()
+        self._size = 0
+        self._sizeof = sizeof
+        self._waiter = None
+        self._put_waiters = []
+        self._empty_waiters = []
+        self._unfinished = 0
+        self._join_waiters = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def size(self) -> int:
+        """
+        The total size of the pending items.
+        Always zero when sizeof isn't given.
+        """
+
+        return self._size
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def full(self) -> bool:
+        return (
+            self.max_items is not None and len(self._items) >= self.max_items
+        ) or (self.max_size is not None and self._size >= self.max_size)
+
+    def put_nowait(self, item: T) -> None:
+        self._items.append(item)
+        if self._sizeof is not None:
+            self._size += self._sizeof(item)
+        self._unfinished += 1
+        if self._waiter is not None:
+            _release(self._waiter)
+
+    async def put(self, item: T) -> None:
+        while self.full():
+            waiter = asyncio.get_running_loop().create_future()
+            self._put_waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._put_waiters:
+                    self._put_waiters.remove(waiter)
+
+        self.put_nowait(item)
+
+    async def wait_empty(self) -> None:
+        while self._items:
+            waiter = asyncio.get_running_loop().create_future()
+            self._empty_waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._empty_waiters:
+                    self._empty_waiters.remove(waiter)
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until the channel is non-empty or the timeout expires.
+        Returns True if the channel is non-empty.
+        """
+
+        if self._items:
+            return True
+
+        assert self._waiter is None, "The channel supports a single consumer"
+
+        loop = asyncio.get_running_loop()
+        waiter = self._waiter = loop.create_future()
+        timer = (
+            None
+            if timeout is None
+            else loop.call_later(timeout, _release, waiter)
+        )
+
+        try:
+            await waiter
+        finally:
+            self._waiter = None
+            if timer is not None:
+                timer.cancel()
+
+        return bool(self._items)
+
+    async def get(self) -> T:
+        while not self._items:
+            await self.wait()
+        return self.get_nowait()
+
+    def get_nowait(self) -> T:
+        """
+        Raises IndexError if the channel is empty.
+        """
+
+        item = self._items.popleft()
+        if self._sizeof is not None:
+            self._size -= self._sizeof(item)
+        self._on_taken()
+        return item
+
+    def drain(self) -> Iterable[T]:
+        """
+        Takes all the pending items at once.
+        """
+
+        items, self._items = self._items, deque()
+        self._size = 0
+        self._on_taken()
+        return items
+
+    def task_done(self, count: int = 1) -> None:
+        assert self._unfinished >= count, "task_done() called too many times"
+
+        self._unfinished -= count
+        if self._unfinished == 0 and self._join_waiters:
+            _release_all(self._join_waiters)
+
+    async def join(self) -> None:
+        if self._unfinished > 0:
+            waiter = asyncio.get_running_loop().create_future()
+            self._join_waiters.append(waiter)
+            await waiter
+
+    def _on_taken(self) -> None:
+        if self._put_waiters and not self.full():
+            _release_all(self._put_waiters)
+        if self._empty_waiters and not self._items:
+            _release_all(self._empty_waiters)
@@ -0,0 +1,115 @@
+from typing import Dict, Optional, Tuple
+
+from aidial_sdk.chat_completion.chunks import (
+    BaseChunk,
+    BaseChunkWithDefaults,
+    ContentChunk,
+    ContentStageChunk,
+    FunctionToolCallChunk,
+)
+from aidial_sdk.utils.json import JSONSerializer
+
+# A string which is put into a chunk in place of its delta
+# to find the position of the delta in the serialized chunk
+_PLACEHOLDER = "__aidial_sdk_chunk_delta__"
+
+_TemplateKey = Tuple[type, int, int]
+_Template = Tuple[object, Optional[Tuple[bytes, bytes]]]
+
+
+def _template_key(chunk: BaseChunk) -> Optional[_TemplateKey]:
+    if isinstance(chunk, ContentChunk):
+        return (ContentChunk, chunk.choice_index, 0)
+    elif isinstance(chunk, ContentStageChunk):
+        return (ContentStageChunk, chunk.choice_index, chunk.stage_index)
+    elif isinstance(chunk, FunctionToolCallChunk):
+        if (
+            chunk.id is None
+            and chunk.name is None
+            and chunk.arguments is not None
+        ):
+            return (FunctionToolCallChunk, chunk.choice_index, chunk.call_index)
+    return None
+
+
+def _get_delta(chunk: BaseChunk) -> str:
+    if isinstance(chunk, (ContentChunk, ContentStageChunk)):
+        return chunk.content
+    elif isinstance(chunk, FunctionToolCallChunk) and chunk.arguments:
+        return chunk.arguments
+    return ""
+
+
+def _with_placeholder(chunk: BaseChunk) -> BaseChunk:
+    if isinstance(chunk, ContentChunk):
+        return ContentChunk(_PLACEHOLDER, chunk.choice_index)
+    elif isinstance(chunk, ContentStageChunk):
+        return ContentStageChunk(
+            chunk.choice_index, chunk.stage_index, _PLACEHOLDER
+        )
+    elif isinstance(chunk, FunctionToolCallChunk):
+        return FunctionToolCallChunk(
+            chunk.choice_index, chunk.call_index, None, None, _PLACEHOLDER
+        )
+    raise ValueError(f"Unexpected chunk type: {type(chunk).__name__}")
+
+
+class ChunkEncoder:
+    """
+    Serializes the frequent chunks (content, stage content and
+    tool call arguments) without building their dictionaries.
+
+    The serialized chunk is split around its delta into a prefix and
+    a suffix, which are cached per chunk type, indices and defaults.
+    The subsequent chunks of the same kind are written as
+    the prefix, the encoded delta and the suffix,
+    which is byte-identical to serializing the chunk dictionary.
+    """
+
+    _serializer: JSONSerializer
+    _templates: Dict[_TemplateKey, _Template]
+
+    def __init__(self, serializer: JSONSerializer) -> None:
+        self._serializer = serializer
+        self._templates = {}
+
+    def encode(self, chunk: BaseChunkWithDefaults) -> bytes:
+        key = _template_key(chunk.chunk)
+        if key is None:
+            return self._encode_dict(chunk)
+
+        template = self._templates.get(key)
+        # The defaults are shared by all the chunks of a response
+        if template is None or template[0] is not chunk.defaults:
+            template = (chunk.defaults, self._build_template(chunk))
+            self._templates[key] = template
+
+        parts = template[1]
+        if parts is None:
+            return self._encode_dict(chunk)
+
+        prefix, suffix = parts
+        return (
+            prefix
+            + self._serializer.dumps_str(_get_delta(chunk.chunk))
+            + suffix
+        )
+
+    def _encode_dict(self, chunk: BaseChunkWithDefaults) -> bytes:
+        return self._serializer.dumps(chunk.to_dict(with_defaults=True))
+
+    def _build_template(
+        self, chunk: BaseChunkWithDefaults
+    ) -> Optional[Tuple[bytes, bytes]]:
+        template = BaseChunkWithDefaults(
+            chunk=_with_placeholder(chunk.chunk), defaults=chunk.defaults
+        )
+        serialized = self._encode_dict(template)
+        placeholder = self._serializer.dumps_str(_PLACEHOLDER)
+
+        # The defaults may happen to contain the placeholder
+        if serialized.count(placeholder) != 1:
+            return None
+
+        prefix, suffix = serialized.split(placeholder)
+        return prefix, suffix
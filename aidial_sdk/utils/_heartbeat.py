@@ -0,0 +1,236 @@
+import asyncio
+import math
+from typing import Callable, List, Optional
+
+
+class HeartbeatTimer:
+    """
+    Calls `on_idle` every time the consumer has been idle
+    for the heartbeat interval.
+
+    The consumer reports its activity via `touch`, which merely
+    records the current time. The single timer is re-armed on expiry
+    for the remaining part of the interval, so it fires at most
+    once per interval no matter how many chunks are consumed.
+    """
+
+    interval: float
+
+    _on_idle: Callable[[], None]
+    _loop: Optional[asyncio.AbstractEventLoop]
+    _timer: Optional[asyncio.TimerHandle]
+    _last_activity: float
+
+    def __init__(self, interval: float, on_idle: Callable[[], None]) -> None:
+        self.interval = interval
+
+        self._on_idle = on_idle
+        self._loop = None
+        self._timer = None
+        self._last_activity = 0.0
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._last_activity = self._loop.time()
+        self._timer = self._loop.call_later(self.interval, self._expire)
+
+    def stop(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def touch(self) -> None:
+        if self._loop is not None:
+            self._last_activity = self._loop.time()
+
+    def _expire(self) -> None:
+        assert self._loop is not None
+
+        now = self._loop.time()
+        idle_time = now - self._last_activity
+
+        if idle_time >= self.interval:
+            self._last_activity = now
+            self._on_idle()
+            # The timer could be stopped by the callback
+            if self._timer is None:
+                return
+            delay = self.interval
+        else:
+            delay = self.interval - idle_time
+
+        self._timer = self._loop.call_later(delay, self._expire)
+
+
+class WheelTimer:
+    """
+    A heartbeat timer driven by a shared `HeartbeatWheel`.
+    Has the same interface as `HeartbeatTimer`.
+    """
+
+    __slots__ = (
+        "interval",
+        "_wheel",
+        "_on_idle",
+        "_loop",
+        "_last_activity",
+        "_due_tick",
+        "_generation",
+        "_active",
+    )
+
+    interval: float
+
+    _wheel: "HeartbeatWheel"
+    _on_idle: Callable[[], None]
+    _loop: Optional[asyncio.AbstractEventLoop]
+    _last_activity: float
+    _due_tick: int
+    _generation: int
+    _active: bool
+
+    def __init__(
+        self,
+        wheel: "HeartbeatWheel",
+        interval: float,
+        on_idle: Callable[[], None],
+    ) -> None:
+        self.interval = interval
+
+        self._wheel = wheel
+        self._on_idle = on_idle
+        self._loop = None
+        self._last_activity = 0.0
+        self._due_tick = 0
+        self._generation = 0
+        self._active = False
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._last_activity = self._loop.time()
+        self._active = True
+        self._wheel._add(self)
+
+    def stop(self) -> None:
+        # The timer is dropped from the wheel lazily once its slot is visited
+        if self._active:
+            self._active = False
+            self._wheel._remove(self)
+
+    def touch(self) -> None:
+        if self._loop is not None:
+            self._last_activity = self._loop.time()
+
+
+class HeartbeatWheel:
+    """
+    A hashed timing wheel driving the heartbeat timers of many streams
+    with a single event loop timer.
+
+    The wheel ticks every `tick` seconds while there are active timers.
+    A tick only visits the timers whose heartbeat is due in this tick:
+    the idle ones are fired and the active ones are moved to the slot
+    of their next possible heartbeat. So the heartbeat is sent once
+    a stream has been idle for its interval, rounded up to the tick.
+    """
+
+    tick: float
+    n_slots: int
+
+    _loop: Optional[asyncio.AbstractEventLoop]
+    _slots: List[List[WheelTimer]]
+    _start: float
+    _tick_index: int
+    _timer: Optional[asyncio.TimerHandle]
+    _active_count: int
+    _generation: int
+
+    def __init__(self, tick: float = 0.05, n_slots: int = 512) -> None:
+        self.tick = tick
+        self.n_slots = n_slots
+
+        self._loop = None
+        self._slots = [[] for _ in range(n_slots)]
+        self._start = 0.0
+        self._tick_index = 0
+        self._timer = None
+        self._active_count = 0
+        self._generation = 0
+
+    def create_timer(
+        self, interval: float, on_idle: Callable[[], None]
+    ) -> WheelTimer:
+        return WheelTimer(self, interval, on_idle)
+
+    @property
+    def active_count(self) -> int:
+        return self._active_count
+
+    def _add(self, timer: WheelTimer) -> None:
+        loop = asyncio.get_running_loop()
+        # The timers of another event loop are abandoned
+        if self._timer is None or self._loop is not loop:
+            self._run(loop)
+
+        self._active_count += 1
+        timer._generation = self._generation
+        self._schedule(timer, timer._last_activity + timer.interval)
+
+    def _remove(self, timer: WheelTimer) -> None:
+        if timer._generation == self._generation:
+            self._active_count -= 1
+
+    def _run(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+
+        self._generation += 1
+        self._active_count = 0
+        self._loop = loop
+        self._slots = [[] for _ in range(self.n_slots)]
+        self._start = loop.time()
+        self._tick_index = 0
+        self._timer = loop.call_at(self._start + self.tick, self._on_tick)
+
+    def _get_tick(self, time: float) -> int:
+        return math.ceil((time - self._start) / self.tick)
+
+    def _schedule(self, timer: WheelTimer, due_time: float) -> None:
+        due_tick = max(self._get_tick(due_time), self._tick_index + 1)
+        timer._due_tick = due_tick
+        self._slots[due_tick % self.n_slots].append(timer)
+
+    def _on_tick(self) -> None:
+        assert self._loop is not None
+
+        self._tick_index += 1
+        now = self._loop.time()
+
+        idx = self._tick_index % self.n_slots
+        timers, self._slots[idx] = self._slots[idx], []
+
+        for timer in timers:
+            if not timer._active:
+                continue
+
+            # The timer is due in one of the next rounds of the wheel
+            if timer._due_tick > self._tick_index:
+                self._slots[idx].append(timer)
+                continue
+
+            due_time = timer._last_activity + timer.interval
+            if self._get_tick(due_time) <= self._tick_index:
+                timer._last_activity = now
+                timer._on_idle()
+                if timer._active:
+                    self._schedule(timer, now + timer.interval)
+            else:
+                self._schedule(timer, due_time)
+
+        if self._active_count == 0:
+            self._timer = None
+        else:
+            self._timer = self._loop.call_at(
+                self._start + (self._tick_index + 1) * self.tick,
+                self._on_tick,
+            )
@@ -0,0 +1,28 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from fastapi import FastAPI
+
+
+def add_shutdown_callback(
+    app: FastAPI, callback: Callable[[], Awaitable[None]]
+) -> None:
+    """
+    Calls `callback` once the app shuts down.
+
+    Unlike the "shutdown" event handlers, which are ignored
+    when the app is created with `lifespan`,
+    the callback wraps whatever lifespan the app has.
+    """
+
+    lifespan_context = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def _lifespan(app: Any) -> AsyncIterator[Any]:
+        try:
+            async with lifespan_context(app) as state:
+                yield state
+        finally:
+            await callback()
+
+    app.router.lifespan_context = _lifespan
@@ -1,2 +1,121 @@
+import json
+from abc import ABC, abstractmethod
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Any, Literal, Union
+
+from fastapi.responses import JSONResponse
+
+
 def remove_nones(d: dict) -> dict:
     return {k: v for k, v in d.items() if v is not None}
+
+
+class JSONSerializer(ABC):
+    """
+    Encodes JSON-compatible objects straight to UTF-8 bytes
+    ready to be written to the wire.
+    """
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        pass
+
+    def dumps_str(self, s: str) -> bytes:
+        return self.dumps(s)
+
+
+class StdlibJSONSerializer(JSONSerializer):
+    """
+    Escapes non-ASCII characters by default, so the output matches
+    the one of `json.dumps`. Pass `ensure_ascii=False` to write them
+    as UTF-8, the way orjson and msgspec do.
+    """
+
+    def __init__(self, ensure_ascii: bool = True) -> None:
+        self._ensure_ascii = ensure_ascii
+        self._encode_basestring = (
+            encode_basestring_ascii if ensure_ascii else encode_basestring
+        )
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(
+            obj, ensure_ascii=self._ensure_ascii, separators=(",", ":")
+        ).encode("utf-8")
+
+    def dumps_str(self, s: str) -> bytes:
+        return self._encode_basestring(s).encode("utf-8")
+
+
+class OrjsonSerializer(JSONSerializer):
+    def __init__(self) -> None:
+        try:
+            import orjson
+        except ImportError:
+            raise ValueError(
+                "Missing orjson dependency. "
+                "Install the package with the extras: aidial-sdk[orjson]"
+            )
+
+        self._dumps = orjson.dumps
+        self._option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj, option=self._option)
+
+
+class MsgspecSerializer(JSONSerializer):
+    def __init__(self) -> None:
+        try:
+            import msgspec
+        except ImportError:
+            raise ValueError(
+                "Missing msgspec dependency. "
+                "Install the package with the extras: aidial-sdk[msgspec]"
+            )
+
+        self._encode = msgspec.json.Encoder().encode
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encode(obj)
+
+
+JSONSerializerName = Literal["stdlib", "orjson", "msgspec"]
+
+STDLIB_JSON_SERIALIZER = StdlibJSONSerializer()
+
+
+def get_json_serializer(
+    serializer: Union[JSONSerializerName, JSONSerializer],
+) -> JSONSerializer:
+    if isinstance(serializer, JSONSerializer):
+        return serializer
+    elif serializer == "stdlib":
+        return STDLIB_JSON_SERIALIZER
+    elif serializer == "orjson":
+        return OrjsonSerializer()
+    elif serializer == "msgspec":
+        return MsgspecSerializer()
+    else:
+        raise ValueError(f"Unknown JSON serializer: {serializer!r}")
+
+
+class SerializedJSONResponse(JSONResponse):
+    """
+    JSONResponse which renders its content with the given serializer.
+    """
+
+    def __init__(
+        self,
+        content: Any,
+        *,
+        serializer: JSONSerializer = STDLIB_JSON_SERIALIZER,
+        **kwargs,
+    ) -> None:
+        self._serializer = serializer
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        # The default serializer keeps the output of JSONResponse
+        if self._serializer is STDLIB_JSON_SERIALIZER:
+            return super().render(content)
+        return self._serializer.dumps(content)
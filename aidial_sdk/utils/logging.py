@@ -8,9 +8,26 @@ deployment_id: ContextVar[Optional[str]] = ContextVar(
     "deployment_id", default=None
 )
 
+debug_enabled: ContextVar[Optional[bool]] = ContextVar(
+    "debug_enabled", default=None
+)
+
 
 def set_log_deployment(new_deployment_id: str):
     deployment_id.set(new_deployment_id)
+    # The level check is cached for the rest of the request
+    debug_enabled.set(logger.isEnabledFor(logging.DEBUG))
+
+
+def is_debug_enabled() -> bool:
+    """
+    Guards the computation of expensive debug messages.
+    """
+
+    enabled = debug_enabled.get()
+    if enabled is None:
+        return logger.isEnabledFor(logging.DEBUG)
+    return enabled
 
 
 def log_info(message: str, *args, **kwargs):
@@ -18,7 +35,8 @@ def log_info(message: str, *args, **kwargs):
 
 
 def log_debug(message: str, *args, **kwargs):
-    logger.debug(f"[{deployment_id.get()}] {message}", *args, **kwargs)
+    if is_debug_enabled():
+        logger.debug(f"[{deployment_id.get()}] {message}", *args, **kwargs)
 
 
 def log_warning(message: str, *args, **kwargs):
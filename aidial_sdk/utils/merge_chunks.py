@@ -1,5 +1,5 @@
 import copy
-from typing import Any, List, TypeVar, Union, cast
+from typing import Any, Dict, List, Optional, Tuple, TypeVar, Union, cast
 
 T = TypeVar("T")
 
@@ -35,6 +35,66 @@ def show_json_path(path: Path) -> str:
     return ret
 
 
+class StrBuffers:
+    """
+    Collects string deltas merged into dictionary fields
+    and writes the joined strings back on flush.
+    This makes merging of N deltas linear instead of quadratic.
+
+    Until the buffers are flushed the fields hold
+    only the first fragment of the string.
+    """
+
+    _buffers: Dict[Tuple[int, str], Tuple[dict, str, List[str]]]
+
+    def __init__(self) -> None:
+        self._buffers = {}
+
+    def append(self, container: dict, key: str, delta: str) -> None:
+        buffer = self._buffers.get((id(container), key))
+        if buffer is None:
+            self._buffers[(id(container), key)] = (
+                container,
+                key,
+                [container[key], delta],
+            )
+        else:
+            buffer[2].append(delta)
+
+    def flush(self) -> None:
+        for container, key, parts in self._buffers.values():
+            container[key] = "".join(parts)
+        self._buffers.clear()
+
+
+class IndexedLists:
+    """
+    Remembers the target lists which are known to be indexed,
+    so that they aren't rescanned by every subsequent merge.
+
+    The merging procedure only appends indexed elements to an indexed list,
+    so the property holds for as long as the lists are modified
+    solely by merging.
+    """
+
+    _lists: Dict[int, list]
+
+    def __init__(self) -> None:
+        self._lists = {}
+
+    def is_indexed(self, xs: list) -> bool:
+        if id(xs) in self._lists:
+            return True
+        if is_indexed_list(xs):
+            self.add(xs)
+            return True
+        return False
+
+    def add(self, xs: list) -> None:
+        # Keeping the reference, so the id isn't reused by another list
+        self._lists[id(xs)] = xs
+
+
 def merge_str(target: str, source: str, path: Path) -> str:
     return target + source
 
@@ -51,10 +111,26 @@ def merge_bool(target: bool, source: bool, path: Path) -> bool:
     return source
 
 
-def merge_dicts(target: dict, source: dict, path: Path) -> dict:
+def merge_dicts(
+    target: dict,
+    source: dict,
+    path: Path,
+    buffers: Optional[StrBuffers] = None,
+    indexed_lists: Optional[IndexedLists] = None,
+    owned: bool = False,
+) -> dict:
     for key, value in source.items():
         path.append(key)
-        target[key] = merge_recursive(target.get(key), value, path)
+        if (
+            buffers is not None
+            and isinstance(value, str)
+            and isinstance(target.get(key), str)
+        ):
+            buffers.append(target, key, value)
+        else:
+            target[key] = merge_recursive(
+                target.get(key), value, path, buffers, indexed_lists, owned
+            )
         path.pop()
 
     return target
@@ -78,7 +154,14 @@ def is_indexed_list(xs: list) -> bool:
     return all_indexed
 
 
-def merge_indexed_lists(target: list, source: list, path: Path) -> list:
+def merge_indexed_lists(
+    target: list,
+    source: list,
+    path: Path,
+    buffers: Optional[StrBuffers] = None,
+    indexed_lists: Optional[IndexedLists] = None,
+    owned: bool = False,
+) -> list:
     for elem in source:
         assert isinstance(elem, dict), LIST_OF_DICTS_ERROR_MESSAGE
 
@@ -88,18 +171,34 @@ def merge_indexed_lists(target: list, source: list, path: Path) -> list:
         path.append(index)
 
         if index < len(target):
-            target[index] = merge_recursive(target[index], elem, path)
+            target[index] = merge_recursive(
+                target[index], elem, path, buffers, indexed_lists, owned
+            )
         else:
             target.extend([{"index": idx} for idx in range(len(target), index)])
-            target.append(copy.deepcopy(elem))
+            target.append(elem if owned else copy.deepcopy(elem))
 
         path.pop()
 
+    if indexed_lists is not None:
+        indexed_lists.add(target)
+
     return target
 
 
-def merge_lists(target: list, source: list, path: Path) -> list:
-    is_target_indexed = is_indexed_list(target)
+def merge_lists(
+    target: list,
+    source: list,
+    path: Path,
+    buffers: Optional[StrBuffers] = None,
+    indexed_lists: Optional[IndexedLists] = None,
+    owned: bool = False,
+) -> list:
+    is_target_indexed = (
+        is_indexed_list(target)
+        if indexed_lists is None
+        else indexed_lists.is_indexed(target)
+    )
     is_source_indexed = is_indexed_list(source)
 
     if len(source) == 0:
@@ -107,9 +206,11 @@ def merge_lists(target: list, source: list, path: Path) -> list:
 
     if len(target) == 0:
         if is_source_indexed:
-            return merge_indexed_lists(target, source, path)
+            return merge_indexed_lists(
+                target, source, path, buffers, indexed_lists, owned
+            )
         else:
-            return copy.deepcopy(source)
+            return source if owned else copy.deepcopy(source)
 
     if not is_target_indexed and not is_source_indexed:
         raise AssertionError(CANNOT_MERGE_NON_INDEXED_LISTS_ERROR_MESSAGE)
@@ -118,14 +219,30 @@ def merge_lists(target: list, source: list, path: Path) -> list:
         is_target_indexed and is_source_indexed
     ), CANNOT_MERGE_NON_INDEXED_AND_INDEXED_LISTS_ERROR_MESSAGE
 
-    return merge_indexed_lists(target, source, path)
+    return merge_indexed_lists(
+        target, source, path, buffers, indexed_lists, owned
+    )
 
 
-def merge_recursive(target: T, source: Any, path: Path) -> T:
+def merge_recursive(
+    target: T,
+    source: Any,
+    path: Path,
+    buffers: Optional[StrBuffers] = None,
+    indexed_lists: Optional[IndexedLists] = None,
+    owned: bool = False,
+) -> T:
     """
     Recursively merging content of the source object into the target object.
     The target object is modified in-place.
-    The source object is left unmodified.
+    The source object is left unmodified, unless it's owned.
+    The content of an owned source object is moved into the target object
+    without copying, so the source object must not be used afterwards.
+
+    When the buffers are given, the string fields are concatenated lazily
+    and remain incomplete until the buffers are flushed.
+    When the indexed lists registry is given, the target lists
+    are checked for being indexed only once.
     """
 
     if source is None:
@@ -140,9 +257,9 @@ def merge_recursive(target: T, source: Any, path: Path) -> T:
             return source
 
     if isinstance(target, list) and isinstance(source, list):
-        return merge_lists(target, source, path)
+        return merge_lists(target, source, path, buffers, indexed_lists, owned)
     elif isinstance(target, dict) and isinstance(source, dict):
-        return merge_dicts(target, source, path)
+        return merge_dicts(target, source, path, buffers, indexed_lists, owned)
     elif isinstance(target, int) and isinstance(source, int):
         return merge_int(target, source, path)
     elif isinstance(target, float) and isinstance(source, float):
@@ -157,18 +274,25 @@ def merge_recursive(target: T, source: Any, path: Path) -> T:
     )
 
 
-def merge(*chunks: T) -> T:
+def merge(*chunks: T, owned: bool = False) -> T:
     """
     Merge a list of chunks into one.
     The very first chunk is modified in-place by accumulating the content of the subsequent chunks.
     The subsequent chunks aren't modified.
     The new content added to the first chunk is deeply copied from a source chunk.
+
+    When `owned` is set, the caller hands the subsequent chunks over:
+    their content is moved to the first chunk without copying,
+    and the chunks must not be used afterwards.
     """
 
     assert len(chunks) > 0, "At least one chunk must be provided"
+    buffers = StrBuffers()
+    indexed_lists = IndexedLists()
     ret: T = chunks[0]
     for chunk in chunks[1:]:
-        ret = merge_recursive(ret, chunk, path=[])
+        ret = merge_recursive(ret, chunk, [], buffers, indexed_lists, owned)
+    buffers.flush()
     return ret
 
 
@@ -219,13 +343,88 @@ def merge_chat_completion_chunks(*chunks: _Chunk) -> _Chunk:
     ), "The chat completion chunks are expected to be dictionaries"
 
     target, *sources = chunks
+    buffers = StrBuffers()
+    indexed_lists = IndexedLists()
 
     for chunk in sources:
-        source = cast(_Chunk, chunk.copy())
-        for key, value in list(source.items()):
-            if not isinstance(value, (list, dict)) and value is not None:
-                target[key] = value
-                del source[key]
-        target = merge(target, source)
+        target = _merge_chat_completion_chunk(
+            target, chunk, buffers, indexed_lists
+        )
 
+    buffers.flush()
     return target
+
+
+def _merge_chat_completion_chunk(
+    target: _Chunk,
+    chunk: _Chunk,
+    buffers: StrBuffers,
+    indexed_lists: IndexedLists,
+) -> _Chunk:
+    source = cast(_Chunk, chunk.copy())
+    for key, value in list(source.items()):
+        if not isinstance(value, (list, dict)) and value is not None:
+            target[key] = value
+            del source[key]
+    return merge_recursive(target, source, [], buffers, indexed_lists)
+
+
+class ChunkMerger:
+    """
+    Merges chat completion chunks one by one as they arrive
+    following the same procedure as `merge_chat_completion_chunks`.
+
+    The cost of feeding a chunk doesn't depend on the amount of
+    the content accumulated so far: the string deltas are buffered
+    and the accumulated indexed lists aren't rescanned.
+
+    The fed chunks are left unmodified.
+    """
+
+    _merged: Optional[dict]
+    _buffers: StrBuffers
+    _indexed_lists: IndexedLists
+    _finalized: bool
+
+    def __init__(self) -> None:
+        self._merged = None
+        self._buffers = StrBuffers()
+        self._indexed_lists = IndexedLists()
+        self._finalized = False
+
+    def feed(self, chunk: dict) -> None:
+        assert not self._finalized, "The merger is already finalized"
+        assert isinstance(
+            chunk, dict
+        ), "The chat completion chunks are expected to be dictionaries"
+
+        if self._merged is None:
+            self._merged = copy.deepcopy(chunk)
+        else:
+            self._merged = _merge_chat_completion_chunk(
+                self._merged, chunk, self._buffers, self._indexed_lists
+            )
+
+    def snapshot(self) -> dict:
+        """
+        Returns a copy of the chunks merged so far.
+        """
+
+        return copy.deepcopy(self._get_merged())
+
+    def finalize(self) -> dict:
+        """
+        Returns the merged chunk. No chunks could be fed afterwards.
+        """
+
+        merged = self._get_merged()
+        self._finalized = True
+        return merged
+
+    def _get_merged(self) -> dict:
+        assert (
+            self._merged is not None
+        ), "At least one chat completion chunk must be provided"
+
+        self._buffers.flush()
+        return self._merged
@@ -1,5 +1,4 @@
 import asyncio
-import json
 from typing import (
     Any,
     AsyncIterator,
@@ -16,17 +15,33 @@ from typing_extensions import assert_never
 
 from aidial_sdk.chat_completion.chunks import BaseChunkWithDefaults
 from aidial_sdk.exceptions import HTTPException as DIALException
+from aidial_sdk.utils._block_response import BlockResponseAccumulator
 from aidial_sdk.utils._cancel_scope import CancelScope
-from aidial_sdk.utils.logging import log_debug
-from aidial_sdk.utils.merge_chunks import cleanup_indices, merge
+from aidial_sdk.utils._chunk_encoder import ChunkEncoder
+from aidial_sdk.utils.json import STDLIB_JSON_SERIALIZER, JSONSerializer
+from aidial_sdk.utils.logging import is_debug_enabled, log_debug
+from aidial_sdk.utils.merge_chunks import (
+    IndexedLists,
+    StrBuffers,
+    cleanup_indices,
+    merge_recursive,
+)
+
+# SSE frames are assembled from pre-built byte templates,
+# so that every chunk costs a single bytes allocation.
+_DATA_FRAME = b"data: %b\n\n"
+_DONE_FRAME = _DATA_FRAME % b"[DONE]"
 
-_DONE_MARKER = "[DONE]"
+HEARTBEAT_FRAME = b": heartbeat\n\n"
 
 
 async def merge_chunks(chunk_stream: AsyncIterator[dict]) -> Dict[str, Any]:
     response: Dict[str, Any] = {}
+    buffers = StrBuffers()
+    indexed_lists = IndexedLists()
     async for chunk in chunk_stream:
-        response = merge(response, chunk)
+        response = merge_recursive(response, chunk, [], buffers, indexed_lists)
+    buffers.flush()
 
     for choice in response["choices"]:
         choice["message"] = cleanup_indices(choice["delta"])
@@ -35,72 +50,81 @@ async def merge_chunks(chunk_stream: AsyncIterator[dict]) -> Dict[str, Any]:
     return response
 
 
-def _format_chunk(data: Union[dict, str]) -> str:
-    data = "data: " + (
-        json.dumps(data, separators=(",", ":"))
+def _format_chunk(
+    data: Union[dict, str],
+    serializer: JSONSerializer = STDLIB_JSON_SERIALIZER,
+) -> bytes:
+    payload = (
+        serializer.dumps(data)
         if isinstance(data, dict)
-        else data
+        else data.encode("utf-8")
     )
-    log_debug(data)
-    return f"{data}\n\n"
+    return _format_payload(payload)
+
+
+def _format_payload(payload: bytes) -> bytes:
+    if is_debug_enabled():
+        log_debug("data: " + payload.decode("utf-8"))
+    return _DATA_FRAME % payload
 
 
 ResponseStream = AsyncIterator[Union[BaseChunkWithDefaults, DIALException]]
 
-ResponseStreamWithStr = AsyncIterator[
-    Union[BaseChunkWithDefaults, DIALException, str]
+# Pre-formatted SSE frames (e.g. heartbeats) are passed through as is
+ResponseStreamWithBytes = AsyncIterator[
+    Union[BaseChunkWithDefaults, DIALException, bytes, str]
 ]
 
 
-async def _handle_exceptions_in_block_response(
-    stream: ResponseStream,
-) -> AsyncIterator[dict]:
-    is_first_chunk = True
+async def to_block_response(
+    stream: Union[ResponseStream, ResponseStreamWithBytes]
+) -> dict:
+    accumulator = BlockResponseAccumulator()
 
     async for chunk in stream:
         if isinstance(chunk, DIALException):
             raise chunk.to_fastapi_exception()
-        else:
-            # Setting defaults only for the first chunk to make
-            # the follow-up merging logic simpler.
-            yield chunk.to_dict(with_defaults=is_first_chunk)
-
-        is_first_chunk = False
-
+        elif isinstance(chunk, BaseChunkWithDefaults):
+            accumulator.add(chunk)
 
-async def to_block_response(stream: ResponseStream) -> dict:
-    chunk_stream = _handle_exceptions_in_block_response(stream)
-    return await merge_chunks(chunk_stream)
+    return accumulator.finalize()
 
 
 async def to_streaming_response(
-    stream: ResponseStreamWithStr,
-) -> AsyncIterator[str]:
+    stream: ResponseStreamWithBytes,
+    *,
+    serializer: JSONSerializer = STDLIB_JSON_SERIALIZER,
+) -> AsyncIterator[bytes]:
 
     first_chunk = await stream.__anext__()
 
     if isinstance(first_chunk, DIALException):
         raise first_chunk.to_fastapi_exception()
 
-    def _chunk_to_str(
-        chunk: Union[BaseChunkWithDefaults, DIALException, str]
-    ) -> str:
-        if isinstance(chunk, DIALException):
-            return _format_chunk(chunk.json_error())
-        elif isinstance(chunk, str):
+    encoder = ChunkEncoder(serializer)
+
+    def _chunk_to_bytes(
+        chunk: Union[BaseChunkWithDefaults, DIALException, bytes, str]
+    ) -> bytes:
+        if isinstance(chunk, BaseChunkWithDefaults):
+            return _format_payload(encoder.encode(chunk))
+        elif isinstance(chunk, bytes):
             return chunk
-        elif isinstance(chunk, BaseChunkWithDefaults):
-            return _format_chunk(chunk.to_dict(with_defaults=True))
+        elif isinstance(chunk, DIALException):
+            return _format_chunk(chunk.json_error(), serializer)
+        elif isinstance(chunk, str):
+            return chunk.encode("utf-8")
         else:
             assert_never(chunk)
 
-    async def _generator() -> AsyncIterator[str]:
-        yield _chunk_to_str(first_chunk)
+    async def _generator() -> AsyncIterator[bytes]:
+        yield _chunk_to_bytes(first_chunk)
 
         async for chunk in stream:
-            yield _chunk_to_str(chunk)
+            yield _chunk_to_bytes(chunk)
 
-        yield _format_chunk(_DONE_MARKER)
+        log_debug("data: [DONE]")
+        yield _DONE_FRAME
 
     return _generator()
 
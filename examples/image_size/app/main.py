@@ -13,7 +13,7 @@ from aidial_sdk import DIALApp
 from aidial_sdk import HTTPException as DIALException
 from aidial_sdk.chat_completion import ChatCompletion, Request, Response
 
-from .image import download_image_as_base64, get_image_base64_size
+from .image import download_image, get_image_size
 
 DIAL_URL = os.environ.get("DIAL_URL")
 
@@ -69,7 +69,7 @@ class ImageSizeApplication(ChatCompletion):
 
             # The attachment contains either the image content as a base64 string or an image URL
             if attachment.data is not None:
-                image_data = attachment.data
+                image = attachment.bytes()
             elif attachment.url is not None:
                 image_url = attachment.url
 
@@ -81,11 +81,10 @@ class ImageSizeApplication(ChatCompletion):
                             "DIAL_URL environment variable is unset"
                         )
 
-                    image_abs_url = f"{DIAL_URL}/v1/{image_url}"
+                    # The DIAL storage client sends the API key of the request
+                    image = await attachment.load(app.storage)
                 else:
-                    image_abs_url = image_url
-
-                image_data = await download_image_as_base64(image_abs_url)
+                    image = await download_image(image_url)
             else:
                 raise DIALException(
                     message="Either 'data' or 'url' field must be provided in the attachment",
@@ -93,7 +92,7 @@ class ImageSizeApplication(ChatCompletion):
                 )
 
             # Compute the image size
-            (w, h) = get_image_base64_size(image_data)
+            (w, h) = get_image_size(image)
 
             # Return the image size
             choice.append_content(f"Size: {w}x{h}px")
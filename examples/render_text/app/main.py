@@ -4,6 +4,7 @@ Takes the last message, rasterizes the text and
 sends the image back to the user in an attachment.
 """
 
+import base64
 import os
 
 import uvicorn
@@ -12,7 +13,7 @@ from aidial_sdk import DIALApp
 from aidial_sdk import HTTPException as DIALException
 from aidial_sdk.chat_completion import ChatCompletion, Request, Response
 
-from .image import text_to_image_base64, upload_png_image
+from .image import text_to_image_base64
 
 DIAL_URL = os.environ.get("DIAL_URL")
 
@@ -57,9 +58,12 @@ class RenderTextApplication(ChatCompletion):
                     raise ValueError("DIAL_URL environment variable is unset")
 
                 # Upload the image to DIAL File storage
-                image_url = await upload_png_image(
-                    DIAL_URL, "images/picture.png", image_base64
+                metadata = await app.storage.upload(
+                    "images/picture.png",
+                    base64.b64decode(image_base64),
+                    content_type=image_type,
                 )
+                image_url = metadata.url
 
                 # And return as an attachment
                 choice.add_attachment(
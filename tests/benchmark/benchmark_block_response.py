@@ -0,0 +1,81 @@
+import asyncio
+import time
+from typing import AsyncIterator, Callable, Coroutine, List
+
+from aidial_sdk.chat_completion import Request, Response
+from aidial_sdk.chat_completion.chunks import BaseChunkWithDefaults
+from aidial_sdk.utils._block_response import BlockResponseAccumulator
+from aidial_sdk.utils.streaming import merge_chunks
+from tests.utils.constants import DUMMY_DIAL_REQUEST
+
+_Producer = Callable[[Request, Response], Coroutine]
+
+
+def content_producer(n_chunks: int) -> _Producer:
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            for idx in range(n_chunks):
+                choice.append_content(f"{idx} ")
+
+    return _producer
+
+
+def attachments_producer(n_chunks: int) -> _Producer:
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            for idx in range(n_chunks):
+                choice.add_attachment(url=f"url{idx}")
+
+    return _producer
+
+
+def tool_call_producer(n_chunks: int) -> _Producer:
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            call = choice.create_function_tool_call("id", "name")
+            for idx in range(n_chunks):
+                call.append_arguments(f"{idx} ")
+
+    return _producer
+
+
+async def _collect_chunks(producer: _Producer) -> List[BaseChunkWithDefaults]:
+    response = Response(DUMMY_DIAL_REQUEST.copy(update={"stream": False}))
+    return [chunk async for chunk in response._generate_stream(producer)]  # type: ignore
+
+
+async def merge_dicts(chunks: List[BaseChunkWithDefaults]) -> dict:
+    async def _stream() -> AsyncIterator[dict]:
+        for idx, chunk in enumerate(chunks):
+            yield chunk.to_dict(with_defaults=idx == 0)
+
+    return await merge_chunks(_stream())
+
+
+async def accumulate(chunks: List[BaseChunkWithDefaults]) -> dict:
+    accumulator = BlockResponseAccumulator()
+    for chunk in chunks:
+        accumulator.add(chunk)
+    return accumulator.finalize()
+
+
+def benchmark(name: str, producer: _Producer, *, repeat: int):
+    chunks = asyncio.run(_collect_chunks(producer))
+
+    for method in [merge_dicts, accumulate]:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            asyncio.run(method(chunks))
+            timings.append(time.perf_counter() - start)
+
+        best_msec = min(timings) * 1e3
+        print(f"{name},{len(chunks)},{method.__name__},{best_msec:.3f}")
+
+
+if __name__ == "__main__":
+    print("Description,N chunks,Method,Best msec")
+    for n in [1_000, 10_000, 50_000]:
+        benchmark("content", content_producer(n), repeat=3)
+        benchmark("attachments", attachments_producer(n // 10), repeat=3)
+        benchmark("tool_call", tool_call_producer(n), repeat=3)
@@ -0,0 +1,62 @@
+import time
+import tracemalloc
+from typing import Callable, List
+
+from aidial_sdk.chat_completion.backpressure import ChunkQueue
+from aidial_sdk.chat_completion.choice import Choice
+
+N_CHOICES = 128
+N_TOKENS = 1_000
+
+
+def content_tokens(queue: ChunkQueue) -> None:
+    choices = [Choice(queue, idx) for idx in range(N_CHOICES)]
+    for choice in choices:
+        choice.open()
+    for idx in range(N_TOKENS):
+        for choice in choices:
+            choice.append_content(f"{idx} ")
+
+
+def attachments(queue: ChunkQueue) -> None:
+    choices = [Choice(queue, idx) for idx in range(N_CHOICES)]
+    for choice in choices:
+        choice.open()
+    for idx in range(N_TOKENS // 10):
+        for choice in choices:
+            choice.add_attachment(url=f"url{idx}")
+
+
+def benchmark(producer: Callable[[ChunkQueue], None]) -> None:
+    # The chunks are kept in the queue as if the client didn't read them
+    queue = ChunkQueue()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    producer(queue)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    n_chunks = len(queue)
+    print(
+        ",".join(
+            [
+                producer.__name__,
+                str(n_chunks),
+                f"{current / n_chunks:.1f}",
+                f"{peak / 2**20:.1f}",
+                f"{elapsed / n_chunks * 1e6:.3f}",
+            ]
+        )
+    )
+
+
+if __name__ == "__main__":
+    print("Producer,N chunks,Bytes per chunk,Peak MiB,Usec per chunk")
+    producers: List[Callable[[ChunkQueue], None]] = [
+        content_tokens,
+        attachments,
+    ]
+    for producer in producers:
+        benchmark(producer)
@@ -0,0 +1,45 @@
+import logging
+import timeit
+
+from aidial_sdk.chat_completion.backpressure import ChunkQueue
+from aidial_sdk.chat_completion.choice import Choice
+from aidial_sdk.chat_completion.chunks import ContentChunk
+from aidial_sdk.utils.logging import logger, set_log_deployment
+from aidial_sdk.utils.streaming import _format_chunk
+
+N_TOKENS = 100_000
+
+
+def append_content() -> None:
+    choice = Choice(ChunkQueue(), 0)
+    choice.open()
+    for idx in range(N_TOKENS):
+        choice.append_content(f"{idx} ")
+
+
+def format_chunk() -> None:
+    data = ContentChunk("token ", 0).to_dict()
+    for _ in range(N_TOKENS):
+        _format_chunk(data)
+
+
+def benchmark(level: int, *, repeat: int) -> None:
+    logger.setLevel(level)
+    set_log_deployment("deployment")
+
+    for method in [append_content, format_chunk]:
+        best_sec = min(timeit.repeat(method, number=1, repeat=repeat))
+        best_nsec_per_token = best_sec / N_TOKENS * 1e9
+        print(
+            f"{logging.getLevelName(level)},{method.__name__},{N_TOKENS},{best_nsec_per_token:.0f}"
+        )
+
+
+if __name__ == "__main__":
+    # Measuring the cost of the logging calls, not of the log output
+    logger.handlers = [logging.NullHandler()]
+    logger.propagate = False
+
+    print("Log level,Method,N tokens,Best nsec per token")
+    benchmark(logging.WARNING, repeat=5)
+    benchmark(logging.DEBUG, repeat=5)
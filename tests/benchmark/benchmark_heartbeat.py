@@ -0,0 +1,128 @@
+import asyncio
+import time
+from typing import AsyncIterator, Callable, Coroutine, List
+
+from aidial_sdk.chat_completion import Request, Response
+from aidial_sdk.utils._heartbeat import HeartbeatWheel
+from aidial_sdk.utils.streaming import HEARTBEAT_FRAME, add_heartbeat
+from tests.utils.constants import DUMMY_DIAL_REQUEST
+
+_Producer = Callable[[Request, Response], Coroutine]
+
+HEARTBEAT_INTERVAL = 1.0
+
+
+def interleaved_producer(n_chunks: int) -> _Producer:
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            for idx in range(n_chunks):
+                choice.append_content(f"{idx} ")
+                await asyncio.sleep(0)
+
+    return _producer
+
+
+HEARTBEAT_WHEEL = HeartbeatWheel()
+
+
+def _create_response(heartbeat_interval=None, heartbeat_wheel=None) -> Response:
+    return Response(
+        DUMMY_DIAL_REQUEST.copy(update={"stream": True}),
+        heartbeat_interval=heartbeat_interval,
+        heartbeat_wheel=heartbeat_wheel,
+    )
+
+
+def no_heartbeat(producer: _Producer) -> AsyncIterator:
+    return _create_response()._generate_stream(producer)
+
+
+def add_heartbeat_wrapper(producer: _Producer) -> AsyncIterator:
+    return add_heartbeat(
+        _create_response()._generate_stream(producer),
+        heartbeat_interval=HEARTBEAT_INTERVAL,
+        heartbeat_object=HEARTBEAT_FRAME,
+    )
+
+
+def heartbeat_timer(producer: _Producer) -> AsyncIterator:
+    response = _create_response(heartbeat_interval=HEARTBEAT_INTERVAL)
+    return response._generate_stream(producer)
+
+
+def heartbeat_wheel(producer: _Producer) -> AsyncIterator:
+    response = _create_response(
+        heartbeat_interval=HEARTBEAT_INTERVAL, heartbeat_wheel=HEARTBEAT_WHEEL
+    )
+    return response._generate_stream(producer)
+
+
+async def _consume(stream: AsyncIterator) -> int:
+    count = 0
+    async for _ in stream:
+        count += 1
+    return count
+
+
+async def _consume_all(streams: List[AsyncIterator]) -> int:
+    return sum(await asyncio.gather(*[_consume(s) for s in streams]))
+
+
+def benchmark(
+    name: str,
+    create_stream: Callable[[_Producer], AsyncIterator],
+    n_chunks: int,
+    *,
+    repeat: int,
+):
+    timings = []
+    count = 0
+    for _ in range(repeat):
+        stream = create_stream(interleaved_producer(n_chunks))
+        start = time.perf_counter()
+        count = asyncio.run(_consume(stream))
+        timings.append(time.perf_counter() - start)
+
+    best_sec = min(timings)
+    print(f"{name},1,{count},{best_sec * 1e3:.3f},{count / best_sec:.0f}")
+
+
+def benchmark_concurrent(
+    name: str,
+    create_stream: Callable[[_Producer], AsyncIterator],
+    n_streams: int,
+    n_chunks: int,
+    *,
+    repeat: int,
+):
+    timings = []
+    count = 0
+    for _ in range(repeat):
+        streams = [
+            create_stream(interleaved_producer(n_chunks))
+            for _ in range(n_streams)
+        ]
+        start = time.perf_counter()
+        count = asyncio.run(_consume_all(streams))
+        timings.append(time.perf_counter() - start)
+
+    best_sec = min(timings)
+    print(
+        f"{name},{n_streams},{count},{best_sec * 1e3:.3f},{count / best_sec:.0f}"
+    )
+
+
+STREAM_FACTORIES = {
+    "no heartbeat": no_heartbeat,
+    "add_heartbeat": add_heartbeat_wrapper,
+    "heartbeat timer": heartbeat_timer,
+    "heartbeat wheel": heartbeat_wheel,
+}
+
+if __name__ == "__main__":
+    print("Description,N streams,N chunks,Best msec,Chunks/sec")
+    for n in [10_000, 100_000]:
+        for name, create_stream in STREAM_FACTORIES.items():
+            benchmark(name, create_stream, n, repeat=5)
+    for name, create_stream in STREAM_FACTORIES.items():
+        benchmark_concurrent(name, create_stream, 1000, 100, repeat=3)
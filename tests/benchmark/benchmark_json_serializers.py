@@ -0,0 +1,103 @@
+import asyncio
+import time
+import timeit
+from typing import List
+
+from aidial_sdk.chat_completion import Request, Response
+from aidial_sdk.chat_completion.chunks import (
+    BaseChunkWithDefaults,
+    ContentChunk,
+    DefaultChunk,
+)
+from aidial_sdk.utils._chunk_encoder import ChunkEncoder
+from aidial_sdk.utils.json import JSONSerializer, get_json_serializer
+from aidial_sdk.utils.streaming import _format_chunk, to_streaming_response
+from tests.utils.constants import DUMMY_DIAL_REQUEST
+
+SERIALIZERS = ["stdlib", "orjson", "msgspec"]
+
+N_TOKENS = 10_000
+
+_CHUNK = BaseChunkWithDefaults(
+    chunk=ContentChunk(content="token ", choice_index=0),
+    defaults=DefaultChunk(
+        id="chatcmpl-AQws8iVykPBIQJfnmCQnMEkTLLUUA",
+        created=1730986196,
+        object="chat.completion.chunk",
+        model="gpt-4o-2024-05-13",
+    ),
+)
+
+
+def _get_serializers() -> List[JSONSerializer]:
+    ret = []
+    for name in SERIALIZERS:
+        try:
+            ret.append(get_json_serializer(name))  # type: ignore
+        except ValueError:
+            print(f"{name},skipped: not installed")
+    return ret
+
+
+def benchmark_encode(serializer: JSONSerializer, *, repeat: int):
+    def stmt():
+        _format_chunk(_CHUNK.to_dict(with_defaults=True), serializer)
+
+    t = timeit.Timer(stmt=stmt)
+    number, _ = t.autorange()
+    best_usec = min(t.repeat(number=number, repeat=repeat)) / number * 1e6
+
+    print(f"{type(serializer).__name__},encode,{best_usec:.3f} usec/chunk")
+
+
+def benchmark_template_encode(serializer: JSONSerializer, *, repeat: int):
+    encoder = ChunkEncoder(serializer)
+
+    def stmt():
+        encoder.encode(_CHUNK)
+
+    t = timeit.Timer(stmt=stmt)
+    number, _ = t.autorange()
+    best_usec = min(t.repeat(number=number, repeat=repeat)) / number * 1e6
+
+    print(
+        f"{type(serializer).__name__},template encode,{best_usec:.3f} usec/chunk"
+    )
+
+
+async def _producer(request: Request, response: Response) -> None:
+    with response.create_single_choice() as choice:
+        for _ in range(N_TOKENS):
+            choice.append_content("token ")
+
+
+async def _stream_tokens(serializer: JSONSerializer) -> float:
+    request = DUMMY_DIAL_REQUEST.copy(update={"stream": True})
+    response = Response(request)
+
+    start = time.perf_counter()
+    stream = await to_streaming_response(
+        response._generate_stream(_producer), serializer=serializer
+    )
+    async for _ in stream:
+        pass
+    return time.perf_counter() - start
+
+
+def benchmark_end_to_end(serializer: JSONSerializer, *, repeat: int):
+    best_sec = min(
+        asyncio.run(_stream_tokens(serializer)) for _ in range(repeat)
+    )
+    tokens_per_sec = N_TOKENS / best_sec
+
+    print(
+        f"{type(serializer).__name__},end-to-end,{tokens_per_sec:.0f} tokens/sec"
+    )
+
+
+if __name__ == "__main__":
+    print("Serializer,Benchmark,Result")
+    for serializer in _get_serializers():
+        benchmark_encode(serializer, repeat=10)
+        benchmark_template_encode(serializer, repeat=10)
+        benchmark_end_to_end(serializer, repeat=5)
@@ -137,7 +137,40 @@ cases: List[ChunkGenerator] = [
     ),
 ]
 
+# Merging of string deltas must scale linearly with the number of chunks
+long_stream_cases: List[ChunkGenerator] = [
+    one_choice.model_copy(
+        update={"n_chunks_per_choice": n, "n_attachments_per_choice": 0}
+    )
+    for n in [25_000, 50_000, 100_000]
+]
+
+# Merging of an attachment must not rescan the attachments merged before it
+many_attachments_cases: List[ChunkGenerator] = [
+    one_choice.model_copy(
+        update={"n_chunks_per_choice": 0, "n_attachments_per_choice": 1000}
+    ),
+    one_choice.model_copy(
+        update={
+            "n_chunks_per_choice": 0,
+            "n_attachments_per_choice": 1000,
+            "reversed_attachments": True,
+        }
+    ),
+    base_case.model_copy(
+        update={
+            "n_choices": 3,
+            "n_chunks_per_choice": 100,
+            "n_attachments_per_choice": 1000,
+        }
+    ),
+]
+
 if __name__ == "__main__":
     print("Description,N chunks,Number,Repeats,Best sec,Best msec,Best usec")
     for gen in cases:
         benchmark(gen, repeat=10)
+    for gen in many_attachments_cases:
+        benchmark(gen, repeat=5)
+    for gen in long_stream_cases:
+        benchmark(gen, repeat=3, number=1)
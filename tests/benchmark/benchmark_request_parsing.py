@@ -0,0 +1,49 @@
+import time
+
+from aidial_sdk.chat_completion import Request
+from aidial_sdk.pydantic_v1 import SecretStr
+from tests.utils.constants import DUMMY_DIAL_REQUEST
+
+_FIELDS = {
+    "api_key_secret": SecretStr("dummy_key"),
+    "deployment_id": "",
+    "headers": {},
+    "original_request": DUMMY_DIAL_REQUEST.original_request,
+}
+
+
+def create_body(n_messages: int) -> dict:
+    messages = []
+    for idx in range(n_messages // 2):
+        messages.append({"role": "user", "content": f"Question {idx}"})
+        messages.append(
+            {
+                "role": "assistant",
+                "content": f"Answer {idx}",
+                "custom_content": {
+                    "stages": [{"name": "Retrieval", "status": "completed"}],
+                    "attachments": [{"url": f"files/{idx}.txt"}],
+                },
+            }
+        )
+    return {"messages": messages, "stream": True}
+
+
+def benchmark(name: str, n_messages: int, fast_validation: bool, *, repeat):
+    body = create_body(n_messages)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Request._from_body(body, fast_validation=fast_validation, **_FIELDS)
+        timings.append(time.perf_counter() - start)
+
+    best_sec = min(timings)
+    print(f"{name},{n_messages},{best_sec * 1e3:.3f},{1 / best_sec:.0f}")
+
+
+if __name__ == "__main__":
+    print("Description,N messages,Best msec,Requests/sec")
+    for n in [20, 200, 2000]:
+        benchmark("full validation", n, False, repeat=20)
+        benchmark("fast validation", n, True, repeat=20)
@@ -0,0 +1,54 @@
+import asyncio
+import time
+from typing import Callable, Coroutine
+
+from aidial_sdk.chat_completion import Request, Response
+from tests.utils.constants import DUMMY_DIAL_REQUEST
+
+_Producer = Callable[[Request, Response], Coroutine]
+
+
+def burst_producer(n_chunks: int) -> _Producer:
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            for idx in range(n_chunks):
+                choice.append_content(f"{idx} ")
+
+    return _producer
+
+
+def interleaved_producer(n_chunks: int) -> _Producer:
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            for idx in range(n_chunks):
+                choice.append_content(f"{idx} ")
+                await asyncio.sleep(0)
+
+    return _producer
+
+
+async def _consume(producer: _Producer) -> int:
+    response = Response(DUMMY_DIAL_REQUEST.copy(update={"stream": True}))
+    count = 0
+    async for _ in response._generate_stream(producer):
+        count += 1
+    return count
+
+
+def benchmark(name: str, producer: _Producer, *, repeat: int):
+    timings = []
+    n_chunks = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        n_chunks = asyncio.run(_consume(producer))
+        timings.append(time.perf_counter() - start)
+
+    best_sec = min(timings)
+    print(f"{name},{n_chunks},{best_sec * 1e3:.3f},{n_chunks / best_sec:.0f}")
+
+
+if __name__ == "__main__":
+    print("Description,N chunks,Best msec,Chunks/sec")
+    for n in [10_000, 100_000]:
+        benchmark("burst", burst_producer(n), repeat=5)
+        benchmark("interleaved", interleaved_producer(n), repeat=5)
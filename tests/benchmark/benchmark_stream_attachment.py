@@ -0,0 +1,74 @@
+import asyncio
+import base64
+import io
+import os
+import time
+import tracemalloc
+from typing import AsyncIterator, Callable, Coroutine
+
+from aidial_sdk.chat_completion import Request, Response
+from aidial_sdk.utils.streaming import to_streaming_response
+from tests.utils.constants import DUMMY_DIAL_REQUEST
+
+_Producer = Callable[[Request, Response], Coroutine]
+
+
+def add_attachment(content: bytes) -> _Producer:
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            data = base64.b64encode(content).decode()
+            choice.add_attachment(type="image/png", data=data)
+
+    return _producer
+
+
+def stream_attachment(content: bytes) -> _Producer:
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            await choice.astream_attachment(
+                io.BytesIO(content), type="image/png"
+            )
+
+    return _producer
+
+
+async def _consume(producer: _Producer) -> int:
+    response = Response(DUMMY_DIAL_REQUEST.copy(update={"stream": True}))
+    stream: AsyncIterator = await to_streaming_response(
+        response._generate_stream(producer)
+    )
+
+    size = 0
+    async for frame in stream:
+        size += len(frame)
+    return size
+
+
+def benchmark(name: str, create_producer: Callable[[bytes], _Producer], size):
+    content = os.urandom(size)
+    producer = create_producer(content)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    sent = asyncio.run(_consume(producer))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mb = 1024 * 1024
+    print(
+        f"{name},{size / mb:.1f},{sent / mb:.1f},"
+        f"{elapsed * 1e3:.3f},{peak / mb:.1f}"
+    )
+
+
+PRODUCERS = {
+    "add_attachment": add_attachment,
+    "astream_attachment": stream_attachment,
+}
+
+if __name__ == "__main__":
+    print("Description,Content MB,Sent MB,Msec,Peak MB")
+    for size in [1024 * 1024, 20 * 1024 * 1024]:
+        for name, create_producer in PRODUCERS.items():
+            benchmark(name, create_producer, size)
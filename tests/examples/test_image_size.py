@@ -1,15 +1,16 @@
+import base64
+
+import httpx
+import respx
+
 from examples.image_size.app.main import app
 from tests.utils.client import create_test_client
 
+IMAGE = "iVBORw0KGgoAAAANSUhEUgAAAAUAAAAFCAYAAACNbyblAAAAHElEQVQI12P4//8/w38GIAXDIBKE0DHxgljNBAAO9TXL0Y4OHwAAAABJRU5ErkJggg=="
 
-def test_app():
-    client = create_test_client(app, name="image-size")
 
-    attachment = {
-        "type": "image/png",
-        "data": "iVBORw0KGgoAAAANSUhEUgAAAAUAAAAFCAYAAACNbyblAAAAHElEQVQI12P4//8/w38GIAXDIBKE0DHxgljNBAAO9TXL0Y4OHwAAAABJRU5ErkJggg==",
-        "title": "Image",
-    }
+def _get_image_size(attachment: dict) -> str:
+    client = create_test_client(app, name="image-size")
 
     response = client.post(
         "chat/completions",
@@ -26,6 +27,21 @@ def test_app():
 
     body = response.json()
     response_message = body["choices"][0]["message"]
-    response_content = response_message["content"]
+    return response_message["content"]
+
+
+def test_app():
+    attachment = {"type": "image/png", "data": IMAGE, "title": "Image"}
+
+    assert _get_image_size(attachment) == "Size: 5x5px"
+
+
+@respx.mock
+def test_app_with_external_url():
+    url = "http://example.com/image.png"
+    respx.get(url).mock(
+        return_value=httpx.Response(200, content=base64.b64decode(IMAGE))
+    )
+    attachment = {"type": "image/png", "url": url, "title": "Image"}
 
-    assert response_content == "Size: 5x5px"
+    assert _get_image_size(attachment) == "Size: 5x5px"
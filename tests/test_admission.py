@@ -0,0 +1,240 @@
+import asyncio
+from typing import List
+
+import httpx
+import pytest
+
+from aidial_sdk import DIALApp
+from aidial_sdk.chat_completion import (
+    AdmissionConfig,
+    ChatCompletion,
+    Request,
+    Response,
+)
+from aidial_sdk.chat_completion.admission import AdmissionController
+from aidial_sdk.exceptions import TooManyRequestsError
+
+
+async def test_fifo_order():
+    controller = AdmissionController(
+        AdmissionConfig(max_concurrency=1, max_queue=10)
+    )
+    release = await controller.acquire()
+
+    order: List[int] = []
+
+    async def _request(idx: int):
+        release = await controller.acquire()
+        order.append(idx)
+        await asyncio.sleep(0)
+        release()
+
+    tasks = [asyncio.create_task(_request(idx)) for idx in range(5)]
+    await asyncio.sleep(0)
+    assert controller.metrics.queued == 5
+
+    release()
+    # The new request can't overtake the queued ones
+    tasks.append(asyncio.create_task(_request(5)))
+    await asyncio.gather(*tasks)
+
+    assert order == [0, 1, 2, 3, 4, 5]
+    metrics = controller.metrics
+    assert (metrics.in_flight, metrics.queued, metrics.rejected) == (0, 0, 0)
+
+
+async def test_queue_is_full():
+    controller = AdmissionController(
+        AdmissionConfig(max_concurrency=1, max_queue=1, retry_after=5)
+    )
+    await controller.acquire()
+    queued = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(TooManyRequestsError) as exc_info:
+        await controller.acquire()
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "5"}
+    assert controller.metrics.rejected == 1
+
+    queued.cancel()
+
+
+async def test_queue_timeout():
+    controller = AdmissionController(
+        AdmissionConfig(max_concurrency=1, max_queue=1, queue_timeout=0.01)
+    )
+    await controller.acquire()
+
+    with pytest.raises(TooManyRequestsError):
+        await controller.acquire()
+
+    metrics = controller.metrics
+    assert (metrics.in_flight, metrics.queued, metrics.rejected) == (1, 0, 1)
+
+
+async def test_release_is_idempotent():
+    controller = AdmissionController(AdmissionConfig(max_concurrency=2))
+    release = await controller.acquire()
+    await controller.acquire()
+
+    release()
+    release()
+
+    assert controller.metrics.in_flight == 1
+
+
+async def test_cancelled_waiter_passes_slot_on():
+    controller = AdmissionController(
+        AdmissionConfig(max_concurrency=1, max_queue=2)
+    )
+    release = await controller.acquire()
+
+    cancelled = asyncio.create_task(controller.acquire())
+    admitted = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+
+    # The slot is handed over to the waiter right before its cancellation
+    release()
+    cancelled.cancel()
+
+    await asyncio.wait_for(admitted, timeout=1)
+    assert controller.metrics.in_flight == 1
+
+
+class BlockingApplication(ChatCompletion):
+    def __init__(self) -> None:
+        self.started = 0
+        self.event = asyncio.Event()
+
+    async def chat_completion(
+        self, request: Request, response: Response
+    ) -> None:
+        self.started += 1
+        await self.event.wait()
+        with response.create_single_choice() as choice:
+            choice.append_content("Test content")
+
+
+@pytest.mark.parametrize("stream", [False, True])
+async def test_app_admission(stream: bool):
+    impl = BlockingApplication()
+    app = DIALApp().add_chat_completion(
+        "test-deployment-name",
+        impl,
+        admission=AdmissionConfig(max_concurrency=1, max_queue=1),
+    )
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),  # type: ignore
+        base_url="http://testserver/openai/deployments/test-deployment-name",
+        headers={"api-key": "TEST_API_KEY"},
+    ) as client:
+
+        async def _post() -> httpx.Response:
+            return await client.post(
+                "chat/completions",
+                json={"messages": [], "stream": stream},
+            )
+
+        first = asyncio.create_task(_post())
+        second = asyncio.create_task(_post())
+        await asyncio.sleep(0.1)
+
+        metrics = app.get_admission_metrics("test-deployment-name")
+        assert metrics is not None
+        assert (metrics.in_flight, metrics.queued) == (1, 1)
+        assert impl.started == 1
+
+        rejected = await _post()
+        assert rejected.status_code == 429
+        assert rejected.headers["Retry-After"] == "1"
+        assert rejected.json()["error"]["type"] == "rate_limit_error"
+
+        impl.event.set()
+        responses = await asyncio.gather(first, second)
+
+    assert [r.status_code for r in responses] == [200, 200]
+    assert impl.started == 2
+
+    metrics = app.get_admission_metrics("test-deployment-name")
+    assert metrics is not None
+    assert (metrics.in_flight, metrics.queued, metrics.rejected) == (0, 0, 1)
+
+
+def test_no_admission_metrics_by_default():
+    app = DIALApp().add_chat_completion(
+        "test-deployment-name", BlockingApplication()
+    )
+    assert app.get_admission_metrics("test-deployment-name") is None
+
+
+class EndlessApplication(ChatCompletion):
+    async def chat_completion(
+        self, request: Request, response: Response
+    ) -> None:
+        with response.create_single_choice() as choice:
+            while True:
+                choice.append_content("Test content")
+                await asyncio.sleep(0.01)
+
+
+async def test_slot_is_released_on_client_disconnect():
+    app = DIALApp().add_chat_completion(
+        "test-deployment-name",
+        EndlessApplication(),
+        admission=AdmissionConfig(max_concurrency=1),
+    )
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/openai/deployments/test-deployment-name/chat/completions",
+        "raw_path": b"/openai/deployments/test-deployment-name/chat/completions",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"api-key", b"TEST_API_KEY"),
+        ],
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+    }
+    requested = False
+    disconnected = asyncio.Event()
+
+    async def _receive() -> dict:
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {
+                "type": "http.request",
+                "body": b'{"messages": [], "stream": true}',
+                "more_body": False,
+            }
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    sent_chunks = 0
+
+    async def _send(message: dict) -> None:
+        nonlocal sent_chunks
+        if message["type"] == "http.response.body":
+            sent_chunks += 1
+            if sent_chunks == 3:
+                disconnected.set()
+                raise OSError("Broken pipe")
+
+    with pytest.raises(Exception):
+        await asyncio.wait_for(app(scope, _receive, _send), timeout=5)
+
+    metrics = app.get_admission_metrics("test-deployment-name")
+    assert metrics is not None
+    assert metrics.in_flight == 0
+
+    # Let the producer notice the disconnect and stop
+    await asyncio.sleep(0.1)
@@ -0,0 +1,126 @@
+import base64
+from unittest import mock
+
+import httpx
+import pytest
+import respx
+
+from aidial_sdk.chat_completion import Attachment
+from aidial_sdk.exceptions import HTTPException as DIALException
+from aidial_sdk.storage import StorageClient
+
+CONTENT = b"\x89PNG\r\n\x1a\n"
+DATA = base64.b64encode(CONTENT).decode()
+
+DIAL_URL = "http://dial"
+
+
+def test_data_is_decoded_once():
+    attachment = Attachment(type="image/png", data=DATA)
+
+    with mock.patch(
+        "aidial_sdk.chat_completion.request.base64.b64decode",
+        wraps=base64.b64decode,
+    ) as b64decode:
+        first = attachment.bytes()
+        second = attachment.bytes()
+        file = attachment.open()
+
+    assert b64decode.call_count == 1
+    assert first == CONTENT and second == CONTENT
+    assert first.obj is second.obj
+    assert file.read() == CONTENT
+
+
+def test_attachment_is_serialized_without_content():
+    attachment = Attachment(type="image/png", data=DATA)
+    attachment.bytes()
+
+    assert attachment.dict() == Attachment(type="image/png", data=DATA).dict()
+
+
+@pytest.mark.parametrize(
+    "attachment",
+    [Attachment(data="not base64"), Attachment(data=None)],
+)
+def test_invalid_attachment(attachment: Attachment):
+    with pytest.raises(DIALException) as exc_info:
+        attachment.bytes()
+
+    assert exc_info.value.status_code == 400
+
+
+def test_url_attachment_must_be_loaded():
+    with pytest.raises(DIALException) as exc_info:
+        Attachment(url="files/bucket/image.png").bytes()
+
+    assert exc_info.value.status_code == 500
+
+
+async def test_load_data():
+    attachment = Attachment(data=DATA)
+
+    assert await attachment.load() == CONTENT
+
+
+@pytest.fixture
+async def storage():
+    client = StorageClient(DIAL_URL)
+    yield client
+    await client.aclose()
+
+
+@respx.mock
+async def test_load_from_dial_storage(storage: StorageClient):
+    route = respx.get(f"{DIAL_URL}/v1/files/bucket/image.png").mock(
+        return_value=httpx.Response(200, content=CONTENT)
+    )
+    attachment = Attachment(url="files/bucket/image.png")
+
+    assert await attachment.load(storage, "TEST_API_KEY") == CONTENT
+    assert await attachment.load(storage, "TEST_API_KEY") == CONTENT
+    assert attachment.open().read() == CONTENT
+
+    assert route.call_count == 1
+    assert route.calls[0].request.headers["api-key"] == "TEST_API_KEY"
+
+
+@pytest.mark.parametrize(
+    "url, with_api_key",
+    [
+        (f"{DIAL_URL}/v1/files/bucket/image.png", True),
+        (f"{DIAL_URL}:80/v1/files/bucket/image.png", True),
+        ("http://external/image.png", False),
+        ("http://dial.evil.com/image.png", False),
+        ("http://dial:8080/image.png", False),
+        ("https://dial/image.png", False),
+    ],
+)
+@respx.mock
+async def test_api_key_is_only_sent_to_dial(
+    storage: StorageClient, url: str, with_api_key: bool
+):
+    route = respx.get(url).mock(
+        return_value=httpx.Response(200, content=CONTENT)
+    )
+
+    assert await Attachment(url=url).load(storage, "TEST_API_KEY") == CONTENT
+    assert ("api-key" in route.calls[0].request.headers) == with_api_key
+
+
+@respx.mock
+async def test_connections_are_reused(storage: StorageClient):
+    respx.get(url__regex=r".*").mock(
+        return_value=httpx.Response(200, content=CONTENT)
+    )
+
+    await Attachment(url="files/bucket/a.png").load(storage, "TEST_API_KEY")
+    client = storage._get_client()
+    await Attachment(url="http://external/b.png").load(storage)
+
+    assert storage._get_client() is client
+
+
+async def test_load_from_url_without_storage():
+    with pytest.raises(DIALException):
+        await Attachment(url="files/bucket/image.png").load()
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from aidial_sdk.chat_completion import (
+    BackpressureConfig,
+    Request,
+    Response,
+    Status,
+)
+from aidial_sdk.exceptions import HTTPException as DIALException
+from tests.utils.constants import DUMMY_DIAL_REQUEST
+
+
+async def _collect_deltas(
+    producer, backpressure: Optional[BackpressureConfig]
+) -> List[dict]:
+    request = DUMMY_DIAL_REQUEST.copy(update={"stream": True})
+    response = Response(request, backpressure=backpressure)
+
+    deltas = []
+    async for chunk in response._generate_stream(producer):
+        assert not isinstance(chunk, DIALException)
+        deltas.append(chunk.to_dict(with_defaults=False)["choices"][0]["delta"])
+        # A slow client
+        await asyncio.sleep(0.001)
+
+    producer.metrics = response.queue_metrics
+    return deltas
+
+
+def _contents(deltas: List[dict]) -> List[str]:
+    return [d["content"] for d in deltas if d.get("content")]
+
+
+async def test_async_producer_waits():
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            for idx in range(50):
+                await choice.aappend_content(f"{idx} ")
+
+    deltas = await _collect_deltas(_producer, BackpressureConfig(max_chunks=2))
+
+    assert _contents(deltas) == [f"{idx} " for idx in range(50)]
+    metrics = _producer.metrics  # type: ignore
+    assert metrics.max_depth <= 3
+    assert metrics.blocked_time > 0
+    assert metrics.coalesced_chunks == 0
+    assert metrics.overflowed_chunks == 0
+
+
+async def test_sync_producer_falls_back_to_coalescing():
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            for idx in range(50):
+                choice.append_content(f"{idx} ")
+            with choice.create_stage("stage") as stage:
+                for idx in range(50):
+                    stage.append_content(f"{idx} ")
+            call = choice.create_function_tool_call("id", "name", "{")
+            for idx in range(50):
+                call.append_arguments(f"{idx}")
+            call.append_arguments("}")
+
+    deltas = await _collect_deltas(_producer, BackpressureConfig(max_chunks=2))
+
+    expected = "".join(f"{idx} " for idx in range(50))
+    assert "".join(_contents(deltas)) == expected
+    assert len(_contents(deltas)) == 1
+
+    stage_contents = [
+        stage["content"]
+        for d in deltas
+        for stage in d.get("custom_content", {}).get("stages", [])
+        if "content" in stage
+    ]
+    assert "".join(stage_contents) == expected
+
+    arguments = [
+        call["function"]["arguments"]
+        for d in deltas
+        for call in d.get("tool_calls", [])
+    ]
+    assert "".join(arguments) == "{" + "".join(map(str, range(50))) + "}"
+
+    metrics = _producer.metrics  # type: ignore
+    assert metrics.coalesced_chunks > 0
+    assert metrics.blocked_time == 0
+
+
+async def test_max_bytes():
+    data = "x" * 1000
+
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            for _ in range(10):
+                await choice.aadd_attachment(data=data)
+            with choice.create_stage() as stage:
+                for _ in range(10):
+                    await stage.aadd_attachment(data=data)
+                stage.close(Status.COMPLETED)
+
+    deltas = await _collect_deltas(
+        _producer, BackpressureConfig(max_bytes=1500)
+    )
+
+    assert len([d for d in deltas if "custom_content" in d]) == 10 + 10 + 2
+    metrics = _producer.metrics  # type: ignore
+    assert metrics.max_size <= 2000
+    assert metrics.size == 0
+
+
+async def test_sync_attachments_overflow(caplog):
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            for _ in range(10):
+                choice.add_attachment(data="data")
+
+    with caplog.at_level(logging.WARNING):
+        deltas = await _collect_deltas(
+            _producer, BackpressureConfig(max_chunks=2)
+        )
+
+    assert len([d for d in deltas if "custom_content" in d]) == 10
+    metrics = _producer.metrics  # type: ignore
+    assert metrics.max_depth > 2
+    assert metrics.overflowed_chunks > 0
+    warnings = [r for r in caplog.records if r.levelname == "WARNING"]
+    assert len(warnings) == 1
+    assert "Choice.aadd_attachment" in warnings[0].getMessage()
+
+
+async def test_no_limits_by_default():
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            for idx in range(50):
+                await choice.aappend_content(f"{idx} ")
+                choice.append_content(f"{idx} ")
+
+    deltas = await _collect_deltas(_producer, None)
+
+    assert len(_contents(deltas)) == 100
+    metrics = _producer.metrics  # type: ignore
+    assert metrics.max_depth > 3
+    assert metrics.coalesced_chunks == 0
+    assert metrics.blocked_time == 0
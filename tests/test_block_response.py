@@ -0,0 +1,155 @@
+import json
+import random
+from typing import AsyncIterator, List
+
+import pytest
+
+from aidial_sdk.chat_completion import Request, Response, Status
+from aidial_sdk.chat_completion.chunks import BaseChunkWithDefaults
+from aidial_sdk.utils._block_response import BlockResponseAccumulator
+from aidial_sdk.utils.streaming import merge_chunks
+from tests.utils.constants import DUMMY_DIAL_REQUEST
+from tests.utils.sharing import collect_shared_mutable_objects
+
+
+def _random_producer(seed: int, n: int):
+    async def _producer(request: Request, response: Response) -> None:
+        rnd = random.Random(seed)
+
+        choices = [response.create_choice() for _ in range(n)]
+        for choice in choices:
+            choice.open()
+
+        stages = {idx: [] for idx in range(n)}
+        tool_calls = {idx: [] for idx in range(n)}
+
+        for step in range(rnd.randint(0, 200)):
+            choice = rnd.choice(choices)
+            action = rnd.randint(0, 9)
+
+            if action <= 2:
+                choice.append_content(f"{step} ")
+            elif action == 3:
+                choice.add_attachment(url=f"url{step}", title=f"{step}")
+            elif action == 4:
+                stages[choice.index].append(
+                    choice.create_stage(rnd.choice([None, f"stage{step}"]))
+                )
+                stages[choice.index][-1].open()
+            elif action == 5 and stages[choice.index]:
+                stage = rnd.choice(stages[choice.index])
+                if not stage._closed:
+                    rnd.choice(
+                        [
+                            lambda: stage.append_content(f"{step} "),
+                            lambda: stage.append_name(f"{step}"),
+                            lambda: stage.add_attachment(data=f"{step}"),
+                            lambda: stage.close(
+                                rnd.choice([Status.COMPLETED, Status.FAILED])
+                            ),
+                        ]
+                    )()
+            elif action == 6:
+                tool_calls[choice.index].append(
+                    choice.create_function_tool_call(
+                        f"id{step}", f"name{step}", rnd.choice([None, "{"])
+                    )
+                )
+            elif action == 7 and tool_calls[choice.index]:
+                rnd.choice(tool_calls[choice.index]).append_arguments(f"{step}")
+
+        for idx in rnd.sample(range(n), n):
+            for stage in stages[idx]:
+                if not stage._closed:
+                    stage.close()
+            choices[idx].close()
+
+        if rnd.random() < 0.5:
+            response.set_usage(rnd.randint(0, 10), rnd.randint(0, 10))
+        if rnd.random() < 0.5:
+            response.add_usage_per_model("model", 1, 2)
+
+    return _producer
+
+
+async def _collect_chunks(seed: int, n: int) -> List[BaseChunkWithDefaults]:
+    request = DUMMY_DIAL_REQUEST.copy(update={"stream": False, "n": n})
+    response = Response(request)
+
+    chunks = []
+    async for chunk in response._generate_stream(_random_producer(seed, n)):
+        assert isinstance(chunk, BaseChunkWithDefaults)
+        chunks.append(chunk)
+    return chunks
+
+
+async def _merge_chunk_dicts(chunks: List[BaseChunkWithDefaults]) -> dict:
+    async def _stream() -> AsyncIterator[dict]:
+        for idx, chunk in enumerate(chunks):
+            yield chunk.to_dict(with_defaults=idx == 0)
+
+    return await merge_chunks(_stream())
+
+
+@pytest.mark.parametrize("n", [1, 3])
+@pytest.mark.parametrize("seed", range(30))
+async def test_accumulator_matches_merging(seed: int, n: int):
+    chunks = await _collect_chunks(seed, n)
+
+    accumulator = BlockResponseAccumulator()
+    for chunk in chunks:
+        accumulator.add(chunk)
+    actual = accumulator.finalize()
+
+    expected = await _merge_chunk_dicts(chunks)
+
+    # Comparing serialized objects to check the order of the keys as well
+    assert json.dumps(actual) == json.dumps(expected)
+
+
+async def test_state_is_not_shared_with_response():
+    state = {"xs": [{"index": 0, "a": "x"}], "ys": [1, 2]}
+
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            choice.set_state(state)
+
+    request = DUMMY_DIAL_REQUEST.copy(update={"stream": False})
+    response = Response(request)
+
+    accumulator = BlockResponseAccumulator()
+    async for chunk in response._generate_stream(_producer):
+        assert isinstance(chunk, BaseChunkWithDefaults)
+        accumulator.add(chunk)
+    result = accumulator.finalize()
+
+    assert result["choices"][0]["message"]["custom_content"]["state"] == {
+        "xs": [{"a": "x"}],
+        "ys": [1, 2],
+    }
+    assert collect_shared_mutable_objects(result, state) == set()
+
+
+async def test_tool_call_type_is_merged_once():
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            call = choice.create_function_tool_call("id", "name", "{")
+            call.append_arguments('"x": 1')
+            call.append_arguments("}")
+
+    request = DUMMY_DIAL_REQUEST.copy(update={"stream": False})
+    response = Response(request)
+
+    accumulator = BlockResponseAccumulator()
+    async for chunk in response._generate_stream(_producer):
+        assert isinstance(chunk, BaseChunkWithDefaults)
+        accumulator.add(chunk)
+    result = accumulator.finalize()
+
+    assert result["choices"][0]["message"]["tool_calls"] == [
+        {
+            "id": "id",
+            "type": "function",
+            "function": {"name": "name", "arguments": '{"x": 1}'},
+        }
+    ]
@@ -0,0 +1,98 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from aidial_sdk.utils._cache import AsyncTTLCache
+
+
+class Loader:
+    calls: List[str]
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    def __call__(self, key: str):
+        async def _load() -> str:
+            self.calls.append(key)
+            await asyncio.sleep(0.01)
+            return key.upper()
+
+        return _load
+
+
+async def test_value_is_cached():
+    cache: AsyncTTLCache[str, str] = AsyncTTLCache(ttl=60, max_entries=10)
+    load = Loader()
+
+    assert await cache.get_or_load("a", load("a")) == "A"
+    assert await cache.get_or_load("a", load("a")) == "A"
+    assert load.calls == ["a"]
+
+
+async def test_value_expires():
+    cache: AsyncTTLCache[str, str] = AsyncTTLCache(ttl=0, max_entries=10)
+    load = Loader()
+
+    await cache.get_or_load("a", load("a"))
+    await cache.get_or_load("a", load("a"))
+
+    assert load.calls == ["a", "a"]
+    assert cache.get("a") is None
+
+
+async def test_least_recently_used_is_evicted():
+    cache: AsyncTTLCache[str, str] = AsyncTTLCache(ttl=60, max_entries=2)
+    load = Loader()
+
+    for key in ["a", "b", "a", "c", "a", "b"]:
+        await cache.get_or_load(key, load(key))
+
+    assert load.calls == ["a", "b", "c", "b"]
+    assert len(cache) == 2
+
+
+async def test_concurrent_misses_are_coalesced():
+    cache: AsyncTTLCache[str, str] = AsyncTTLCache(ttl=60, max_entries=10)
+    load = Loader()
+
+    values = await asyncio.gather(
+        *[cache.get_or_load(key, load(key)) for key in ["a", "b"] * 10]
+    )
+
+    assert values == ["A", "B"] * 10
+    assert load.calls == ["a", "b"]
+
+
+async def test_errors_are_not_cached():
+    cache: AsyncTTLCache[str, str] = AsyncTTLCache(ttl=60, max_entries=10)
+    calls = 0
+
+    async def _fail() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    results = await asyncio.gather(
+        *[cache.get_or_load("a", _fail) for _ in range(3)],
+        return_exceptions=True,
+    )
+    assert calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+    with pytest.raises(ValueError):
+        await cache.get_or_load("a", _fail)
+    assert calls == 2
+
+
+async def test_cancelled_waiter_does_not_cancel_loading():
+    cache: AsyncTTLCache[str, str] = AsyncTTLCache(ttl=60, max_entries=10)
+    load = Loader()
+
+    waiter = asyncio.create_task(cache.get_or_load("a", load("a")))
+    await asyncio.sleep(0)
+    waiter.cancel()
+
+    assert await cache.get_or_load("a", load("a")) == "A"
+    assert load.calls == ["a"]
@@ -6,6 +6,7 @@ import pytest
 from aidial_sdk.chat_completion.response import (
     Response as ChatCompletionResponse,
 )
+from aidial_sdk.utils._cancel_scope import CancelScope
 from aidial_sdk.utils.streaming import add_heartbeat
 from tests.utils.constants import DUMMY_DIAL_REQUEST
 
@@ -121,3 +122,22 @@ async def test_cancellation(
         counter.cancelled == expected_cancelled
         and counter.done == expected_done
     ), "Stream should have been cancelled"
+
+
+async def test_cancel_scope_failed_task_cancels_siblings():
+    async def _fail():
+        raise ValueError("failed")
+
+    async with CancelScope() as cs:
+        sibling = cs.create_task(asyncio.sleep(10))
+        cs.create_task(_fail())
+
+    assert sibling.cancelled()
+
+
+async def test_cancel_scope_cancelled_task_keeps_siblings():
+    async with CancelScope() as cs:
+        sibling = cs.create_task(asyncio.sleep(0.01, result="done"))
+        cs.create_task(asyncio.sleep(10)).cancel()
+
+    assert sibling.result() == "done"
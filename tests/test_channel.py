@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from aidial_sdk.utils._channel import Channel
+
+
+async def test_drain_returns_pending_items_in_order():
+    channel: Channel[int] = Channel()
+    for idx in range(5):
+        channel.put_nowait(idx)
+
+    assert await channel.wait()
+    assert list(channel.drain()) == [0, 1, 2, 3, 4]
+    assert channel.empty()
+
+
+async def test_consumer_is_woken_up_by_producer():
+    channel: Channel[int] = Channel()
+
+    async def _producer():
+        for idx in range(3):
+            await asyncio.sleep(0.01)
+            channel.put_nowait(idx)
+
+    task = asyncio.create_task(_producer())
+    assert [await channel.get() for _ in range(3)] == [0, 1, 2]
+    await task
+
+
+@pytest.mark.parametrize("timeout", [0, 0.01])
+async def test_wait_timeout(timeout: float):
+    channel: Channel[int] = Channel()
+    assert not await channel.wait(timeout)
+
+    channel.put_nowait(1)
+    assert await channel.wait(timeout)
+
+
+async def test_join_waits_for_all_items_to_be_done():
+    channel: Channel[int] = Channel()
+    channel.put_nowait(1)
+    channel.put_nowait(2)
+
+    join = asyncio.create_task(channel.join())
+    channel.drain()
+
+    channel.task_done()
+    await asyncio.sleep(0)
+    assert not join.done()
+
+    channel.task_done()
+    await asyncio.wait_for(join, timeout=1)
+
+
+async def test_single_consumer():
+    channel: Channel[int] = Channel()
+    consumer = asyncio.create_task(channel.wait())
+    await asyncio.sleep(0)
+
+    with pytest.raises(AssertionError, match="single consumer"):
+        await channel.wait()
+
+    consumer.cancel()
+
+
+async def test_put_waits_until_consumer_catches_up():
+    channel: Channel[str] = Channel(max_items=2, max_size=5, sizeof=len)
+    await channel.put("ab")
+    await channel.put("cde")
+    assert channel.full()
+
+    put = asyncio.create_task(channel.put("f"))
+    await asyncio.sleep(0)
+    assert not put.done()
+
+    assert channel.get_nowait() == "ab"
+    await asyncio.wait_for(put, timeout=1)
+    assert list(channel.drain()) == ["cde", "f"]
+    assert channel.size == 0
+
+
+async def test_wait_empty_returns_once_items_are_taken():
+    channel: Channel[int] = Channel()
+    channel.put_nowait(1)
+    channel.put_nowait(2)
+
+    wait_empty = asyncio.create_task(channel.wait_empty())
+    channel.get_nowait()
+    await asyncio.sleep(0)
+    assert not wait_empty.done()
+
+    # The items don't have to be done, unlike join()
+    channel.get_nowait()
+    await asyncio.wait_for(wait_empty, timeout=1)
@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from aidial_sdk.chat_completion.chunks import (
+    BaseChunk,
+    BaseChunkWithDefaults,
+    ContentChunk,
+    ContentStageChunk,
+    DefaultChunk,
+    EndChoiceChunk,
+    FunctionToolCallChunk,
+)
+from aidial_sdk.chat_completion.enums import FinishReason
+from aidial_sdk.utils._chunk_encoder import _PLACEHOLDER, ChunkEncoder
+from aidial_sdk.utils.json import JSONSerializerName, get_json_serializer
+from tests.utils.serializers import serializers
+
+_ALPHABET = [
+    *"abc xyz019",
+    '"',
+    "\\",
+    "/",
+    "\n",
+    "\r",
+    "\t",
+    "\x00",
+    "\x1f",
+    "\x7f",
+    "é",
+    "ß",
+    "中",
+    " ",
+    "﻿",
+    "😀",
+    _PLACEHOLDER,
+]
+
+
+def _random_str(rnd: random.Random) -> str:
+    return "".join(rnd.choices(_ALPHABET, k=rnd.randint(0, 20)))
+
+
+def _random_chunk(rnd: random.Random) -> BaseChunk:
+    choice_index, index = rnd.randint(0, 2), rnd.randint(0, 2)
+    return rnd.choice(
+        [
+            lambda: ContentChunk(_random_str(rnd), choice_index),
+            lambda: ContentStageChunk(choice_index, index, _random_str(rnd)),
+            lambda: FunctionToolCallChunk(
+                choice_index, index, None, None, _random_str(rnd)
+            ),
+            lambda: FunctionToolCallChunk(
+                choice_index, index, "id", "name", _random_str(rnd)
+            ),
+            lambda: EndChoiceChunk(FinishReason.STOP, choice_index),
+        ]
+    )()
+
+
+def _random_defaults(rnd: random.Random) -> DefaultChunk:
+    defaults = DefaultChunk(
+        id=_random_str(rnd),
+        created=rnd.randint(0, 2**31),
+        object="chat.completion.chunk",
+    )
+    if rnd.random() < 0.5:
+        defaults["model"] = _random_str(rnd)
+    return defaults
+
+
+@serializers
+@pytest.mark.parametrize("seed", range(20))
+def test_encoder_matches_dict_serialization(
+    json_serializer: JSONSerializerName, seed: int
+):
+    rnd = random.Random(seed)
+    serializer = get_json_serializer(json_serializer)
+    encoder = ChunkEncoder(serializer)
+
+    for _ in range(3):
+        defaults = _random_defaults(rnd)
+        for _ in range(100):
+            chunk = BaseChunkWithDefaults(
+                chunk=_random_chunk(rnd), defaults=defaults
+            )
+            expected = serializer.dumps(chunk.to_dict(with_defaults=True))
+            assert encoder.encode(chunk) == expected
+
+
+@serializers
+def test_placeholder_in_defaults(json_serializer: JSONSerializerName):
+    serializer = get_json_serializer(json_serializer)
+    defaults = DefaultChunk(id=_PLACEHOLDER, created=0, object="chunk")
+
+    chunk = BaseChunkWithDefaults(
+        chunk=ContentChunk("text", 0), defaults=defaults
+    )
+    expected = serializer.dumps(chunk.to_dict(with_defaults=True))
+    assert ChunkEncoder(serializer).encode(chunk) == expected
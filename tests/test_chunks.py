@@ -0,0 +1,61 @@
+import pytest
+
+from aidial_sdk.chat_completion.backpressure import ChunkQueue
+from aidial_sdk.chat_completion.choice import Choice
+from aidial_sdk.chat_completion.chunks import (
+    AttachmentChunk,
+    AttachmentStageChunk,
+    BaseChunkWithDefaults,
+    ContentChunk,
+    ContentStageChunk,
+    EndChoiceChunk,
+    FunctionToolCallChunk,
+    StartChoiceChunk,
+)
+from aidial_sdk.chat_completion.enums import FinishReason
+from aidial_sdk.exceptions import RuntimeServerError
+
+
+@pytest.mark.parametrize(
+    "chunk",
+    [
+        ContentChunk("content", 0),
+        ContentStageChunk(0, 0, "content"),
+        FunctionToolCallChunk(0, 0, None, None, "{}"),
+        StartChoiceChunk(0),
+        EndChoiceChunk(FinishReason.STOP, 0),
+        AttachmentChunk(choice_index=0, attachment_index=0, url="url"),
+        AttachmentStageChunk(
+            choice_index=0, stage_index=0, attachment_index=0, data="data"
+        ),
+        BaseChunkWithDefaults(chunk=ContentChunk("content", 0), defaults={}),
+    ],
+)
+def test_chunks_are_slotted(chunk):
+    assert not hasattr(chunk, "__dict__")
+
+
+@pytest.mark.parametrize(
+    "kwargs, message",
+    [
+        ({}, "Trying to add attachment without data and url"),
+        (
+            {"data": "data", "url": "url"},
+            "Trying to add attachment with data and url",
+        ),
+        ({"url": 1}, "str type expected"),
+    ],
+)
+def test_attachment_validation(caplog, kwargs: dict, message: str):
+    choice = Choice(ChunkQueue(), 0)
+    choice.open()
+
+    with pytest.raises(RuntimeServerError):
+        choice.add_attachment(**kwargs)
+
+    with choice.create_stage() as stage:
+        with pytest.raises(RuntimeServerError):
+            stage.add_attachment(**kwargs)
+
+    errors = [r.getMessage() for r in caplog.records if r.levelname == "ERROR"]
+    assert errors == [f"[None] {message}"] * 2
@@ -0,0 +1,198 @@
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from aidial_sdk.chat_completion import CoalescingConfig, Request, Response
+from aidial_sdk.exceptions import HTTPException as DIALException
+from aidial_sdk.utils.merge_chunks import cleanup_indices, merge
+from aidial_sdk.utils.streaming import to_block_response
+from tests.utils.constants import DUMMY_DIAL_REQUEST
+
+
+async def _collect_deltas(
+    producer, coalescing: Optional[CoalescingConfig], **request_fields
+) -> List[dict]:
+    request = DUMMY_DIAL_REQUEST.copy(update={"stream": True, **request_fields})
+    response = Response(request, coalescing=coalescing)
+
+    deltas = []
+    async for chunk in response._generate_stream(producer):
+        assert not isinstance(chunk, DIALException)
+        choice = chunk.to_dict(with_defaults=False)["choices"][0]
+        deltas.append({"index": choice["index"], **choice["delta"]})
+    return deltas
+
+
+async def _content_producer(request: Request, response: Response) -> None:
+    with response.create_single_choice() as choice:
+        for idx in range(100):
+            choice.append_content(f"{idx} ")
+        with choice.create_stage("stage") as stage:
+            stage.append_content("a")
+            stage.append_content("b")
+        call = choice.create_function_tool_call("id", "name", "{")
+        call.append_arguments('"x"')
+        call.append_arguments(": 1}")
+
+
+EXPECTED_CONTENT = "".join(f"{idx} " for idx in range(100))
+
+
+async def test_no_coalescing_by_default():
+    deltas = await _collect_deltas(_content_producer, None)
+    assert len(deltas) == 1 + 100 + 4 + 3 + 1
+
+
+async def test_coalescing():
+    deltas = await _collect_deltas(_content_producer, CoalescingConfig())
+    assert deltas == [
+        {"index": 0, "role": "assistant"},
+        {"index": 0, "content": EXPECTED_CONTENT},
+        {
+            "index": 0,
+            "custom_content": {
+                "stages": [{"index": 0, "name": "stage", "status": None}]
+            },
+        },
+        {
+            "index": 0,
+            "custom_content": {
+                "stages": [{"index": 0, "content": "ab", "status": None}]
+            },
+        },
+        {
+            "index": 0,
+            "custom_content": {"stages": [{"index": 0, "status": "completed"}]},
+        },
+        {
+            "index": 0,
+            "content": None,
+            "tool_calls": [
+                {
+                    "index": 0,
+                    "id": "id",
+                    "type": "function",
+                    "function": {"name": "name", "arguments": '{"x": 1}'},
+                }
+            ],
+        },
+        {"index": 0},
+    ]
+
+
+async def test_coalescing_max_bytes():
+    deltas = await _collect_deltas(
+        _content_producer, CoalescingConfig(max_bytes=100)
+    )
+    contents = [d["content"] for d in deltas if d.get("content")]
+
+    assert "".join(contents) == EXPECTED_CONTENT
+    assert len(contents) > 1
+    assert all(len(c) <= 100 for c in contents)
+
+
+async def test_coalescing_max_bytes_counts_utf8_bytes():
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            for _ in range(100):
+                # 3 characters, 6 bytes
+                choice.append_content("при")
+
+    deltas = await _collect_deltas(_producer, CoalescingConfig(max_bytes=60))
+    contents = [d["content"] for d in deltas if d.get("content")]
+
+    assert "".join(contents) == "при" * 100
+    assert [len(c.encode()) for c in contents] == [60] * 10
+
+
+@pytest.mark.parametrize("max_delay, expected_chunks", [(0, 10), (1.0, 1)])
+async def test_coalescing_max_delay(max_delay: float, expected_chunks: int):
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            for idx in range(10):
+                choice.append_content(str(idx))
+                await asyncio.sleep(0.01)
+
+    deltas = await _collect_deltas(
+        _producer, CoalescingConfig(max_delay=max_delay)
+    )
+    contents = [d["content"] for d in deltas if "content" in d]
+
+    assert "".join(contents) == "0123456789"
+    assert len(contents) == expected_chunks
+
+
+async def test_coalescing_keeps_choices_apart():
+    async def _producer(request: Request, response: Response) -> None:
+        choices = [response.create_choice() for _ in range(2)]
+        for choice in choices:
+            choice.open()
+        for idx in range(3):
+            for choice in choices:
+                choice.append_content(str(idx))
+        for choice in choices:
+            choice.close()
+
+    deltas = await _collect_deltas(_producer, CoalescingConfig(), n=2)
+
+    assert [d.get("content") for d in deltas if "content" in d] == [
+        "0",
+        "0",
+        "1",
+        "1",
+        "2",
+        "2",
+    ]
+
+
+async def test_aflush_waits_for_coalesced_chunks():
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            choice.append_content("a")
+            await asyncio.wait_for(response.aflush(), timeout=1)
+            choice.append_content("b")
+
+    deltas = await _collect_deltas(_producer, CoalescingConfig(max_delay=0.1))
+    assert [d["content"] for d in deltas if "content" in d] == ["a", "b"]
+
+
+async def test_block_response_is_not_affected():
+    request = DUMMY_DIAL_REQUEST.copy(update={"stream": False})
+    response = Response(request, coalescing=CoalescingConfig())
+
+    result = await to_block_response(
+        response._generate_stream(_content_producer)
+    )
+    assert result["choices"][0]["message"]["content"] == EXPECTED_CONTENT
+
+
+async def _merge_stream(coalescing: Optional[CoalescingConfig]) -> dict:
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            choice.append_content("Calling tools")
+            for idx in range(2):
+                call = choice.create_function_tool_call(
+                    f"id{idx}", f"name{idx}", "{"
+                )
+                for arg in range(10):
+                    call.append_arguments(f'"{arg}": {arg},')
+                call.append_arguments("}")
+
+    request = DUMMY_DIAL_REQUEST.copy(update={"stream": True})
+    response = Response(request, coalescing=coalescing)
+
+    chunks = []
+    async for chunk in response._generate_stream(_producer):
+        assert not isinstance(chunk, DIALException)
+        chunks.append(chunk.to_dict(with_defaults=False))
+    return cleanup_indices(merge({}, *chunks))
+
+
+async def test_coalesced_stream_merges_to_the_same_result():
+    merged = await _merge_stream(CoalescingConfig())
+
+    assert merged == await _merge_stream(None)
+    assert [
+        call["type"] for call in merged["choices"][0]["delta"]["tool_calls"]
+    ] == ["function", "function"]
@@ -0,0 +1,155 @@
+import asyncio
+import time
+from typing import List, Union
+
+import pytest
+
+from aidial_sdk import DIALApp
+from aidial_sdk.chat_completion import ChatCompletion, Request, Response
+from aidial_sdk.exceptions import DeadlineExceededError
+from aidial_sdk.exceptions import HTTPException as DIALException
+from tests.utils.client import create_test_client
+from tests.utils.constants import DUMMY_DIAL_REQUEST
+
+
+class SlowApplication(ChatCompletion):
+    remaining_time: List[Union[float, None]]
+    cancelled: int
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.remaining_time = []
+        self.cancelled = 0
+
+    async def chat_completion(
+        self, request: Request, response: Response
+    ) -> None:
+        self.remaining_time.append(request.remaining_time())
+        with response.create_single_choice() as choice:
+            choice.append_content("Test")
+            try:
+                await asyncio.sleep(self.delay)
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+            choice.append_content(" content")
+
+
+def _create_client(app: SlowApplication, **kwargs):
+    return create_test_client(
+        DIALApp().add_chat_completion("test-deployment-name", app, **kwargs)
+    )
+
+
+def test_no_deadline_by_default():
+    app = SlowApplication(delay=0)
+    response = _create_client(app).post(
+        "chat/completions", json={"messages": [], "stream": False}
+    )
+
+    assert response.status_code == 200
+    assert app.remaining_time == [None]
+
+
+def test_deployment_timeout():
+    app = SlowApplication(delay=10)
+
+    start = time.monotonic()
+    response = _create_client(app, timeout=0.1).post(
+        "chat/completions", json={"messages": [], "stream": False}
+    )
+
+    assert time.monotonic() - start < 5
+    assert response.status_code == 504
+    assert response.json() == {
+        "error": {
+            "message": "The request deadline has been exceeded",
+            "type": "timeout_error",
+            "code": "deadline_exceeded",
+        }
+    }
+    assert app.cancelled == 1
+    remaining_time = app.remaining_time[0]
+    assert remaining_time is not None and 0 < remaining_time <= 0.1
+
+
+def test_deadline_header_streaming():
+    app = SlowApplication(delay=10)
+
+    response = _create_client(app).post(
+        "chat/completions",
+        json={"messages": [], "stream": True},
+        headers={"X-DIAL-Deadline": str(time.time() + 0.1)},
+    )
+
+    assert response.status_code == 200
+    lines = [line for line in response.iter_lines() if line]
+    assert '"content":"Test"' in lines[1]
+    assert '"code":"deadline_exceeded"' in lines[-2]
+    assert lines[-1] == "data: [DONE]"
+    assert app.cancelled == 1
+
+
+def test_deadline_header_is_limited_by_timeout():
+    app = SlowApplication(delay=0)
+
+    response = _create_client(app, timeout=1).post(
+        "chat/completions",
+        json={"messages": [], "stream": False},
+        headers={"X-DIAL-Deadline": str(time.time() + 100)},
+    )
+
+    assert response.status_code == 200
+    remaining_time = app.remaining_time[0]
+    assert remaining_time is not None and remaining_time <= 1
+
+
+@pytest.mark.parametrize("deadline", ["tomorrow", "nan", "inf"])
+def test_invalid_deadline_header(deadline: str):
+    app = SlowApplication(delay=0)
+
+    response = _create_client(app).post(
+        "chat/completions",
+        json={"messages": [], "stream": False},
+        headers={"X-DIAL-Deadline": deadline},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["error"]["message"] == (
+        "X-DIAL-Deadline header must be a Unix timestamp in seconds"
+    )
+
+
+async def test_expired_deadline():
+    request = DUMMY_DIAL_REQUEST.copy()
+    request._limit_deadline(-1)
+    assert request.remaining_time() == 0
+
+    called = False
+
+    async def _producer(request: Request, response: Response) -> None:
+        nonlocal called
+        called = True
+
+    chunks = [
+        chunk async for chunk in Response(request)._generate_stream(_producer)
+    ]
+
+    assert not called
+    assert len(chunks) == 1 and isinstance(chunks[0], DeadlineExceededError)
+
+
+async def test_deadline_after_completion_is_ignored():
+    request = DUMMY_DIAL_REQUEST.copy()
+    request._limit_deadline(0.05)
+
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            choice.append_content("Test")
+
+    chunks = []
+    async for chunk in Response(request)._generate_stream(_producer):
+        chunks.append(chunk)
+        await asyncio.sleep(0.1)
+
+    assert not any(isinstance(chunk, DIALException) for chunk in chunks)
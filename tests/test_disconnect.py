@@ -0,0 +1,103 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from aidial_sdk import DIALApp
+from aidial_sdk.chat_completion import ChatCompletion, Request, Response
+
+
+class SlowApplication(ChatCompletion):
+    cancelled: int = 0
+
+    async def chat_completion(
+        self, request: Request, response: Response
+    ) -> None:
+        with response.create_single_choice() as choice:
+            with choice.create_stage("Retrieval"):
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    self.cancelled += 1
+                    raise
+
+
+async def _call_app(app: DIALApp, body: dict, disconnect_after: float):
+    request_messages = [
+        {
+            "type": "http.request",
+            "body": json.dumps(body).encode(),
+            "more_body": False,
+        }
+    ]
+
+    async def receive():
+        if request_messages:
+            return request_messages.pop(0)
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        pass
+
+    scope = {
+        "type": "http",
+        # Starlette doesn't watch for disconnects itself since ASGI 2.4
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/openai/deployments/test-deployment-name/chat/completions",
+        "raw_path": b"/openai/deployments/test-deployment-name/chat/completions",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"api-key", b"TEST_API_KEY"),
+            (b"content-type", b"application/json"),
+        ],
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+    }
+
+    await app(scope, receive, send)
+
+
+@pytest.mark.parametrize("stream", [False, True])
+async def test_disconnect_cancels_producer(stream: bool):
+    impl = SlowApplication()
+    app = DIALApp().add_chat_completion("test-deployment-name", impl)
+
+    start = time.monotonic()
+    await asyncio.wait_for(
+        _call_app(
+            app, {"messages": [], "stream": stream}, disconnect_after=0.1
+        ),
+        timeout=5,
+    )
+
+    assert time.monotonic() - start < 5
+    assert impl.cancelled == 1
+
+    metrics = app.get_cancellation_metrics("test-deployment-name")
+    assert metrics is not None
+    assert metrics.cancelled_requests == 1
+    assert 0.1 <= metrics.cancelled_work_time < 5
+
+
+async def test_disconnect_after_completion():
+    class FastApplication(ChatCompletion):
+        async def chat_completion(
+            self, request: Request, response: Response
+        ) -> None:
+            with response.create_single_choice() as choice:
+                choice.append_content("Test content")
+
+    app = DIALApp().add_chat_completion(
+        "test-deployment-name", FastApplication()
+    )
+
+    await _call_app(app, {"messages": [], "stream": False}, disconnect_after=0)
+
+    metrics = app.get_cancellation_metrics("test-deployment-name")
+    assert metrics is not None and metrics.cancelled_requests == 0
@@ -0,0 +1,219 @@
+from typing import Any
+
+import pytest
+
+from aidial_sdk import DIALApp
+from aidial_sdk.chat_completion import Request
+from aidial_sdk.chat_completion._fast_parsing import parse_messages
+from aidial_sdk.pydantic_v1 import BaseModel, SecretStr
+from tests.applications.noop import NoopApplication
+from tests.utils.client import create_test_client
+from tests.utils.constants import DUMMY_DIAL_REQUEST
+
+_FIELDS = {
+    "api_key_secret": SecretStr("dummy_key"),
+    "deployment_id": "",
+    "headers": {},
+    "original_request": DUMMY_DIAL_REQUEST.original_request,
+}
+
+_ATTACHMENT = {
+    "type": "image/png",
+    "title": "Image",
+    "data": "iVBORw0KGgo=",
+    "reference_url": None,
+}
+
+VALID_MESSAGES = [
+    [],
+    [{"role": "user", "content": "Hello"}],
+    [{"role": "system", "content": None, "name": "system"}],
+    [
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "What's on the image?"},
+                {"type": "image_url", "image_url": {"url": "http://img"}},
+                {
+                    "type": "image_url",
+                    "image_url": {"url": "http://img", "detail": "low"},
+                },
+            ],
+        }
+    ],
+    [
+        {
+            "role": "assistant",
+            "content": "Answer",
+            "custom_content": {
+                "stages": [
+                    {"name": "Stage", "status": "completed"},
+                    {
+                        "name": "Stage",
+                        "status": "failed",
+                        "content": "Failure",
+                        "attachments": [_ATTACHMENT],
+                    },
+                ],
+                "attachments": [_ATTACHMENT, {"url": "files/a.txt"}],
+                "state": {"key": ["value"]},
+                "form_value": None,
+            },
+        }
+    ],
+    [
+        {
+            "role": "assistant",
+            "tool_calls": [
+                {
+                    "id": "call_1",
+                    "type": "function",
+                    "function": {"name": "f", "arguments": "{}"},
+                },
+                {
+                    "index": 1,
+                    "id": "call_2",
+                    "type": "function",
+                    "function": {"name": "g", "arguments": "{}"},
+                },
+            ],
+        },
+        {"role": "tool", "tool_call_id": "call_1", "content": "Result"},
+        {
+            "role": "assistant",
+            "function_call": {"name": "f", "arguments": "{}"},
+        },
+        {"role": "function", "name": "f", "content": "Result"},
+    ],
+]
+
+# Valid messages which are coerced by pydantic
+COERCED_MESSAGES = [
+    [
+        {
+            "role": "assistant",
+            "tool_calls": [
+                {
+                    "index": "1",
+                    "id": "call_1",
+                    "type": "function",
+                    "function": {"name": "f", "arguments": "{}"},
+                }
+            ],
+        }
+    ],
+    [{"role": "assistant", "function_call": {"name": "f", "arguments": 1}}],
+]
+
+INVALID_MESSAGES = [
+    None,
+    "Hello",
+    [None],
+    [{"content": "Hello"}],
+    [{"role": "unknown", "content": "Hello"}],
+    [{"role": "user", "content": 1}],
+    [{"role": "user", "content": "Hello", "extra": 1}],
+    [{"role": "user", "content": [{"type": "text"}]}],
+    [{"role": "user", "content": [{"type": "audio", "audio": "data"}]}],
+    [
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "image_url",
+                    "image_url": {"url": "http://img", "detail": "max"},
+                }
+            ],
+        }
+    ],
+    [
+        {
+            "role": "assistant",
+            "custom_content": {"stages": [{"name": "Stage"}]},
+        }
+    ],
+    [
+        {
+            "role": "assistant",
+            "custom_content": {"attachments": [{"data": 1}]},
+        }
+    ],
+    [{"role": "assistant", "tool_calls": [{"id": "call_1"}]}],
+]
+
+
+def _assert_same(actual: Any, expected: Any):
+    assert type(actual) is type(expected)
+
+    if isinstance(expected, BaseModel):
+        assert actual.__fields_set__ == expected.__fields_set__
+        for name in expected.__fields__:
+            _assert_same(getattr(actual, name), getattr(expected, name))
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            _assert_same(a, e)
+    else:
+        assert actual == expected
+
+
+@pytest.mark.parametrize("messages", VALID_MESSAGES)
+def test_fast_path_matches_validation(messages):
+    body = {"messages": messages, "stream": True, "temperature": 0.5}
+
+    assert parse_messages(messages) is not None
+
+    _assert_same(
+        Request._from_body(body, fast_validation=True, **_FIELDS),
+        Request._from_body(body, fast_validation=False, **_FIELDS),
+    )
+
+
+@pytest.mark.parametrize("messages", COERCED_MESSAGES)
+def test_fallback_to_validation(messages):
+    body = {"messages": messages}
+
+    assert parse_messages(messages) is None
+
+    _assert_same(
+        Request._from_body(body, fast_validation=True, **_FIELDS),
+        Request._from_body(body, fast_validation=False, **_FIELDS),
+    )
+
+
+@pytest.mark.parametrize("messages", INVALID_MESSAGES)
+def test_invalid_messages_are_not_parsed(messages):
+    assert parse_messages(messages) is None
+
+
+def _create_client(fast_validation: bool):
+    app = DIALApp().add_chat_completion(
+        "test-deployment-name",
+        NoopApplication(),
+        fast_validation=fast_validation,
+    )
+    return create_test_client(app)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [{"messages": messages} for messages in INVALID_MESSAGES]
+    + [
+        {},
+        {"messages": [], "temperature": 3},
+        {"messages": [{"role": "user", "content": "Hello"}], "n": "many"},
+    ],
+)
+def test_same_errors(body):
+    expected = _create_client(fast_validation=False).post(
+        "chat/completions", json=body
+    )
+    actual = _create_client(fast_validation=True).post(
+        "chat/completions", json=body
+    )
+
+    assert expected.status_code == 400
+    assert (actual.status_code, actual.json()) == (
+        expected.status_code,
+        expected.json(),
+    )
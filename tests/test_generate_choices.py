@@ -0,0 +1,172 @@
+import asyncio
+from typing import List, Tuple
+
+import pytest
+
+from aidial_sdk.chat_completion import Choice, Request, Response
+from aidial_sdk.exceptions import HTTPException as DIALException
+from tests.utils.constants import DUMMY_DIAL_REQUEST
+
+
+async def _collect(producer, n: int) -> Tuple[List[dict], List[DIALException]]:
+    request = DUMMY_DIAL_REQUEST.copy(update={"stream": True, "n": n})
+    response = Response(request)
+
+    chunks, errors = [], []
+    async for chunk in response._generate_stream(producer):
+        if isinstance(chunk, DIALException):
+            errors.append(chunk)
+        else:
+            chunks.append(chunk.to_dict(with_defaults=False))
+    return chunks, errors
+
+
+def _content_indices(chunks: List[dict]) -> List[int]:
+    return [
+        choice["index"]
+        for chunk in chunks
+        for choice in chunk["choices"]
+        if choice["delta"].get("content")
+    ]
+
+
+async def test_choices_are_interleaved():
+    async def _generate(choice: Choice) -> None:
+        for _ in range(3):
+            await asyncio.sleep(0)
+            choice.append_content(f"{choice.index} ")
+
+    async def _producer(request: Request, response: Response) -> None:
+        await response.agenerate_choices(_generate)
+
+    chunks, errors = await _collect(_producer, n=3)
+
+    assert not errors
+    assert _content_indices(chunks) == [0, 1, 2] * 3
+    assert sorted(
+        choice["index"]
+        for chunk in chunks
+        for choice in chunk["choices"]
+        if choice.get("finish_reason") == "stop"
+    ) == [0, 1, 2]
+
+
+async def test_bursts_are_interleaved_round_robin():
+    async def _generate(choice: Choice) -> None:
+        # No awaits, so the whole burst is produced at once
+        for _ in range(3):
+            choice.append_content(f"{choice.index} ")
+
+    async def _producer(request: Request, response: Response) -> None:
+        await response.agenerate_choices(_generate)
+
+    chunks, errors = await _collect(_producer, n=2)
+
+    assert not errors
+    assert _content_indices(chunks) == [0, 1] * 3
+
+
+async def test_aflush_waits_for_choice_chunks():
+    events = []
+
+    async def _generate(response: Response, choice: Choice) -> None:
+        choice.append_content("content")
+        await response.aflush()
+        events.append(("flushed", choice.index))
+
+    async def _producer(request: Request, response: Response) -> None:
+        await response.agenerate_choices(
+            lambda choice: _generate(response, choice)
+        )
+
+    request = DUMMY_DIAL_REQUEST.copy(update={"stream": True, "n": 2})
+    async for chunk in Response(request)._generate_stream(_producer):
+        assert not isinstance(chunk, DIALException)
+        for index in _content_indices([chunk.to_dict(with_defaults=False)]):
+            events.append(("sent", index))
+
+    for index in range(2):
+        assert events.index(("sent", index)) < events.index(("flushed", index))
+
+
+@pytest.mark.parametrize("concurrency", [1, 2])
+async def test_concurrency_limit(concurrency: int):
+    running = 0
+    max_running = 0
+
+    async def _generate(choice: Choice) -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        choice.append_content("content")
+        running -= 1
+
+    async def _producer(request: Request, response: Response) -> None:
+        await response.agenerate_choices(_generate, concurrency=concurrency)
+
+    chunks, errors = await _collect(_producer, n=4)
+
+    assert not errors
+    assert max_running == concurrency
+    assert sorted(_content_indices(chunks)) == [0, 1, 2, 3]
+
+
+async def test_failed_choice_cancels_others():
+    cancelled = []
+
+    async def _generate(choice: Choice) -> None:
+        if choice.index == 1:
+            raise DIALException(message="Upstream failed", status_code=502)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(choice.index)
+            raise
+
+    async def _producer(request: Request, response: Response) -> None:
+        await response.agenerate_choices(_generate)
+
+    _, errors = await asyncio.wait_for(_collect(_producer, n=3), timeout=5)
+
+    assert [e.message for e in errors] == ["Upstream failed"]
+    assert sorted(cancelled) == [0, 2]
+
+
+async def test_remaining_choices_are_generated():
+    async def _generate(choice: Choice) -> None:
+        choice.append_content("generated")
+
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_choice() as choice:
+            choice.append_content("first")
+        await response.agenerate_choices(_generate)
+
+    chunks, errors = await _collect(_producer, n=2)
+
+    assert not errors
+    assert [
+        (choice["index"], choice["delta"]["content"])
+        for chunk in chunks
+        for choice in chunk["choices"]
+        if choice["delta"].get("content")
+    ] == [(0, "first"), (1, "generated")]
+
+
+async def test_first_error_is_raised():
+    async def _generate(choice: Choice) -> None:
+        if choice.index == 1:
+            await asyncio.sleep(0.01)
+            raise DIALException(message="Choice 1 failed", status_code=502)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            # Fails while being cancelled, i.e. after choice 1
+            raise DIALException(message="Choice 0 failed", status_code=502)
+
+    async def _producer(request: Request, response: Response) -> None:
+        await response.agenerate_choices(_generate)
+
+    _, errors = await asyncio.wait_for(_collect(_producer, n=2), timeout=5)
+
+    assert [e.message for e in errors] == ["Choice 1 failed"]
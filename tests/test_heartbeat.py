@@ -26,17 +26,22 @@ So we resort here to testing purely the output of the application and check the
 
 import asyncio
 from contextlib import contextmanager
-from typing import List, Optional, Union
+from typing import Callable, List, Optional, Union
 from unittest.mock import patch
 
 import pytest
 from pydantic import BaseModel
 
 from aidial_sdk.application import DIALApp
-from aidial_sdk.utils.streaming import add_heartbeat as original_add_heartbeat
+from aidial_sdk.chat_completion import Request, Response
+from aidial_sdk.exceptions import HTTPException as DIALException
+from aidial_sdk.utils._heartbeat import HeartbeatWheel
+from aidial_sdk.utils.logging import log_debug as original_log_debug
+from aidial_sdk.utils.streaming import HEARTBEAT_FRAME
 from tests.applications.idle import IdleApplication
 from tests.utils.chunks import check_sse_stream, create_single_choice_chunk
 from tests.utils.client import create_test_client
+from tests.utils.constants import DUMMY_DIAL_REQUEST
 
 BEAT = ": heartbeat"
 
@@ -58,13 +63,15 @@ def content(content: str):
 
 
 @contextmanager
-def mock_add_heartbeat(**extra_kwargs):
-    with patch("aidial_sdk.application.add_heartbeat") as mock:
+def mock_heartbeat_callback(callback: Callable[[], None]):
+    with patch("aidial_sdk.chat_completion.response.log_debug") as mock:
 
-        def _updated_add_heartbeat(*args, **kwargs):
-            return original_add_heartbeat(*args, **{**kwargs, **extra_kwargs})
+        def _log_debug(message: str, *args, **kwargs):
+            if message == "heartbeat":
+                callback()
+            original_log_debug(message, *args, **kwargs)
 
-        mock.side_effect = _updated_add_heartbeat
+        mock.side_effect = _log_debug
         yield mock
 
 
@@ -179,7 +186,7 @@ async def test_heartbeat(test_case: TestCase):
         nonlocal beats
         beats += 1
 
-    with mock_add_heartbeat(heartbeat_callback=inc_beat_counter):
+    with mock_heartbeat_callback(inc_beat_counter):
         name = "test-deployment-name"
         app = DIALApp().add_chat_completion(
             name,
@@ -209,3 +216,87 @@ async def test_heartbeat(test_case: TestCase):
         if test_case.heartbeat_interval is not None:
             await asyncio.sleep(test_case.heartbeat_interval * 2)
             assert beats == expected_beats
+
+
+async def _heartbeat_stream(
+    intervals: List[float],
+    heartbeat_interval: float,
+    heartbeat_wheel: Optional[HeartbeatWheel] = None,
+):
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            for interval in intervals:
+                await asyncio.sleep(interval)
+                choice.append_content("content")
+
+    response = Response(
+        DUMMY_DIAL_REQUEST.copy(update={"stream": True}),
+        heartbeat_interval=heartbeat_interval,
+        heartbeat_wheel=heartbeat_wheel,
+    )
+    return [
+        "beat" if chunk == HEARTBEAT_FRAME else "chunk"
+        async for chunk in response._generate_stream(_producer)
+        if not isinstance(chunk, DIALException)
+    ]
+
+
+@pytest.mark.parametrize("with_wheel", [False, True])
+async def test_no_heartbeats_while_chunks_flow(with_wheel: bool):
+    wheel = HeartbeatWheel(tick=0.01) if with_wheel else None
+    chunks = await _heartbeat_stream(
+        [0.02] * 15, heartbeat_interval=0.1, heartbeat_wheel=wheel
+    )
+    assert "beat" not in chunks
+
+
+@pytest.mark.parametrize("with_wheel", [False, True])
+async def test_heartbeats_while_idle(with_wheel: bool):
+    wheel = HeartbeatWheel(tick=0.01) if with_wheel else None
+    chunks = await _heartbeat_stream(
+        [0.35], heartbeat_interval=0.1, heartbeat_wheel=wheel
+    )
+    assert chunks == ["chunk"] + ["beat"] * 3 + ["chunk"] * 2
+
+
+async def test_no_heartbeats_for_block_response():
+    async def _producer(request: Request, response: Response) -> None:
+        await asyncio.sleep(0.2)
+        with response.create_single_choice() as choice:
+            choice.append_content("content")
+
+    response = Response(DUMMY_DIAL_REQUEST, heartbeat_interval=0.05)
+    chunks = [chunk async for chunk in response._generate_stream(_producer)]
+    assert HEARTBEAT_FRAME not in chunks
+
+
+async def test_heartbeat_wheel_is_shared():
+    wheel = HeartbeatWheel(tick=0.01, n_slots=8)
+    beats = [0] * 4
+
+    def _on_idle(idx: int):
+        def _callback():
+            beats[idx] += 1
+
+        return _callback
+
+    timers = [wheel.create_timer(0.1, _on_idle(idx)) for idx in range(4)]
+    for timer in timers:
+        timer.start()
+    assert wheel.active_count == 4
+
+    # The first stream is never idle for long
+    for _ in range(10):
+        await asyncio.sleep(0.03)
+        timers[0].touch()
+
+    for timer in timers:
+        timer.stop()
+    assert wheel.active_count == 0
+
+    assert beats[0] == 0
+    # The intervals span several rounds of the wheel
+    assert all(2 <= b <= 3 for b in beats[1:])
+
+    await asyncio.sleep(0.05)
+    assert wheel._timer is None
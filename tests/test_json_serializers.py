@@ -0,0 +1,158 @@
+import json
+
+import pytest
+
+from aidial_sdk import DIALApp
+from aidial_sdk.chat_completion import ChatCompletion, Request, Response
+from aidial_sdk.utils.json import (
+    JSONSerializerName,
+    StdlibJSONSerializer,
+    get_json_serializer,
+)
+from tests.applications.broken import ImmediatelyBrokenApplication
+from tests.applications.single_choice import SingleChoiceApplication
+from tests.utils.chunks import check_sse_stream, create_single_choice_chunk
+from tests.utils.client import create_test_client
+from tests.utils.serializers import serializers
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        {"a": 1, "b": [1.5, None, True], "c": {"d": "e"}},
+        {"unicode": "привет 👋", "escaped": 'quote " and \\ and \n'},
+        {"empty": {}, "list": []},
+    ],
+)
+@serializers
+def test_serializers_are_equivalent(
+    json_serializer: JSONSerializerName, obj: dict
+):
+    serializer = get_json_serializer(json_serializer)
+    if json_serializer == "stdlib":
+        expected = json.dumps(obj, separators=(",", ":")).encode()
+    else:
+        expected = StdlibJSONSerializer(ensure_ascii=False).dumps(obj)
+
+    actual = serializer.dumps(obj)
+
+    assert isinstance(actual, bytes)
+    assert actual == expected
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_stdlib_dumps_str(ensure_ascii: bool):
+    serializer = StdlibJSONSerializer(ensure_ascii=ensure_ascii)
+    s = 'привет 👋 "quoted"'
+
+    assert serializer.dumps_str(s) == serializer.dumps(s)
+    assert serializer.dumps_str(s) == json.dumps(
+        s, ensure_ascii=ensure_ascii
+    ).encode("utf-8")
+
+
+def test_stdlib_default_output_is_unchanged():
+    class Application(ChatCompletion):
+        async def chat_completion(
+            self, request: Request, response: Response
+        ) -> None:
+            with response.create_single_choice() as choice:
+                choice.append_content("привет")
+
+    app = DIALApp().add_chat_completion("test-deployment-name", Application())
+    client = create_test_client(app)
+
+    for stream, expected in [(True, b'"\\u043f'), (False, "привет".encode())]:
+        response = client.post(
+            "chat/completions", json={"messages": [], "stream": stream}
+        )
+        assert expected in response.content
+
+
+def test_custom_serializer_instance():
+    class _Serializer(StdlibJSONSerializer):
+        pass
+
+    serializer = _Serializer()
+    assert get_json_serializer(serializer) is serializer
+
+
+def test_unknown_serializer():
+    with pytest.raises(ValueError, match="Unknown JSON serializer"):
+        get_json_serializer("unknown")  # type: ignore
+
+
+@serializers
+def test_block_response(json_serializer: JSONSerializerName):
+    name = "test-deployment-name"
+    app = DIALApp(json_serializer=json_serializer).add_chat_completion(
+        name, SingleChoiceApplication()
+    )
+    client = create_test_client(app, name=name)
+
+    response = client.post(
+        "chat/completions",
+        json={
+            "messages": [{"role": "user", "content": "Test content"}],
+            "stream": False,
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["choices"][0]["message"] == {
+        "role": "assistant",
+        "content": "Test response content",
+    }
+
+
+@serializers
+def test_streaming_response(json_serializer: JSONSerializerName):
+    name = "test-deployment-name"
+    app = DIALApp(json_serializer=json_serializer).add_chat_completion(
+        name, SingleChoiceApplication()
+    )
+    client = create_test_client(app, name=name)
+
+    response = client.post(
+        "chat/completions",
+        json={
+            "messages": [{"role": "user", "content": "Test content"}],
+            "stream": True,
+        },
+    )
+
+    check_sse_stream(
+        response.iter_lines(),
+        [
+            create_single_choice_chunk({"role": "assistant"}),
+            create_single_choice_chunk({"content": "Test response content"}),
+            create_single_choice_chunk({}, "stop"),
+        ],
+    )
+
+
+@serializers
+def test_error_response(json_serializer: JSONSerializerName):
+    name = "test-deployment-name"
+    app = DIALApp(json_serializer=json_serializer).add_chat_completion(
+        name, ImmediatelyBrokenApplication()
+    )
+    client = create_test_client(app, name=name)
+
+    response = client.post(
+        "chat/completions",
+        json={
+            "messages": [{"role": "user", "content": "sdk_exception"}],
+            "stream": False,
+        },
+    )
+
+    assert response.status_code == 503
+    assert response.json() == {
+        "error": {
+            "message": "Test error",
+            "type": "runtime_error",
+            "code": "503",
+        }
+    }
@@ -0,0 +1,44 @@
+import contextvars
+import logging
+
+import pytest
+
+from aidial_sdk.chat_completion.backpressure import ChunkQueue
+from aidial_sdk.chat_completion.choice import Choice
+from aidial_sdk.utils.logging import (
+    is_debug_enabled,
+    logger,
+    set_log_deployment,
+)
+
+
+def _append_content(level: int) -> bool:
+    logger.setLevel(level)
+    set_log_deployment("deployment")
+
+    choice = Choice(ChunkQueue(), 0)
+    choice.open()
+    choice.append_content("token")
+
+    return is_debug_enabled()
+
+
+@pytest.mark.parametrize("level", [logging.DEBUG, logging.WARNING])
+def test_debug_logging(caplog, level: int):
+    old_level = logger.level
+    try:
+        with caplog.at_level(logging.DEBUG, logger="aidial_sdk"):
+            enabled = contextvars.copy_context().run(_append_content, level)
+    finally:
+        logger.setLevel(old_level)
+
+    messages = [r.getMessage() for r in caplog.records]
+    if level == logging.DEBUG:
+        assert enabled
+        assert any(
+            m.startswith("[deployment] chunk: ") and "token" in m
+            for m in messages
+        )
+    else:
+        assert not enabled
+        assert messages == []
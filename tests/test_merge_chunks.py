@@ -12,9 +12,12 @@ from aidial_sdk.utils.merge_chunks import (
     CANNOT_MERGE_NON_INDEXED_AND_INDEXED_LISTS_ERROR_MESSAGE,
     CANNOT_MERGE_NON_INDEXED_LISTS_ERROR_MESSAGE,
     INCONSISTENT_INDEXED_LIST_ERROR_MESSAGE,
+    ChunkMerger,
+    StrBuffers,
     cleanup_indices,
     merge,
     merge_chat_completion_chunks,
+    merge_recursive,
 )
 from tests.utils.chunks import create_chunk, create_tool_call_chunk
 from tests.utils.sharing import collect_shared_mutable_objects
@@ -427,6 +430,62 @@ def test_merge_chat_completion_chunks(test: Test):
     )
 
 
+def _merge_incrementally(*chunks: Any) -> Any:
+    merger = ChunkMerger()
+    for chunk in chunks:
+        merger.feed(chunk)
+    return merger.finalize()
+
+
+@pytest.mark.parametrize(
+    "test", permute(merge_chat_completion_chunks_cases), ids=attrgetter("desc")
+)
+def test_chunk_merger(test: Test):
+    first_chunk = copy.deepcopy(test.chunks[0]) if test.chunks else None
+    run_merge_test(test, merger=_merge_incrementally, remove_indices=False)
+    if test.chunks:
+        assert test.chunks[0] == first_chunk
+
+
+def test_chunk_merger_snapshot():
+    merger = ChunkMerger()
+    merger.feed(OPEN_CHUNK)
+    merger.feed(CONTENT_CHUNK1)
+
+    snapshot = merger.snapshot()
+    assert snapshot == create_chunk(
+        delta={"role": "assistant", "content": "hello"}
+    )
+
+    merger.feed(CONTENT_CHUNK2)
+    assert snapshot["choices"][0]["delta"]["content"] == "hello"
+    assert merger.finalize() == create_chunk(
+        delta={"role": "assistant", "content": "hello world"}
+    )
+
+    with pytest.raises(AssertionError, match="already finalized"):
+        merger.feed(CONTENT_CHUNK1)
+
+
+def test_chunk_merger_indexed_lists():
+    merger = ChunkMerger()
+    merger.feed(OPEN_CHUNK)
+    for idx in range(100):
+        merger.feed(create_tool_call_chunk(idx, id=f"id{idx}", type="function"))
+        merger.feed(create_tool_call_chunk(idx, arguments=f"{idx}"))
+
+    tool_calls = merger.finalize()["choices"][0]["delta"]["tool_calls"]
+    assert tool_calls == [
+        {
+            "index": idx,
+            "id": f"id{idx}",
+            "type": "function",
+            "function": {"name": None, "arguments": f"{idx}"},
+        }
+        for idx in range(100)
+    ]
+
+
 def run_merge_test(
     test: Test, *, merger: Callable[[Any], Any], remove_indices: bool
 ):
@@ -459,3 +518,28 @@ def run_merge_test(
             _merge_chunks()
     else:
         assert _merge_chunks() == test.expected
+
+
+def test_lazy_string_merging():
+    chunks = [{"a": {"b": f"{idx} ", "c": idx}} for idx in range(1000)]
+    expected = {"a": {"b": "".join(f"{idx} " for idx in range(1000)), "c": 999}}
+
+    buffers = StrBuffers()
+    target: dict = {}
+    for chunk in chunks:
+        target = merge_recursive(target, chunk, path=[], buffers=buffers)
+
+    assert target["a"]["b"] == "0 "
+    buffers.flush()
+    assert target == expected
+
+
+def test_owned_merge_moves_content():
+    attachment = {"index": 0, "data": "x" * 100}
+    source = {"a": {"attachments": [attachment]}, "b": [1, 2]}
+
+    merged = merge({}, source, owned=True)
+
+    assert merged == {"a": {"attachments": [attachment]}, "b": [1, 2]}
+    assert merged["a"]["attachments"][0] is attachment
+    assert merged["b"] is source["b"]
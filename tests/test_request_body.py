@@ -0,0 +1,115 @@
+import json
+from typing import Optional
+
+import pytest
+
+from aidial_sdk import DIALApp
+from aidial_sdk.chat_completion import ChatCompletion, Request, Response
+from tests.utils.client import create_test_client
+
+
+class EchoApplication(ChatCompletion):
+    async def chat_completion(
+        self, request: Request, response: Response
+    ) -> None:
+        body = await request.original_request.json()
+        raw_body = await request.original_request.body()
+        assert json.loads(raw_body) == body
+
+        with response.create_single_choice() as choice:
+            choice.append_content(body["messages"][0]["content"])
+
+
+def _create_client(max_body_size: Optional[int] = None):
+    app = DIALApp().add_chat_completion(
+        "test-deployment-name", EchoApplication(), max_body_size=max_body_size
+    )
+    return create_test_client(app)
+
+
+def _create_body(content: str) -> bytes:
+    return json.dumps(
+        {"messages": [{"role": "user", "content": content}]}
+    ).encode()
+
+
+def _chunked(body: bytes, chunk_size: int = 16):
+    for idx in range(0, len(body), chunk_size):
+        yield body[idx : idx + chunk_size]
+
+
+REQUEST_TOO_LARGE = {
+    "error": {
+        "message": "The request body exceeds the maximum size of 100 bytes",
+        "type": "invalid_request_error",
+        "code": "request_too_large",
+    }
+}
+
+
+@pytest.mark.parametrize("max_body_size", [None, 1000])
+def test_body_is_parsed(max_body_size: Optional[int]):
+    response = _create_client(max_body_size).post(
+        "chat/completions", content=_create_body("Привет")
+    )
+
+    assert response.status_code == 200
+    assert response.json()["choices"][0]["message"]["content"] == "Привет"
+
+
+def test_raw_body_is_available_after_parsing():
+    body = _create_body("Hello")
+    response = _create_client(max_body_size=1000).post(
+        "chat/completions", content=body
+    )
+
+    assert response.status_code == 200
+    assert response.json()["choices"][0]["message"]["content"] == "Hello"
+
+
+def test_body_too_large():
+    response = _create_client(max_body_size=100).post(
+        "chat/completions", content=_create_body("x" * 100)
+    )
+
+    assert response.status_code == 413
+    assert response.json() == REQUEST_TOO_LARGE
+
+
+def test_chunked_body_too_large():
+    # The body size isn't known in advance without the Content-Length header
+    response = _create_client(max_body_size=100).post(
+        "chat/completions", content=_chunked(_create_body("x" * 100))
+    )
+
+    assert response.status_code == 413
+    assert response.json() == REQUEST_TOO_LARGE
+
+
+def test_chunked_body_within_limit():
+    response = _create_client(max_body_size=100).post(
+        "chat/completions", content=_chunked(_create_body("Hello"))
+    )
+
+    assert response.status_code == 200
+    assert response.json()["choices"][0]["message"]["content"] == "Hello"
+
+
+@pytest.mark.parametrize(
+    "body, reason",
+    [
+        (b"{", "Expecting property name enclosed in double quotes"),
+        (b'{"messages": "\xff"}', "invalid start byte"),
+    ],
+)
+def test_invalid_json(body: bytes, reason: str):
+    response = _create_client().post("chat/completions", content=body)
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "error": {
+            "message": f"The request body isn't valid JSON: {reason}",
+            "type": "invalid_request_error",
+            "code": "400",
+        }
+    }
@@ -0,0 +1,248 @@
+import asyncio
+import io
+import sys
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterator, List, Optional
+from unittest import mock
+
+import pytest
+
+from aidial_sdk import DIALApp
+from aidial_sdk.chat_completion import ChatCompletion, Request, Response
+from aidial_sdk.exceptions import HTTPException as DIALException
+from aidial_sdk.storage import BucketMetadata, FileMetadata, StorageClient
+from tests.utils.client import create_test_client
+from tests.utils.storage_server import StorageState, run_storage_server
+
+CONTENT = bytes(range(256)) * 1000
+
+_STATE = StorageState()
+
+
+@pytest.fixture(scope="module")
+def dial_url() -> Iterator[str]:
+    with run_storage_server(_STATE) as url:
+        yield url
+
+
+@pytest.fixture
+def state() -> StorageState:
+    _STATE.reset()
+    return _STATE
+
+
+@pytest.fixture
+async def storage(dial_url: str) -> AsyncIterator[StorageClient]:
+    client = StorageClient(dial_url)
+    yield client
+    await client.aclose()
+
+
+async def _aiter(chunks: List[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+CONTENTS = {
+    "bytes": lambda: CONTENT,
+    "file": lambda: io.BytesIO(CONTENT),
+    "async iterable": lambda: _aiter([CONTENT[:1000], CONTENT[1000:]]),
+}
+
+
+@pytest.mark.parametrize("name", CONTENTS.keys())
+async def test_upload(storage: StorageClient, state: StorageState, name: str):
+    metadata = await storage.upload(
+        "images/picture.png",
+        CONTENTS[name](),
+        content_type="image/png",
+        api_key="key",
+    )
+
+    assert metadata == FileMetadata(
+        name="picture.png",
+        bucket="key",
+        url="files/key/appdata/app/images/picture.png",
+        content_length=len(CONTENT),
+        content_type="image/png",
+        nodeType="ITEM",
+    )
+    assert state.files["key/appdata/app/images/picture.png"] == (
+        "image/png",
+        CONTENT,
+    )
+    # The content is streamed
+    assert state.upload_headers[0]["transfer-encoding"] == "chunked"
+
+
+async def test_appdata_bucket_is_cached(
+    storage: StorageClient, state: StorageState
+):
+    for api_key in ["key1", "key1", "key2", "key1"]:
+        await storage.upload("file.txt", b"data", api_key=api_key)
+
+    assert state.bucket_requests == ["key1", "key2"]
+
+
+async def test_concurrent_bucket_requests_are_coalesced(
+    storage: StorageClient, state: StorageState
+):
+    buckets = await asyncio.gather(
+        *[storage.get_appdata_bucket("key") for _ in range(10)]
+    )
+
+    assert buckets == ["key/appdata/app"] * 10
+    assert state.bucket_requests == ["key"]
+
+
+async def test_bucket_cache_is_bounded(dial_url: str, state: StorageState):
+    storage = StorageClient(dial_url, max_cached_keys=1)
+
+    for api_key in ["key1", "key2", "key1"]:
+        assert await storage.get_bucket_metadata(api_key) == BucketMetadata(
+            bucket=api_key, appdata=f"{api_key}/appdata/app"
+        )
+
+    assert state.bucket_requests == ["key1", "key2", "key1"]
+    await storage.aclose()
+
+
+async def test_appdata_bucket_expires(dial_url: str, state: StorageState):
+    storage = StorageClient(dial_url, bucket_ttl=0)
+
+    for _ in range(2):
+        assert await storage.get_appdata_bucket("key") == "key/appdata/app"
+
+    assert state.bucket_requests == ["key", "key"]
+    await storage.aclose()
+
+
+async def test_connections_are_pooled(storage: StorageClient):
+    await storage.get_appdata_bucket("key")
+    client = storage._get_client()
+    await storage.get_appdata_bucket("other-key")
+
+    assert storage._get_client() is client
+
+
+@pytest.mark.parametrize("ignore_range", [False, True])
+@pytest.mark.parametrize(
+    "offset, length",
+    [(0, None), (0, 10), (1000, None), (1000, 100_000), (100_000, 500_000)],
+)
+async def test_download(
+    storage: StorageClient,
+    state: StorageState,
+    ignore_range: bool,
+    offset: int,
+    length: Optional[int],
+):
+    metadata = await storage.upload("data.bin", CONTENT, api_key="key")
+    state.ignore_range = ignore_range
+
+    content = await storage.download(
+        metadata.url, offset=offset, length=length, api_key="key"
+    )
+
+    end = None if length is None else offset + length
+    assert content == CONTENT[offset:end]
+
+
+async def test_api_key_is_required(storage: StorageClient):
+    with pytest.raises(DIALException):
+        await storage.get_appdata_bucket()
+
+
+@pytest.mark.parametrize("propagate_auth_headers", [False, True])
+def test_app_storage_uses_request_api_key(
+    dial_url: str, state: StorageState, propagate_auth_headers: bool
+):
+    app = DIALApp(
+        dial_url=dial_url, propagate_auth_headers=propagate_auth_headers
+    )
+
+    class Application(ChatCompletion):
+        async def chat_completion(
+            self, request: Request, response: Response
+        ) -> None:
+            metadata = await app.storage.upload("answer.txt", b"42")
+            with response.create_single_choice() as choice:
+                choice.add_attachment(url=metadata.url)
+
+    app.add_chat_completion("test-deployment-name", Application())
+
+    with create_test_client(app) as client:
+        response = client.post("chat/completions", json={"messages": []})
+
+    assert response.status_code == 200
+    assert state.bucket_requests == ["TEST_API_KEY"]
+    assert state.files["TEST_API_KEY/appdata/app/answer.txt"][1] == b"42"
+
+
+def test_app_storage_requires_dial_url():
+    with pytest.raises(ValueError):
+        DIALApp().storage
+
+
+def test_app_storage_requires_httpx():
+    with mock.patch.dict(sys.modules, {"httpx": None}):
+        with pytest.raises(ValueError, match=r"aidial-sdk\[storage\]"):
+            DIALApp(dial_url="http://dial")
+
+
+@pytest.mark.parametrize("with_lifespan", [False, True])
+def test_app_storage_is_closed_on_shutdown(
+    dial_url: str, state: StorageState, with_lifespan: bool
+):
+    events = []
+
+    @asynccontextmanager
+    async def _lifespan(app):
+        events.append("startup")
+        yield
+        events.append("shutdown")
+
+    app = DIALApp(
+        dial_url=dial_url, lifespan=_lifespan if with_lifespan else None
+    )
+
+    async def _use_storage() -> None:
+        await app.storage.get_appdata_bucket("key")
+
+    app.add_api_route("/use-storage", _use_storage, methods=["POST"])
+
+    with create_test_client(app) as client:
+        assert client.post("http://testserver/use-storage").status_code == 200
+        http_client = app.storage._client
+        assert http_client is not None and not http_client.is_closed
+
+    assert http_client.is_closed
+    assert events == (["startup", "shutdown"] if with_lifespan else [])
+
+
+async def test_client_of_previous_loop_is_closed(storage: StorageClient):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+
+    try:
+        asyncio.run_coroutine_threadsafe(
+            storage.get_appdata_bucket("key"), loop
+        ).result(timeout=5)
+        stale_client = storage._client
+        assert stale_client is not None
+
+        await storage.get_appdata_bucket("other-key")
+
+        # The stale client is closed on its own loop
+        for _ in range(100):
+            if stale_client.is_closed:
+                break
+            await asyncio.sleep(0.01)
+        assert stale_client.is_closed
+        assert storage._client is not stale_client
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -0,0 +1,153 @@
+import base64
+import io
+from typing import Any, AsyncIterator, List
+
+import pytest
+
+from aidial_sdk.chat_completion import ChatCompletion, Request, Response
+from aidial_sdk.exceptions import HTTPException as DIALException
+from aidial_sdk.utils.merge_chunks import cleanup_indices, merge
+from tests.utils.client import create_app_client
+from tests.utils.constants import DUMMY_DIAL_REQUEST
+
+CONTENT = bytes(range(256)) * 40
+PIECE_SIZE = 3 * 100
+
+
+async def _aiter(chunks: List[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+def _split(content: bytes, size: int) -> List[bytes]:
+    return [content[idx : idx + size] for idx in range(0, len(content), size)]
+
+
+CONTENTS = {
+    "bytes": lambda: CONTENT,
+    "file": lambda: io.BytesIO(CONTENT),
+    "iterable": lambda: iter(_split(CONTENT, 1000)),
+    "async iterable": lambda: _aiter(_split(CONTENT, 7)),
+}
+
+
+async def _collect(content: Any, piece_size: int = PIECE_SIZE) -> List[Any]:
+    async def _producer(request: Request, response: Response) -> None:
+        with response.create_single_choice() as choice:
+            choice.add_attachment(type="text/plain", data="Zmlyc3Q=")
+            await choice.astream_attachment(
+                content, type="image/png", title="Image", piece_size=piece_size
+            )
+            choice.append_content("Done")
+
+    response = Response(DUMMY_DIAL_REQUEST.copy(update={"stream": True}))
+    return [
+        (
+            chunk
+            if isinstance(chunk, DIALException)
+            else chunk.to_dict(with_defaults=False)
+        )
+        async for chunk in response._generate_stream(_producer)
+    ]
+
+
+def _attachments(chunks: List[dict]) -> List[dict]:
+    merged = cleanup_indices(merge({}, *chunks))
+    return merged["choices"][0]["delta"]["custom_content"]["attachments"]
+
+
+@pytest.mark.parametrize("name", CONTENTS.keys())
+async def test_attachment_is_streamed_in_pieces(name: str):
+    chunks = await _collect(CONTENTS[name]())
+
+    pieces = [
+        attachment["data"]
+        for chunk in chunks
+        for attachment in chunk["choices"][0]["delta"]
+        .get("custom_content", {})
+        .get("attachments", [])
+        if attachment["index"] == 1
+    ]
+    assert len(pieces) == -(-len(CONTENT) // PIECE_SIZE)
+    assert all(len(piece) <= PIECE_SIZE * 4 // 3 for piece in pieces)
+
+    assert _attachments(chunks) == [
+        {"type": "text/plain", "data": "Zmlyc3Q="},
+        {
+            "type": "image/png",
+            "title": "Image",
+            "data": base64.b64encode(CONTENT).decode(),
+        },
+    ]
+
+
+async def test_empty_attachment():
+    chunks = await _collect(b"")
+
+    assert _attachments(chunks)[1] == {
+        "type": "image/png",
+        "title": "Image",
+        "data": "",
+    }
+
+
+def test_empty_attachment_block_response():
+    class Application(ChatCompletion):
+        async def chat_completion(
+            self, request: Request, response: Response
+        ) -> None:
+            with response.create_single_choice() as choice:
+                await choice.astream_attachment(b"", type="text/plain")
+
+    response = create_app_client(Application()).post(
+        "chat/completions", json={"messages": [], "stream": False}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["choices"][0]["message"]["custom_content"] == {
+        "attachments": [{"type": "text/plain", "data": ""}]
+    }
+
+
+async def test_invalid_piece_size():
+    chunks = await _collect(CONTENT, piece_size=100)
+
+    assert isinstance(chunks[-1], DIALException)
+    assert chunks[-1].status_code == 500
+
+
+def test_block_response():
+    class Application(ChatCompletion):
+        async def chat_completion(
+            self, request: Request, response: Response
+        ) -> None:
+            with response.create_single_choice() as choice:
+                await choice.astream_attachment(
+                    io.BytesIO(CONTENT), type="image/png", piece_size=PIECE_SIZE
+                )
+
+    response = create_app_client(Application()).post(
+        "chat/completions", json={"messages": [], "stream": False}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["choices"][0]["message"]["custom_content"] == {
+        "attachments": [
+            {"type": "image/png", "data": base64.b64encode(CONTENT).decode()}
+        ]
+    }
+
+
+def test_attachment_requires_opened_choice():
+    class Application(ChatCompletion):
+        async def chat_completion(
+            self, request: Request, response: Response
+        ) -> None:
+            choice = response.create_single_choice()
+            await choice.astream_attachment(CONTENT)
+
+    response = create_app_client(Application()).post(
+        "chat/completions", json={"messages": []}
+    )
+
+    assert response.status_code == 500
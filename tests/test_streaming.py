@@ -0,0 +1,30 @@
+from aidial_sdk.chat_completion import Request, Response
+from aidial_sdk.utils.streaming import HEARTBEAT_FRAME, to_streaming_response
+from tests.utils.constants import DUMMY_DIAL_REQUEST
+
+
+async def _producer(request: Request, response: Response) -> None:
+    response.set_response_id("test_id")
+    response.set_created(0)
+    with response.create_single_choice() as choice:
+        choice.append_content("привет")
+
+
+async def test_streaming_response_frames():
+    response = Response(DUMMY_DIAL_REQUEST.copy(update={"stream": True}))
+
+    async def _stream():
+        yield HEARTBEAT_FRAME
+        async for chunk in response._generate_stream(_producer):
+            yield chunk
+
+    frames = [frame async for frame in await to_streaming_response(_stream())]
+
+    assert all(isinstance(frame, bytes) for frame in frames)
+    assert frames == [
+        b": heartbeat\n\n",
+        b'data: {"choices":[{"index":0,"finish_reason":null,"delta":{"role":"assistant"}}],"usage":null,"id":"test_id","created":0,"object":"chat.completion.chunk"}\n\n',
+        b'data: {"choices":[{"index":0,"finish_reason":null,"delta":{"content":"\\u043f\\u0440\\u0438\\u0432\\u0435\\u0442"}}],"usage":null,"id":"test_id","created":0,"object":"chat.completion.chunk"}\n\n',
+        b'data: {"choices":[{"index":0,"finish_reason":"stop","delta":{}}],"usage":null,"id":"test_id","created":0,"object":"chat.completion.chunk"}\n\n',
+        b"data: [DONE]\n\n",
+    ]
@@ -0,0 +1,25 @@
+import pytest
+
+from aidial_sdk.utils.json import get_json_serializer
+
+
+def _available(name: str) -> bool:
+    try:
+        get_json_serializer(name)  # type: ignore
+    except ValueError:
+        return False
+    return True
+
+
+serializers = pytest.mark.parametrize(
+    "json_serializer",
+    [
+        pytest.param(
+            name,
+            marks=pytest.mark.skipif(
+                not _available(name), reason=f"{name} isn't installed"
+            ),
+        )
+        for name in ["stdlib", "orjson", "msgspec"]
+    ],
+)
@@ -0,0 +1,110 @@
+"""
+A stub of the DIAL file storage API
+"""
+
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+
+class StorageState:
+    bucket_requests: List[str]
+    upload_headers: List[Dict[str, str]]
+    files: Dict[str, Tuple[str, bytes]]
+    ignore_range: bool
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.bucket_requests = []
+        self.upload_headers = []
+        self.files = {}
+        self.ignore_range = False
+
+
+def create_app(state: StorageState) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/v1/bucket")
+    async def get_bucket(request: Request):
+        api_key = request.headers["api-key"]
+        state.bucket_requests.append(api_key)
+        return {"bucket": api_key, "appdata": f"{api_key}/appdata/app"}
+
+    @app.put("/v1/files/{path:path}")
+    async def upload(path: str, request: Request):
+        state.upload_headers.append(dict(request.headers))
+
+        boundary = request.headers["content-type"].split("boundary=")[1]
+        body = await request.body()
+        part = body.split(f"--{boundary}".encode())[1]
+        headers, content = part.split(b"\r\n\r\n", 1)
+        content_type = (
+            headers.decode().split("Content-Type: ")[1].split("\r\n")[0]
+        )
+        content = content[: -len(b"\r\n")]
+
+        state.files[path] = (content_type, content)
+        bucket, name = path.split("/", 1)
+        return {
+            "name": name.rsplit("/", 1)[-1],
+            "bucket": bucket,
+            "url": f"files/{path}",
+            "contentLength": len(content),
+            "contentType": content_type,
+            "nodeType": "ITEM",
+        }
+
+    @app.get("/v1/files/{path:path}")
+    async def download(path: str, request: Request):
+        if path not in state.files:
+            return JSONResponse(status_code=404, content={})
+
+        content_type, content = state.files[path]
+        range_header = request.headers.get("range")
+        if range_header is None or state.ignore_range:
+            return Response(content, media_type=content_type)
+
+        start, end = range_header[len("bytes=") :].split("-")
+        stop = len(content) if end == "" else int(end) + 1
+        return Response(
+            content[int(start) : stop],
+            status_code=206,
+            media_type=content_type,
+        )
+
+    return app
+
+
+def _get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def run_storage_server(state: StorageState) -> Iterator[str]:
+    port = _get_free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_app(state), host="127.0.0.1", port=port, log_level="error"
+        )
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    while not server.started:
+        time.sleep(0.01)
+
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()